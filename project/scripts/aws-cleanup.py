@@ -10,6 +10,21 @@ Usage:
     python aws-cleanup.py --dry-run          # Show what would be deleted
     python aws-cleanup.py --force            # Skip confirmation prompts
     python aws-cleanup.py --region us-east-1 # Specify region
+    python aws-cleanup.py --region us-east-1,eu-west-1  # Several regions
+    python aws-cleanup.py --region all       # Every enabled region
+    python aws-cleanup.py --only s3,iam      # Only these resource types
+    python aws-cleanup.py --exclude vpc      # Everything but these
+    python aws-cleanup.py --workers 16       # More concurrent API calls
+    python aws-cleanup.py --rate-limit iam=40  # Pace IAM calls to 40/s
+    python aws-cleanup.py --engine asyncio   # API calls and waits as tasks
+    python aws-cleanup.py --discovery tags   # Find tagged resources via the tag index
+    python aws-cleanup.py --fresh            # Ignore an interrupted run's journal
+    python aws-cleanup.py --plan plan.json   # Discover and save a plan to review
+    python aws-cleanup.py --apply plan.json  # Delete exactly what the plan lists
+    python aws-cleanup.py --watch 300        # Report leaked resources as they appear
+    python aws-cleanup.py --watch 300 --auto-clean 10  # ...and clean up past 10
+    python aws-cleanup.py --force --quiet --events cleanup.jsonl
+    python aws-cleanup.py --metrics-json run.json --metrics-textfile cleanup.prom
 
 Resources cleaned up:
     - EC2 instances (tagged Project: FlowForge)
@@ -25,21 +40,39 @@ Safety features:
     - Confirmation prompt before destructive actions
     - Handles already-deleted resources gracefully
     - Retry logic for resources that take time to delete
+    - Progress journal: a failed or interrupted run resumes where it stopped
+    - Plan files: review what will go, then apply it without rediscovery
     - Summary report of all actions taken
 """
 
 import argparse
+import asyncio
+import json
+import os
+import random
 import sys
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+
+
+def _load_boto():
+    """Import boto3 on first use, so --help and argument errors stay fast."""
+    global boto3, Config, ClientError, NoCredentialsError, EndpointConnectionError
+    try:
+        import boto3
+        from botocore.config import Config
+        from botocore.exceptions import (ClientError, NoCredentialsError,
+                                         EndpointConnectionError)
+    except ImportError:
+        print("ERROR: boto3 is not installed.")
+        print("Install it with: pip install boto3")
+        print("See: https://boto3.amazonaws.com/v1/documentation/api/latest/guide/quickstart.html")
+        sys.exit(1)
 
-try:
-    import boto3
-    from botocore.exceptions import ClientError, NoCredentialsError, EndpointConnectionError
-except ImportError:
-    print("ERROR: boto3 is not installed.")
-    print("Install it with: pip install boto3")
-    print("See: https://boto3.amazonaws.com/v1/documentation/api/latest/guide/quickstart.html")
-    sys.exit(1)
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -49,6 +82,58 @@ PROJECT_TAG = "FlowForge"
 TAG_FILTER = [{"Name": "tag:Project", "Values": [PROJECT_TAG]}]
 FLOWFORGE_PREFIX = "flowforge"
 
+# Upper bound on concurrent AWS API calls per service and region, i.e. per
+# client (override with --workers)
+DEFAULT_WORKERS = 8
+
+# delete_objects accepts at most this many keys per request
+S3_DELETE_BATCH = 1000
+
+# Most values one EC2 / RDS describe filter accepts, and most repositories
+# one describe_repositories call accepts
+EC2_FILTER_VALUES = 200
+RDS_FILTER_VALUES = 100
+ECR_DESCRIBE_BATCH = 100
+
+# Buckets emptied at the same time (their delete batches share one pool)
+S3_PARALLEL_BUCKETS = 4
+
+# Client-side request budget per service and region: (sustained requests/s,
+# burst). Kept just under the documented API throttling buckets so a fully
+# concurrent run is paced instead of collapsing into retry storms. IAM
+# publishes no request quota: its budget only stops a wide --workers from
+# bursting well past what its control plane accepts, and any throttling
+# below it is absorbed by the adaptive retries. --rate-limit overrides any
+# of these.
+SERVICE_RATE_LIMITS = {
+    "ec2": (20, 100),
+    "rds": (10, 20),
+    "s3": (100, 200),
+    "ecr": (10, 20),
+    "iam": (20, 40),
+}
+
+# Upper bounds (seconds) of the API call latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Failures kept (a uniform random sample) for the summary; the rest are
+# only counted and written to the --events stream
+FAILURE_SAMPLE_SIZE = 20
+
+# Write buffer of the --events JSON Lines file
+EVENT_BUFFER_BYTES = 1 << 20
+
+# Error codes AWS uses for request-rate throttling (retry later, never "gone")
+THROTTLE_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "TooManyRequestsException",
+    "SlowDown",
+}
+
 # ANSI colour helpers (disabled when stdout is not a terminal)
 _COLOURS = sys.stdout.isatty()
 
@@ -69,61 +154,288 @@ def _bold(text: str) -> str:
     return f"\033[1m{text}\033[0m" if _COLOURS else text
 
 
+_print_lock = threading.Lock()
+
+
+def _log(message: str = ""):
+    """print() for code that may run on a worker thread (one whole line at a time)."""
+    with _print_lock:
+        print(message)
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-class CleanupStats:
-    """Track what was deleted, skipped, and failed."""
+@dataclass
+class CleanupEvent:
+    """One outcome for one resource, as written to the event stream."""
 
-    def __init__(self):
-        self.deleted: list[str] = []
-        self.skipped: list[str] = []
-        self.failed: list[str] = []
+    outcome: str  # deleted/skipped/failed, or appeared/disappeared (--watch)
+    resource: str
+    region: str = ""
+    detail: str = ""
+    time: float = field(default_factory=time.time)
+
+
+class EventSink:
+    """Thread-safe, buffered JSON Lines writer for CleanupEvents."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "w", buffering=EVENT_BUFFER_BYTES)
+        self._lock = threading.Lock()
+
+    def write(self, event: CleanupEvent):
+        line = json.dumps(asdict(event), separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class CleanupStats:
+    """Count what was deleted, skipped, and failed.
+
+    Only counters and a fixed-size random sample of failures are kept, so
+    memory stays flat however many resources a run touches; every event
+    also goes to *sink* (a JSON Lines file) when one is given. With
+    *echo* off only failures are printed as they happen.
+
+    In a multi-region run each region records into its own instance
+    (labelled with *region*) and merge() combines them for the summary.
+    """
+
+    def __init__(self, region: str = "", sink: EventSink | None = None,
+                 echo: bool = True):
+        self.region = region
+        self.sink = sink
+        self.echo = echo
+        self.deleted = 0
+        self.skipped = 0
+        self.failed = 0
+        self.failures: list[str] = []
+        self.by_region: dict[str, "CleanupStats"] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def merge(cls, parts: dict) -> "CleanupStats":
+        """Combine region -> CleanupStats into one, keeping the breakdown."""
+        merged = cls()
+        for part in parts.values():
+            merged.deleted += part.deleted
+            merged.skipped += part.skipped
+            merged.failed += part.failed
+        # Draw the merged sample as if from all failures together: pick a
+        # region by its count of not-yet-drawn failures, then take one of
+        # its (uniformly sampled) failures
+        remaining = {region: part.failed for region, part in parts.items()}
+        pools = {region: random.sample(part.failures, len(part.failures))
+                 for region, part in parts.items()}
+        for _ in range(min(FAILURE_SAMPLE_SIZE, merged.failed)):
+            region = random.choices(list(remaining),
+                                    weights=list(remaining.values()))[0]
+            remaining[region] -= 1
+            merged.failures.append(pools[region].pop())
+        merged.by_region = dict(parts)
+        return merged
+
+    def _name(self, resource: str) -> str:
+        return f"[{self.region}] {resource}" if self.region else resource
+
+    def _emit(self, outcome: str, resource: str, detail: str = ""):
+        if self.sink is not None:
+            self.sink.write(CleanupEvent(outcome, resource, self.region,
+                                         detail))
 
     def record_deleted(self, resource: str):
-        self.deleted.append(resource)
-        print(_red(f"  DELETED: {resource}"))
+        with self._lock:
+            self.deleted += 1
+        self._emit("deleted", resource)
+        if self.echo:
+            _log(_red(f"  DELETED: {self._name(resource)}"))
 
     def record_skipped(self, resource: str, reason: str = "already gone"):
-        self.skipped.append(f"{resource} ({reason})")
-        print(_yellow(f"  SKIPPED: {resource} -- {reason}"))
+        with self._lock:
+            self.skipped += 1
+        self._emit("skipped", resource, reason)
+        if self.echo:
+            _log(_yellow(f"  SKIPPED: {self._name(resource)} -- {reason}"))
 
     def record_failed(self, resource: str, error: str):
-        self.failed.append(f"{resource}: {error}")
-        print(_red(f"  FAILED:  {resource} -- {error}"))
+        resource = self._name(resource)
+        with self._lock:
+            self.failed += 1
+            # Reservoir sampling: every failure is equally likely to be kept
+            if len(self.failures) < FAILURE_SAMPLE_SIZE:
+                self.failures.append(f"{resource}: {error}")
+            else:
+                slot = random.randrange(self.failed)
+                if slot < FAILURE_SAMPLE_SIZE:
+                    self.failures[slot] = f"{resource}: {error}"
+        self._emit("failed", resource, error)
+        _log(_red(f"  FAILED:  {resource} -- {error}"))
 
     def print_summary(self):
         print("\n" + "=" * 60)
         print(_bold("CLEANUP SUMMARY"))
         print("=" * 60)
-        print(_green(f"  Deleted: {len(self.deleted)} resources"))
-        print(_yellow(f"  Skipped: {len(self.skipped)} resources"))
+        print(_green(f"  Deleted: {self.deleted} resources"))
+        print(_yellow(f"  Skipped: {self.skipped} resources"))
         if self.failed:
-            print(_red(f"  Failed:  {len(self.failed)} resources"))
-            for f in self.failed:
+            print(_red(f"  Failed:  {self.failed} resources"))
+            if self.failed > len(self.failures):
+                print(_red(f"    (a random {len(self.failures)} of them)"))
+            for f in self.failures:
                 print(_red(f"    - {f}"))
         else:
             print(_green("  Failed:  0 resources"))
+        if len(self.by_region) > 1:
+            print("-" * 60)
+            for region, part in self.by_region.items():
+                print(f"  {region:<16} deleted {part.deleted}, "
+                      f"skipped {part.skipped}, failed {part.failed}")
         print("=" * 60)
 
 
-def wait_for(describe_fn, check_fn, resource_name: str, timeout: int = 600,
-             interval: int = 10):
-    """Poll *describe_fn* until *check_fn* returns True or timeout."""
-    elapsed = 0
-    while elapsed < timeout:
+def _error_code(error: "ClientError") -> str:
+    return error.response.get("Error", {}).get("Code", "")
+
+
+def _is_throttle(error: "ClientError") -> bool:
+    return _error_code(error) in THROTTLE_CODES
+
+
+def _is_not_found(error: "ClientError") -> bool:
+    code = _error_code(error)
+    return "NotFound" in code or code.startswith("NoSuch")
+
+
+def wait_for(poll_fn, pending, resource_name: str, timeout: int = 600,
+             interval: float = 5, max_interval: float = 60) -> set:
+    """Wait until every ID in *pending* is gone; return the IDs that are not.
+
+    *poll_fn* receives the IDs still pending and returns the subset that
+    still exists, using one batched describe call for all of them, so N
+    resources cost one request per poll instead of N. The delay between
+    polls grows exponentially from *interval* to *max_interval* with
+    jitter. Throttling only lengthens the next delay, NotFound means
+    everything asked about is gone, and any other error stops the wait.
+    """
+    pending = set(pending)
+    count = len(pending)
+    start = time.monotonic()
+    steps = _wait_steps(pending, resource_name, start, timeout, interval,
+                        max_interval)
+    try:
+        action, arg = next(steps)
+        while True:
+            if action == "sleep":
+                time.sleep(arg)
+                action, arg = steps.send(None)
+                continue
+            try:
+                present = poll_fn(arg)
+            except ClientError as e:
+                action, arg = steps.throw(e)
+            else:
+                action, arg = steps.send(present)
+    except StopIteration as stop:
+        pending = stop.value
+    finally:
+        _metrics.record_wait(resource_name, time.monotonic() - start, count,
+                             len(pending))
+    return pending
+
+
+async def async_wait_for(poll_fn, pending, resource_name: str,
+                         timeout: int = 600, interval: float = 5,
+                         max_interval: float = 60, call=None) -> set:
+    """wait_for() for the asyncio engine.
+
+    Polls go through *call(fn, *args)* (by default the loop's executor)
+    and the delays are asyncio sleeps, so a long wait holds no thread.
+    """
+    if call is None:
+        loop = asyncio.get_running_loop()
+
+        def call(fn, *args):
+            return loop.run_in_executor(None, fn, *args)
+    pending = set(pending)
+    count = len(pending)
+    start = time.monotonic()
+    steps = _wait_steps(pending, resource_name, start, timeout, interval,
+                        max_interval)
+    try:
+        action, arg = next(steps)
+        while True:
+            if action == "sleep":
+                await asyncio.sleep(arg)
+                action, arg = steps.send(None)
+                continue
+            try:
+                present = await call(poll_fn, arg)
+            except ClientError as e:
+                action, arg = steps.throw(e)
+            else:
+                action, arg = steps.send(present)
+    except StopIteration as stop:
+        pending = stop.value
+    finally:
+        _metrics.record_wait(resource_name, time.monotonic() - start, count,
+                             len(pending))
+    return pending
+
+
+def _wait_steps(pending: set, resource_name: str, start: float,
+                timeout: int, interval: float, max_interval: float):
+    """The polling schedule shared by wait_for() and async_wait_for().
+
+    Yields ("poll", ids) expecting the IDs that still exist to be sent
+    back (or the ClientError thrown in), and ("sleep", seconds); returns
+    the IDs still pending when the wait ends.
+    """
+    deadline = start + timeout
+    delay = interval
+    while pending:
         try:
-            result = describe_fn()
-            if check_fn(result):
-                return True
-        except ClientError:
-            return True  # resource is gone
-        time.sleep(interval)
-        elapsed += interval
-        print(f"    Waiting for {resource_name}... ({elapsed}s)")
-    print(_yellow(f"    Timeout waiting for {resource_name} after {timeout}s"))
-    return False
+            pending &= set((yield "poll", sorted(pending)))
+        except ClientError as e:
+            if _is_not_found(e):
+                return set()
+            if not _is_throttle(e):
+                _log(_yellow(f"    Stopped waiting for {resource_name}: {e}"))
+                return pending
+            _log(f"    Throttled while waiting for {resource_name}; backing off")
+        if not pending:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _log(_yellow(f"    Timeout waiting for {resource_name} after {timeout}s"))
+            return pending
+        # Equal jitter keeps concurrent waiters from polling in lock-step
+        yield "sleep", min(remaining, delay / 2 + random.uniform(0, delay / 2))
+        delay = min(delay * 2, max_interval)
+        _log(f"    Waiting for {len(pending)} {resource_name}... "
+             f"({time.monotonic() - start:.0f}s)")
+    return pending
+
+
+def _batched(iterable, size: int):
+    """Yield lists of up to *size* items from *iterable* without materialising it."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 
 def confirm_deletion(resource_count: int, force: bool) -> bool:
@@ -136,209 +448,806 @@ def confirm_deletion(resource_count: int, force: bool) -> bool:
 
 
 # ---------------------------------------------------------------------------
-# Resource discovery (dry-run listing)
+# Phase programs
 # ---------------------------------------------------------------------------
+#
+# Each cleanup_* phase is a generator -- a phase program -- that makes no
+# API call itself. It yields the steps it needs: Start one blocking call
+# (typically one resource's delete calls), Join started calls, Wait for
+# deletions to finish, or run sub-programs in Parallel (one per VPC or
+# bucket). An engine drives the program and sends back each step's
+# result: run_phase() runs the calls on a thread pool, AsyncEngine makes
+# every call its own task on the event loop. The deletion logic is
+# written once, as _wait_steps() does for the polling schedule.
 
-def discover_resources(ec2, rds_client, s3_client, ecr_client, iam_client,
-                       region: str) -> dict:
-    """Return a dict of resource-type -> list[resource-description]."""
-    resources: dict[str, list[str]] = {}
-
-    # EC2 instances
-    instances = ec2.describe_instances(Filters=TAG_FILTER).get("Reservations", [])
-    instance_ids = []
-    for r in instances:
+class Start:
+    """Step: begin the blocking call *fn(*args)*; a handle is sent back."""
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+
+@dataclass
+class Join:
+    """Step: wait for the calls behind *handles*; their results are sent back.
+
+    If any of them raised, the first error is thrown into the program
+    once all have ended.
+    """
+
+    handles: list
+
+
+@dataclass
+class Parallel:
+    """Step: run sub-*programs*, at most *limit* at a time; returns their results."""
+
+    programs: list
+    limit: int
+
+
+@dataclass
+class Wait:
+    """Step: deletions a phase has started and must see finish.
+
+    The engine decides how to wait: run() sleeps on the calling thread,
+    run_async() on the event loop. *poll_fn* calls *service*; *done*
+    receives the IDs still present when the wait ends.
+    """
+
+    service: str
+    poll_fn: object
+    pending: list
+    resource_name: str
+    done: object
+    timeout: int = 600
+    interval: float = 5
+    max_interval: float = 60
+
+    def run(self, call=None):
+        """Wait on this thread; polls go through *call(fn, *args)* if given."""
+
+        def poll(ids):
+            return call(self.poll_fn, ids) if call else self.poll_fn(ids)
+
+        self.done(wait_for(poll, self.pending, self.resource_name,
+                           self.timeout, self.interval, self.max_interval))
+
+    async def run_async(self, call=None):
+        self.done(await async_wait_for(
+            self.poll_fn, self.pending, self.resource_name, self.timeout,
+            self.interval, self.max_interval, call))
+
+
+def _call(fn, *args):
+    """Program fragment: make one call and return its result."""
+    handle = yield Start(fn, *args)
+    return (yield Join([handle]))[0]
+
+
+def _call_all(calls: list):
+    """Program fragment: make *calls* ((fn, *args) tuples) concurrently."""
+    handles = []
+    for fn, *args in calls:
+        handles.append((yield Start(fn, *args)))
+    return (yield Join(handles))
+
+
+def run_phase(fn, workers: int = DEFAULT_WORKERS):
+    """Run the phase program *fn()* to completion, its calls on *workers* threads."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return _drive(fn(), pool)
+
+
+def _drive(program, pool: ThreadPoolExecutor):
+    """Run *program* on the calling thread, its calls on *pool*."""
+    value = error = None
+    while True:
+        try:
+            step = (program.throw(error) if error is not None
+                    else program.send(value))
+        except StopIteration as stop:
+            return stop.value
+        value = error = None
+        try:
+            if isinstance(step, Start):
+                value = pool.submit(step.fn, *step.args)
+            elif isinstance(step, Join):
+                wait(step.handles)
+                value = [future.result() for future in step.handles]
+            elif isinstance(step, Parallel):
+                # These threads only drive; the calls still go to *pool*
+                value = []
+                if step.programs:
+                    with ThreadPoolExecutor(max_workers=min(
+                            len(step.programs), step.limit)) as drivers:
+                        value = list(drivers.map(
+                            lambda p: _drive(p, pool), step.programs))
+            else:
+                step.run(lambda fn, *args: pool.submit(fn, *args).result())
+        except Exception as e:
+            error = e
+
+
+# ---------------------------------------------------------------------------
+# Inventory
+# ---------------------------------------------------------------------------
+#
+# Discovery describes every FlowForge resource exactly once and stores it
+# here; the cleanup_* phases read from the inventory instead of listing
+# the same APIs again, so the confirmation prompt shows exactly what will
+# be deleted. The inventory is therefore complete before the first phase
+# runs: deletion does not start while discovery is still paging, and the
+# FlowForge resources themselves (not the pages they came from) are held
+# in memory for the whole run, as the prompt, --plan and the journal all
+# need the full list.
+
+# kind -> (listing category, label format), in listing order
+RESOURCE_KINDS = {
+    "ec2_instance": ("EC2 Instances", "{id} ({name})"),
+    "key_pair": ("Key Pairs", "{id}"),
+    "rds_instance": ("RDS Instances", "{id} ({state})"),
+    "rds_subnet_group": ("RDS Subnet Groups", "{id}"),
+    "nat_gateway": ("NAT Gateways", "{id} ({state})"),
+    "elastic_ip": ("Elastic IPs", "{id} ({name})"),
+    "vpc": ("VPCs", "{id} ({name})"),
+    "subnet": ("Subnets", "{id} ({name})"),
+    "internet_gateway": ("Internet Gateways", "{id}"),
+    "security_group": ("Security Groups", "{id} ({name})"),
+    "route_table": ("Route Tables", "{id} ({name})"),
+    "network_acl": ("Network ACLs", "{id}"),
+    "s3_bucket": ("S3 Buckets", "{id}"),
+    "ecr_repository": ("ECR Repositories", "{id}"),
+    "iam_user": ("IAM Users", "{id}"),
+    "iam_role": ("IAM Roles", "{id}"),
+    "iam_policy": ("IAM Policies", "{name} ({id})"),
+    "iam_instance_profile": ("IAM Instance Profiles", "{id}"),
+    "iam_group": ("IAM Groups", "{id}"),
+}
+
+# Cleanup phase -> the resource kinds it deletes
+PHASE_KINDS = {
+    "ec2_instances": ("ec2_instance",),
+    "key_pairs": ("key_pair",),
+    "rds_instances": ("rds_instance",),
+    "rds_subnet_groups": ("rds_subnet_group",),
+    "nat_gateways": ("nat_gateway",),
+    "elastic_ips": ("elastic_ip",),
+    "vpc": ("vpc", "subnet", "internet_gateway", "security_group",
+            "route_table", "network_acl"),
+    "s3": ("s3_bucket",),
+    "ecr": ("ecr_repository",),
+    "iam": ("iam_user", "iam_role", "iam_policy", "iam_instance_profile",
+            "iam_group"),
+}
+
+# Cleanup phase -> the service its API calls go to
+PHASE_SERVICES = {
+    "ec2_instances": "ec2",
+    "key_pairs": "ec2",
+    "rds_instances": "rds",
+    "rds_subnet_groups": "rds",
+    "nat_gateways": "ec2",
+    "elastic_ips": "ec2",
+    "vpc": "ec2",
+    "s3": "s3",
+    "ecr": "ecr",
+    "iam": "iam",
+}
+
+# --only/--exclude resource type -> the cleanup phases it selects
+RESOURCE_TYPES = {
+    "ec2": ("ec2_instances", "key_pairs"),
+    "rds": ("rds_instances", "rds_subnet_groups"),
+    "nat": ("nat_gateways",),
+    "eip": ("elastic_ips",),
+    "vpc": ("vpc",),
+    "s3": ("s3",),
+    "ecr": ("ecr",),
+    "iam": ("iam",),
+}
+ALL_PHASES = frozenset(p for phases in RESOURCE_TYPES.values() for p in phases)
+
+_PHASE_OF_KIND = {kind: phase for phase, kinds in PHASE_KINDS.items()
+                  for kind in kinds}
+
+
+@dataclass
+class Resource:
+    """One discovered resource: its identity, state, tags and relationships."""
+
+    kind: str
+    id: str
+    name: str = ""
+    state: str = ""
+    vpc_id: str = ""
+    tags: dict = field(default_factory=dict)
+    # Related IDs and the describe data the delete calls need
+    refs: dict = field(default_factory=dict)
+
+    def label(self) -> str:
+        fmt = RESOURCE_KINDS[self.kind][1]
+        return fmt.format(id=self.id, name=self.name or self.id,
+                          state=self.state)
+
+
+class Inventory:
+    """Thread-safe store of discovered resources, keyed by kind and ID.
+
+    Phases that change a resource either update or discard their entries
+    directly, or invalidate() entries whose server-side state they changed
+    indirectly (e.g. terminating an instance disassociates its EIP). Stale
+    entries are re-described, by ID only, the next time their kind is read.
+    """
+
+    def __init__(self):
+        self._items: dict[str, dict[str, Resource]] = {
+            kind: {} for kind in RESOURCE_KINDS}
+        self._stale: dict[str, set] = {kind: set() for kind in RESOURCE_KINDS}
+        self._refreshers: dict = {}
+        self._discard_listener = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(items) for items in self._items.values())
+
+    def __iter__(self):
+        with self._lock:
+            return iter([r for items in self._items.values()
+                         for r in items.values()])
+
+    def add(self, resource: Resource):
+        with self._lock:
+            self._items[resource.kind][resource.id] = resource
+
+    def set_refresher(self, kind: str, fn):
+        """Register *fn(ids) -> Resources that still exist* for *kind*."""
+        self._refreshers[kind] = fn
+
+    def on_discard(self, fn):
+        """Call *fn(kind, ids)* with the IDs each discard() removes."""
+        self._discard_listener = fn
+
+    def resources(self, kind: str, vpc_id: str | None = None) -> list:
+        """Return the current entries of *kind*, refreshing stale ones first."""
+        with self._lock:
+            self._refresh(kind)
+            items = list(self._items[kind].values())
+        if vpc_id is not None:
+            items = [r for r in items if r.vpc_id == vpc_id]
+        return items
+
+    def discard(self, kind: str, ids):
+        with self._lock:
+            removed = [rid for rid in ids
+                       if self._items[kind].pop(rid, None) is not None]
+            self._stale[kind].difference_update(removed)
+            if removed and self._discard_listener is not None:
+                self._discard_listener(kind, removed)
+
+    def reconcile(self, kinds, fresh: list):
+        """Replace entries of *kinds* with their *fresh* descriptions.
+
+        Entries missing from *fresh* are gone and are discarded; fresh
+        resources that were never in the inventory are not added.
+        """
+        fresh = {(r.kind, r.id): r for r in fresh}
+        with self._lock:
+            for kind in kinds:
+                gone = [rid for rid in self._items[kind]
+                        if (kind, rid) not in fresh]
+                self.discard(kind, gone)
+                for rid in self._items[kind]:
+                    self._items[kind][rid] = fresh[kind, rid]
+
+    def invalidate(self, kind: str, ids):
+        with self._lock:
+            self._stale[kind].update(
+                rid for rid in ids if rid in self._items[kind])
+
+    def _refresh(self, kind: str):
+        stale = self._stale[kind]
+        if not stale or kind not in self._refreshers:
+            return
+        ids = sorted(stale)
+        stale.clear()
+        fresh = {r.id: r for r in self._refreshers[kind](ids)}
+        for rid in ids:
+            if rid in fresh:
+                self._items[kind][rid] = fresh[rid]
+            else:
+                self._items[kind].pop(rid, None)
+
+    def listing(self) -> dict:
+        """Return category -> labels for every non-empty kind, in listing order."""
+        with self._lock:
+            return {
+                RESOURCE_KINDS[kind][0]: [r.label() for r in items.values()]
+                for kind, items in self._items.items() if items
+            }
+
+
+# ---------------------------------------------------------------------------
+# Paginated resource iterators
+# ---------------------------------------------------------------------------
+#
+# Every list/describe call goes through _paginate(), so nothing is silently
+# dropped after the first page. The _iter_* generators filter each page as it
+# arrives and yield matching resources one at a time, so discovery never
+# holds more than one page of non-FlowForge resources in memory. What they
+# yield is collected into the Inventory (see above); cleanup does not
+# consume them directly.
+
+def _paginate(client, operation: str, result_key: str, **kwargs):
+    """Yield every item under *result_key* across all pages of *operation*."""
+    for page in _paginate_pages(client, operation, **kwargs):
+        yield from page.get(result_key, [])
+
+
+def _paginate_pages(client, operation: str, **kwargs):
+    """Yield each response page of *operation*.
+
+    Operations without a paginator (e.g. describe_key_pairs) fall back to a
+    single call.
+    """
+    if client.can_paginate(operation):
+        yield from client.get_paginator(operation).paginate(**kwargs)
+    else:
+        yield getattr(client, operation)(**kwargs)
+
+
+def _is_flowforge_name(name: str) -> bool:
+    return name.startswith(FLOWFORGE_PREFIX)
+
+
+def _iter_ec2_instances(ec2, filters: list = TAG_FILTER):
+    """Yield FlowForge EC2 instances that are not already terminating."""
+    for r in _paginate(ec2, "describe_instances", "Reservations",
+                       Filters=filters):
         for i in r["Instances"]:
             if i["State"]["Name"] not in ("terminated", "shutting-down"):
-                name = _get_tag(i.get("Tags", []), "Name") or i["InstanceId"]
-                instance_ids.append(f'{i["InstanceId"]} ({name})')
-    if instance_ids:
-        resources["EC2 Instances"] = instance_ids
-
-    # Key pairs
-    kps = ec2.describe_key_pairs(
-        Filters=[{"Name": "key-name", "Values": [f"{FLOWFORGE_PREFIX}*"]}]
-    ).get("KeyPairs", [])
-    if kps:
-        resources["Key Pairs"] = [kp["KeyName"] for kp in kps]
-
-    # RDS instances
-    try:
-        dbs = rds_client.describe_db_instances().get("DBInstances", [])
-        rds_items = [
-            f'{db["DBInstanceIdentifier"]} ({db["DBInstanceStatus"]})'
-            for db in dbs
-            if db["DBInstanceIdentifier"].startswith(FLOWFORGE_PREFIX)
-        ]
-        if rds_items:
-            resources["RDS Instances"] = rds_items
-    except ClientError:
-        pass
+                yield i
 
-    # RDS subnet groups
-    try:
-        sgs = rds_client.describe_db_subnet_groups().get("DBSubnetGroups", [])
-        rds_sg = [
-            sg["DBSubnetGroupName"]
-            for sg in sgs
-            if sg["DBSubnetGroupName"].startswith(FLOWFORGE_PREFIX)
-        ]
-        if rds_sg:
-            resources["RDS Subnet Groups"] = rds_sg
-    except ClientError:
-        pass
-
-    # NAT Gateways
-    nats = ec2.describe_nat_gateways(
-        Filter=TAG_FILTER
-    ).get("NatGateways", [])
-    nat_items = [
-        f'{n["NatGatewayId"]} ({n["State"]})'
-        for n in nats if n["State"] not in ("deleted",)
-    ]
-    if nat_items:
-        resources["NAT Gateways"] = nat_items
-
-    # Elastic IPs
-    eips = ec2.describe_addresses(
-        Filters=TAG_FILTER
-    ).get("Addresses", [])
-    if eips:
-        resources["Elastic IPs"] = [
-            f'{a.get("AllocationId")} ({a.get("PublicIp")})'
-            for a in eips
-        ]
 
-    # VPCs
-    vpcs = ec2.describe_vpcs(Filters=TAG_FILTER).get("Vpcs", [])
-    if vpcs:
-        resources["VPCs"] = [
-            f'{v["VpcId"]} ({_get_tag(v.get("Tags", []), "Name") or "unnamed"})'
-            for v in vpcs
-        ]
+def _iter_key_pairs(ec2, filters: list | None = None):
+    if filters is None:
+        filters = [{"Name": "key-name", "Values": [f"{FLOWFORGE_PREFIX}*"]}]
+    yield from _paginate(ec2, "describe_key_pairs", "KeyPairs",
+                         Filters=filters)
 
-    # Subnets
-    subnets = ec2.describe_subnets(Filters=TAG_FILTER).get("Subnets", [])
-    if subnets:
-        resources["Subnets"] = [
-            f'{s["SubnetId"]} ({_get_tag(s.get("Tags", []), "Name") or s["CidrBlock"]})'
-            for s in subnets
-        ]
 
-    # Internet Gateways
-    igws = ec2.describe_internet_gateways(Filters=TAG_FILTER).get(
-        "InternetGateways", [])
-    if igws:
-        resources["Internet Gateways"] = [
-            f'{ig["InternetGatewayId"]}' for ig in igws
+def _iter_rds_instances(rds_client, db_ids: list | None = None):
+    """Yield FlowForge DB instances: those in *db_ids*, or by name prefix."""
+    if db_ids is not None:
+        for batch in _batched(db_ids, RDS_FILTER_VALUES):
+            yield from _paginate(
+                rds_client, "describe_db_instances", "DBInstances",
+                Filters=[{"Name": "db-instance-id", "Values": batch}])
+        return
+    for db in _paginate(rds_client, "describe_db_instances", "DBInstances"):
+        if _is_flowforge_name(db["DBInstanceIdentifier"]):
+            yield db
+
+
+def _iter_rds_subnet_groups(rds_client, names: list | None = None):
+    """Yield FlowForge DB subnet groups: those in *names*, or by prefix."""
+    if names is not None:
+        # describe_db_subnet_groups has no working filters: one call each
+        for name in names:
+            try:
+                yield from rds_client.describe_db_subnet_groups(
+                    DBSubnetGroupName=name)["DBSubnetGroups"]
+            except ClientError as e:
+                if not _is_not_found(e):
+                    raise
+        return
+    for sg in _paginate(rds_client, "describe_db_subnet_groups",
+                        "DBSubnetGroups"):
+        if _is_flowforge_name(sg["DBSubnetGroupName"]):
+            yield sg
+
+
+def _iter_nat_gateways(ec2, filters: list = TAG_FILTER):
+    for n in _paginate(ec2, "describe_nat_gateways", "NatGateways",
+                       Filter=filters):
+        if n["State"] not in ("deleted",):
+            yield n
+
+
+def _iter_vpcs(ec2, filters: list = TAG_FILTER):
+    yield from _paginate(ec2, "describe_vpcs", "Vpcs", Filters=filters)
+
+
+def _iter_subnets(ec2, filters: list = TAG_FILTER):
+    yield from _paginate(ec2, "describe_subnets", "Subnets", Filters=filters)
+
+
+def _iter_igws(ec2, filters: list = TAG_FILTER):
+    yield from _paginate(ec2, "describe_internet_gateways",
+                         "InternetGateways", Filters=filters)
+
+
+def _iter_security_groups(ec2, filters: list = TAG_FILTER):
+    """Yield non-default security groups matching *filters*."""
+    for sg in _paginate(ec2, "describe_security_groups", "SecurityGroups",
+                        Filters=filters):
+        if sg["GroupName"] != "default":
+            yield sg
+
+
+def _iter_s3_buckets(s3_client):
+    for b in _paginate(s3_client, "list_buckets", "Buckets"):
+        if _is_flowforge_name(b["Name"]):
+            yield b
+
+
+def _iter_ecr_repositories(ecr_client, names: list | None = None):
+    """Yield FlowForge repositories: those in *names*, or by name prefix."""
+    if names is not None:
+        for batch in _batched(names, ECR_DESCRIBE_BATCH):
+            yield from _paginate(ecr_client, "describe_repositories",
+                                 "repositories", repositoryNames=batch)
+        return
+    for r in _paginate(ecr_client, "describe_repositories", "repositories"):
+        if (r["repositoryName"].startswith(FLOWFORGE_PREFIX)
+                or r["repositoryName"].startswith(f"{FLOWFORGE_PREFIX}/")):
+            yield r
+
+
+def _is_flowforge_iam_policy(name: str) -> bool:
+    return name.startswith("FlowForge") or _is_flowforge_name(name)
+
+
+def _is_flowforge_iam_group(name: str) -> bool:
+    return _is_flowforge_name(name) or name in ("deployers", "administrators")
+
+
+def _iter_iam_instance_profiles(iam_client):
+    for ip in _paginate(iam_client, "list_instance_profiles",
+                        "InstanceProfiles"):
+        if _is_flowforge_name(ip["InstanceProfileName"]):
+            yield ip
+
+# ---------------------------------------------------------------------------
+# Resource discovery
+# ---------------------------------------------------------------------------
+
+def discover_resources(ec2, rds_client, s3_client, ecr_client, iam_client,
+                       region: str, workers: int = DEFAULT_WORKERS,
+                       include_global: bool = True,
+                       tagging_client=None, phases=ALL_PHASES) -> Inventory:
+    """Describe every FlowForge resource once and return the inventory.
+
+    Every kind is queried as its own task on a bounded thread pool, so
+    the wall time is roughly that of the slowest single call; the
+    children of each VPC are queried as soon as the VPC list is back.
+    Results are added in the order the queries are declared, which keeps
+    the listing in main() stable no matter which call returns first.
+    Global services (S3 buckets, IAM) are skipped unless *include_global*.
+
+    With a *tagging_client* the tagged kinds are first resolved through
+    the tag index and then described by ID (see tag_index()); otherwise
+    each kind's describe call filters on the tag or name itself. Only the
+    kinds deleted by *phases* are looked for.
+    """
+    if tagging_client is not None:
+        index = tag_index(tagging_client)
+        hydrate = _tag_hydrators(ec2, rds_client, ecr_client)
+        queries = [(_PHASE_OF_KIND[kind],
+                    lambda kind=kind: hydrate[kind](index[kind]))
+                   for kind in index if kind != "vpc" and index[kind]]
+
+        def find_vpcs():
+            return hydrate["vpc"](index["vpc"]) if index["vpc"] else []
+    else:
+        queries = [
+            ("ec2_instances", lambda: _find_ec2_instances(ec2)),
+            ("key_pairs", lambda: _find_key_pairs(ec2)),
+            ("rds_instances", lambda: _find_rds_instances(rds_client)),
+            ("rds_subnet_groups",
+             lambda: _find_rds_subnet_groups(rds_client)),
+            ("nat_gateways", lambda: _find_nat_gateways(ec2)),
+            ("elastic_ips", lambda: _find_elastic_ips(ec2)),
+            ("ecr", lambda: _find_ecr_repositories(ecr_client)),
         ]
 
-    # Security Groups (non-default)
-    sgs_ec2 = ec2.describe_security_groups(Filters=TAG_FILTER).get(
-        "SecurityGroups", [])
-    sg_items = [
-        f'{sg["GroupId"]} ({sg["GroupName"]})'
-        for sg in sgs_ec2 if sg["GroupName"] != "default"
+        def find_vpcs():
+            return _find_vpcs(ec2)
+    if include_global:
+        queries.append(("s3", lambda: _find_s3_buckets(s3_client)))
+        # IAM resources (users, roles, policies, instance profiles, groups)
+        queries += [("iam", fn) for fn in _discover_iam(iam_client)]
+
+    inventory = _new_inventory(ec2)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fn) for phase, fn in queries
+                   if phase in phases]
+        vpcs = pool.submit(find_vpcs).result() if "vpc" in phases else []
+        futures += [pool.submit(query) for query in
+                    _vpc_child_queries(ec2, [vpc.id for vpc in vpcs])]
+        for vpc in vpcs:
+            inventory.add(vpc)
+        for future in futures:
+            for resource in future.result():
+                inventory.add(resource)
+    return inventory
+
+
+def _new_inventory(ec2) -> Inventory:
+    inventory = Inventory()
+    inventory.set_refresher(
+        "elastic_ip", lambda ids: _find_elastic_ips(ec2, allocation_ids=ids))
+    return inventory
+
+
+def _tags(raw: dict) -> dict:
+    return {t["Key"]: t["Value"] for t in raw.get("Tags", [])}
+
+
+def _find_ec2_instances(ec2, filters: list = TAG_FILTER) -> list[Resource]:
+    return [
+        Resource("ec2_instance", i["InstanceId"],
+                 name=_get_tag(i.get("Tags", []), "Name") or "",
+                 state=i["State"]["Name"], vpc_id=i.get("VpcId", ""),
+                 tags=_tags(i))
+        for i in _iter_ec2_instances(ec2, filters)
     ]
-    if sg_items:
-        resources["Security Groups"] = sg_items
 
-    # S3 buckets
+
+def _find_key_pairs(ec2, filters: list | None = None) -> list[Resource]:
+    return [Resource("key_pair", kp["KeyName"], tags=_tags(kp))
+            for kp in _iter_key_pairs(ec2, filters)]
+
+
+def _find_rds_instances(rds_client,
+                        db_ids: list | None = None) -> list[Resource]:
     try:
-        buckets = s3_client.list_buckets().get("Buckets", [])
-        s3_items = [
-            b["Name"] for b in buckets
-            if b["Name"].startswith(FLOWFORGE_PREFIX)
+        return [
+            Resource("rds_instance", db["DBInstanceIdentifier"],
+                     state=db["DBInstanceStatus"],
+                     vpc_id=db.get("DBSubnetGroup", {}).get("VpcId", ""))
+            for db in _iter_rds_instances(rds_client, db_ids)
         ]
-        if s3_items:
-            resources["S3 Buckets"] = s3_items
     except ClientError:
-        pass
+        return []
 
-    # ECR repositories
+
+def _find_rds_subnet_groups(rds_client,
+                            names: list | None = None) -> list[Resource]:
     try:
-        repos = ecr_client.describe_repositories().get("repositories", [])
-        ecr_items = [
-            r["repositoryName"] for r in repos
-            if r["repositoryName"].startswith(FLOWFORGE_PREFIX)
-               or r["repositoryName"].startswith(f"{FLOWFORGE_PREFIX}/")
-        ]
-        if ecr_items:
-            resources["ECR Repositories"] = ecr_items
+        return [Resource("rds_subnet_group", sg["DBSubnetGroupName"],
+                         vpc_id=sg.get("VpcId", ""))
+                for sg in _iter_rds_subnet_groups(rds_client, names)]
     except ClientError:
-        pass
+        return []
 
-    # IAM resources (users, roles, policies, instance profiles)
-    _discover_iam(iam_client, resources)
 
-    return resources
+def _find_nat_gateways(ec2, filters: list = TAG_FILTER) -> list[Resource]:
+    return [
+        Resource("nat_gateway", n["NatGatewayId"], state=n["State"],
+                 vpc_id=n.get("VpcId", ""), tags=_tags(n),
+                 refs={"allocation_ids": [
+                     a["AllocationId"] for a in n.get("NatGatewayAddresses", [])
+                     if a.get("AllocationId")]})
+        for n in _iter_nat_gateways(ec2, filters)
+    ]
 
 
-def _discover_iam(iam_client, resources: dict):
-    """Find IAM resources created for FlowForge."""
-    # Users
-    try:
-        users = iam_client.list_users().get("Users", [])
-        iam_users = [
-            u["UserName"] for u in users
-            if u["UserName"].startswith(FLOWFORGE_PREFIX)
-        ]
-        if iam_users:
-            resources["IAM Users"] = iam_users
-    except ClientError:
-        pass
+def _find_elastic_ips(ec2, allocation_ids: list | None = None) -> list[Resource]:
+    filters = list(TAG_FILTER)
+    if allocation_ids is not None:
+        filters.append({"Name": "allocation-id", "Values": allocation_ids})
+    return [
+        Resource("elastic_ip", a.get("AllocationId"),
+                 name=a.get("PublicIp", ""), tags=_tags(a),
+                 refs={"association_id": a.get("AssociationId"),
+                       "instance_id": a.get("InstanceId")})
+        for a in _paginate(ec2, "describe_addresses", "Addresses",
+                           Filters=filters)
+    ]
+
+
+def _find_vpcs(ec2, filters: list = TAG_FILTER) -> list[Resource]:
+    return [
+        Resource("vpc", v["VpcId"],
+                 name=_get_tag(v.get("Tags", []), "Name") or "unnamed",
+                 state=v.get("State", ""), vpc_id=v["VpcId"], tags=_tags(v))
+        for v in _iter_vpcs(ec2, filters)
+    ]
+
+
+def _find_vpc_children(ec2, vpc_ids: list) -> list[Resource]:
+    """Describe everything inside *vpc_ids* that has to go before the VPCs."""
+    return [r for query in _vpc_child_queries(ec2, vpc_ids) for r in query()]
+
+
+def _vpc_child_queries(ec2, vpc_ids: list) -> list:
+    """Return one query per VPC child type, each covering all of *vpc_ids*.
+
+    The queries filter on many VPC IDs at once and file each result under
+    the VPC it reports, so the describe calls do not grow with the VPCs.
+    """
+    return [
+        lambda: _find_security_groups(ec2, vpc_ids),
+        lambda: _find_network_acls(ec2, vpc_ids),
+        lambda: _find_route_tables(ec2, vpc_ids),
+        lambda: _find_subnets(ec2, vpc_ids),
+        lambda: _find_internet_gateways(ec2, vpc_ids),
+    ]
+
+
+def _vpc_filters(vpc_ids: list, name: str = "vpc-id"):
+    """Yield describe filters for *vpc_ids*, as few as the API allows."""
+    for batch in _batched(vpc_ids, EC2_FILTER_VALUES):
+        yield [{"Name": name, "Values": batch}]
+
 
-    # Roles
+def _find_security_groups(ec2, vpc_ids: list) -> list[Resource]:
+    return [
+        Resource("security_group", sg["GroupId"], name=sg["GroupName"],
+                 vpc_id=sg["VpcId"], tags=_tags(sg),
+                 refs={"ingress": sg.get("IpPermissions", []),
+                       "egress": sg.get("IpPermissionsEgress", [])})
+        for filters in _vpc_filters(vpc_ids)
+        for sg in _iter_security_groups(ec2, filters)
+    ]
+
+
+def _find_network_acls(ec2, vpc_ids: list) -> list[Resource]:
+    nacls = [n for filters in _vpc_filters(vpc_ids)
+             for n in _paginate(ec2, "describe_network_acls", "NetworkAcls",
+                                Filters=filters)]
+    default_acls = {n["VpcId"]: n["NetworkAclId"]
+                    for n in nacls if n["IsDefault"]}
+    return [
+        Resource("network_acl", nacl["NetworkAclId"], vpc_id=nacl["VpcId"],
+                 tags=_tags(nacl),
+                 refs={"default_acl_id": default_acls.get(nacl["VpcId"]),
+                       "association_ids": [
+                           a["NetworkAclAssociationId"]
+                           for a in nacl.get("Associations", [])]})
+        for nacl in nacls if not nacl["IsDefault"]
+    ]
+
+
+def _find_route_tables(ec2, vpc_ids: list) -> list[Resource]:
+    found = []
+    for filters in _vpc_filters(vpc_ids):
+        for rt in _paginate(ec2, "describe_route_tables", "RouteTables",
+                            Filters=filters):
+            # Skip main route table (can't delete it directly)
+            if any(a.get("Main", False) for a in rt.get("Associations", [])):
+                continue
+            found.append(Resource(
+                "route_table", rt["RouteTableId"],
+                name=_get_tag(rt.get("Tags", []), "Name") or "",
+                vpc_id=rt["VpcId"], tags=_tags(rt),
+                refs={"association_ids": [
+                    a["RouteTableAssociationId"]
+                    for a in rt.get("Associations", [])]}))
+    return found
+
+
+def _find_subnets(ec2, vpc_ids: list) -> list[Resource]:
+    return [
+        Resource("subnet", subnet["SubnetId"],
+                 name=_get_tag(subnet.get("Tags", []), "Name")
+                 or subnet["CidrBlock"],
+                 vpc_id=subnet["VpcId"], tags=_tags(subnet))
+        for filters in _vpc_filters(vpc_ids)
+        for subnet in _iter_subnets(ec2, filters)
+    ]
+
+
+def _find_internet_gateways(ec2, vpc_ids: list) -> list[Resource]:
+    wanted = set(vpc_ids)
+    found = []
+    for filters in _vpc_filters(vpc_ids, "attachment.vpc-id"):
+        for igw in _iter_igws(ec2, filters):
+            # A gateway is attached to at most one VPC
+            vpc_id = next((a["VpcId"] for a in igw.get("Attachments", [])
+                           if a["VpcId"] in wanted), "")
+            found.append(Resource(
+                "internet_gateway", igw["InternetGatewayId"], vpc_id=vpc_id,
+                tags=_tags(igw)))
+    return found
+
+
+def _find_s3_buckets(s3_client) -> list[Resource]:
     try:
-        roles = iam_client.list_roles().get("Roles", [])
-        iam_roles = [
-            r["RoleName"] for r in roles
-            if r["RoleName"].startswith(FLOWFORGE_PREFIX)
-        ]
-        if iam_roles:
-            resources["IAM Roles"] = iam_roles
+        return [Resource("s3_bucket", b["Name"])
+                for b in _iter_s3_buckets(s3_client)]
     except ClientError:
-        pass
+        return []
+
 
-    # Policies (customer-managed only)
+def _find_ecr_repositories(ecr_client,
+                           names: list | None = None) -> list[Resource]:
     try:
-        policies = iam_client.list_policies(Scope="Local").get("Policies", [])
-        iam_policies = [
-            f'{p["PolicyName"]} ({p["Arn"]})'
-            for p in policies
-            if p["PolicyName"].startswith("FlowForge")
-               or p["PolicyName"].startswith(FLOWFORGE_PREFIX)
-        ]
-        if iam_policies:
-            resources["IAM Policies"] = iam_policies
+        return [Resource("ecr_repository", r["repositoryName"])
+                for r in _iter_ecr_repositories(ecr_client, names)]
     except ClientError:
-        pass
+        return []
 
-    # Instance Profiles
+
+def _discover_iam(iam_client) -> list:
+    """Return the queries that find FlowForge IAM resources."""
+    return [
+        lambda: _find_iam_snapshot(iam_client),
+        lambda: _find_iam_instance_profiles(iam_client),
+    ]
+
+
+def _find_iam_snapshot(iam_client) -> list[Resource]:
+    """Find FlowForge users, roles, groups and policies in one paginated call.
+
+    get_account_authorization_details returns every principal together with
+    its group memberships, attached and inline policies, and every policy
+    with its versions, so the teardown needs no per-principal list calls
+    for any of them.
+    """
+    found = []
+    groups = []
+    members: dict[str, list[str]] = {}
     try:
-        profiles = iam_client.list_instance_profiles().get(
-            "InstanceProfiles", [])
-        iam_ips = [
-            ip["InstanceProfileName"] for ip in profiles
-            if ip["InstanceProfileName"].startswith(FLOWFORGE_PREFIX)
-        ]
-        if iam_ips:
-            resources["IAM Instance Profiles"] = iam_ips
+        for page in _paginate_pages(
+                iam_client, "get_account_authorization_details",
+                Filter=["User", "Role", "Group", "LocalManagedPolicy"]):
+            for u in page.get("UserDetailList", []):
+                # Members of FlowForge groups need not be FlowForge users
+                for gname in u.get("GroupList", []):
+                    members.setdefault(gname, []).append(u["UserName"])
+                if _is_flowforge_name(u["UserName"]):
+                    found.append(Resource("iam_user", u["UserName"], refs={
+                        "groups": u.get("GroupList", []),
+                        **_iam_policy_refs(u, "UserPolicyList")}))
+            for r in page.get("RoleDetailList", []):
+                if _is_flowforge_name(r["RoleName"]):
+                    found.append(Resource(
+                        "iam_role", r["RoleName"],
+                        refs=_iam_policy_refs(r, "RolePolicyList")))
+            for g in page.get("GroupDetailList", []):
+                if _is_flowforge_iam_group(g["GroupName"]):
+                    groups.append(Resource(
+                        "iam_group", g["GroupName"],
+                        refs=_iam_policy_refs(g, "GroupPolicyList")))
+            for p in page.get("Policies", []):
+                # The policy name is the last segment of its ARN
+                name = p.get("PolicyName") or p["Arn"].rsplit("/", 1)[-1]
+                if _is_flowforge_iam_policy(name):
+                    found.append(Resource(
+                        "iam_policy", p["Arn"], name=name,
+                        refs={"versions": [
+                            v["VersionId"] for v in p.get("PolicyVersionList", [])
+                            if not v["IsDefaultVersion"]]}))
     except ClientError:
-        pass
+        return []
+    for group in groups:
+        group.refs["members"] = members.get(group.id, [])
+    return found + groups
+
 
-    # Groups
+def _iam_policy_refs(detail: dict, inline_key: str) -> dict:
+    return {
+        "attached_policies": [
+            p["PolicyArn"] for p in detail.get("AttachedManagedPolicies", [])],
+        "inline_policies": [
+            p["PolicyName"] for p in detail.get(inline_key, [])],
+    }
+
+
+def _find_iam_instance_profiles(iam_client) -> list[Resource]:
+    # Listed separately: the snapshot only shows profiles that hold a role
     try:
-        groups = iam_client.list_groups().get("Groups", [])
-        iam_groups = [
-            g["GroupName"] for g in groups
-            if g["GroupName"].startswith(FLOWFORGE_PREFIX)
-               or g["GroupName"] in ("deployers", "administrators")
+        return [
+            Resource("iam_instance_profile", ip["InstanceProfileName"],
+                     refs={"roles": [r["RoleName"] for r in ip.get("Roles", [])]})
+            for ip in _iter_iam_instance_profiles(iam_client)
         ]
-        if iam_groups:
-            resources["IAM Groups"] = iam_groups
     except ClientError:
-        pass
+        return []
 
 
 def _get_tag(tags: list, key: str) -> str | None:
@@ -348,584 +1257,1998 @@ def _get_tag(tags: list, key: str) -> str | None:
     return None
 
 
+# ---------------------------------------------------------------------------
+# Tag-index discovery
+# ---------------------------------------------------------------------------
+#
+# With --discovery tags, one paginated Resource Groups Tagging API
+# get_resources call resolves the ARN of every Project: FlowForge resource
+# in the region, and only those IDs are described (in batches) for the
+# details the cleanup needs. Resources found by name rather than by tag --
+# IAM, which the tagging API does not cover, and S3 buckets, which are
+# listed once for all regions -- are still matched by prefix.
+
+# Tagging API resource type -> inventory kind
+TAG_RESOURCE_TYPES = {
+    "ec2:instance": "ec2_instance",
+    "ec2:key-pair": "key_pair",
+    "rds:db": "rds_instance",
+    "rds:subgrp": "rds_subnet_group",
+    "ec2:natgateway": "nat_gateway",
+    "ec2:elastic-ip": "elastic_ip",
+    "ec2:vpc": "vpc",
+    "ecr:repository": "ecr_repository",
+}
+
+
+def tag_index(tagging_client) -> dict:
+    """Return kind -> IDs of every resource tagged Project: FlowForge."""
+    index = {kind: [] for kind in TAG_RESOURCE_TYPES.values()}
+    for mapping in _paginate(
+            tagging_client, "get_resources", "ResourceTagMappingList",
+            TagFilters=[{"Key": "Project", "Values": [PROJECT_TAG]}],
+            ResourceTypeFilters=list(TAG_RESOURCE_TYPES)):
+        resource_type, resource_id = _parse_arn(mapping["ResourceARN"])
+        if resource_type in TAG_RESOURCE_TYPES:
+            index[TAG_RESOURCE_TYPES[resource_type]].append(resource_id)
+    return index
+
+
+def _parse_arn(arn: str) -> tuple[str, str]:
+    """Split an ARN into its tagging API resource type and resource ID.
+
+    >>> _parse_arn("arn:aws:ecr:us-east-1:123456789012:repository/flowforge/api")
+    ('ecr:repository', 'flowforge/api')
+    """
+    service, resource = arn.split(":", 5)[2::3]
+    # RDS separates type and ID with ":", the others with "/"
+    resource_type, _, resource_id = resource.partition(
+        ":" if service == "rds" else "/")
+    return f"{service}:{resource_type}", resource_id
+
+
+def _tag_hydrators(ec2, rds_client, ecr_client) -> dict:
+    """Return kind -> fn(ids) that describes just those resources."""
+
+    def by_filter(find, name):
+        return lambda ids: [
+            r for batch in _batched(ids, EC2_FILTER_VALUES)
+            for r in find(ec2, [{"Name": name, "Values": batch}])]
+
+    return {
+        "ec2_instance": by_filter(_find_ec2_instances, "instance-id"),
+        "key_pair": by_filter(_find_key_pairs, "key-pair-id"),
+        "rds_instance": lambda ids: _find_rds_instances(rds_client, ids),
+        "rds_subnet_group":
+            lambda ids: _find_rds_subnet_groups(rds_client, ids),
+        "nat_gateway": by_filter(_find_nat_gateways, "nat-gateway-id"),
+        "elastic_ip": lambda ids: [
+            r for batch in _batched(ids, EC2_FILTER_VALUES)
+            for r in _find_elastic_ips(ec2, allocation_ids=batch)],
+        "vpc": by_filter(_find_vpcs, "vpc-id"),
+        "ecr_repository": lambda ids: _find_ecr_repositories(ecr_client, ids),
+    }
+
+
 # ---------------------------------------------------------------------------
 # Deletion functions
 # ---------------------------------------------------------------------------
 
-def cleanup_ec2_instances(ec2, stats: CleanupStats):
-    """Terminate EC2 instances tagged with Project: FlowForge."""
-    print("\n" + _bold("--- EC2 Instances ---"))
-    reservations = ec2.describe_instances(Filters=TAG_FILTER).get(
-        "Reservations", [])
-    instance_ids = []
-    for r in reservations:
-        for i in r["Instances"]:
-            if i["State"]["Name"] not in ("terminated", "shutting-down"):
-                instance_ids.append(i["InstanceId"])
+def cleanup_ec2_instances(ec2, inventory: Inventory, stats: CleanupStats):
+    """Terminate EC2 instances tagged with Project: FlowForge, then wait."""
+    _log("\n" + _bold("--- EC2 Instances ---"))
+    instances = inventory.resources("ec2_instance")
+    if not instances:
+        _log("  No FlowForge EC2 instances found.")
+        return
 
+    results = yield from _call_all([
+        (_terminate_instances, ec2, batch, stats)
+        for batch in _batched([i.id for i in instances], 1000)])
+    instance_ids = [iid for batch in results for iid in batch]
     if not instance_ids:
-        print("  No FlowForge EC2 instances found.")
         return
 
+    # Terminating an instance disassociates its Elastic IPs; reading them
+    # may refresh the listing, so it is a call like any other
+    terminated = set(instance_ids)
+    eips = yield from _call(inventory.resources, "elastic_ip")
+    inventory.invalidate("elastic_ip", [
+        e.id for e in eips if e.refs.get("instance_id") in terminated])
+
+    def done(remaining: set):
+        inventory.discard("ec2_instance",
+                          [iid for iid in instance_ids if iid not in remaining])
+        if remaining:
+            _log(_yellow(f"  {len(remaining)} instance(s) may still be "
+                         "terminating."))
+        else:
+            _log(_green("  All instances terminated."))
+
+    _log("  Waiting for instances to terminate...")
+    yield Wait("ec2", lambda ids: _instances_present(ec2, ids), instance_ids,
+               "EC2 instance(s)", done, timeout=600, interval=10,
+               max_interval=30)
+
+
+def _terminate_instances(ec2, batch: list, stats) -> list:
+    """Terminate one batch of instances; returns the IDs now terminating."""
     try:
-        ec2.terminate_instances(InstanceIds=instance_ids)
-        for iid in instance_ids:
-            stats.record_deleted(f"EC2 instance {iid}")
-
-        # Wait for termination
-        print("  Waiting for instances to terminate...")
-        waiter = ec2.get_waiter("instance_terminated")
-        waiter.wait(InstanceIds=instance_ids,
-                    WaiterConfig={"Delay": 10, "MaxAttempts": 60})
-        print(_green("  All instances terminated."))
+        ec2.terminate_instances(InstanceIds=batch)
     except ClientError as e:
-        for iid in instance_ids:
+        for iid in batch:
             stats.record_failed(f"EC2 instance {iid}", str(e))
+        return []
+    for iid in batch:
+        stats.record_deleted(f"EC2 instance {iid}")
+    return batch
+
+
+def _instances_present(ec2, instance_ids: list) -> set:
+    """Return which of *instance_ids* are not yet terminated."""
+    present = set()
+    for chunk in _batched(instance_ids, EC2_FILTER_VALUES):
+        for r in _paginate(
+                ec2, "describe_instances", "Reservations",
+                Filters=[{"Name": "instance-id", "Values": chunk}]):
+            present.update(i["InstanceId"] for i in r["Instances"]
+                           if i["State"]["Name"] != "terminated")
+    return present
 
 
-def cleanup_key_pairs(ec2, stats: CleanupStats):
+def cleanup_key_pairs(ec2, inventory: Inventory, stats: CleanupStats):
     """Delete key pairs named flowforge-*."""
-    print("\n" + _bold("--- Key Pairs ---"))
-    kps = ec2.describe_key_pairs(
-        Filters=[{"Name": "key-name", "Values": [f"{FLOWFORGE_PREFIX}*"]}]
-    ).get("KeyPairs", [])
+    _log("\n" + _bold("--- Key Pairs ---"))
+    kps = inventory.resources("key_pair")
     if not kps:
-        print("  No FlowForge key pairs found.")
+        _log("  No FlowForge key pairs found.")
         return
-    for kp in kps:
-        try:
-            ec2.delete_key_pair(KeyName=kp["KeyName"])
-            stats.record_deleted(f"Key pair {kp['KeyName']}")
-        except ClientError as e:
-            stats.record_failed(f"Key pair {kp['KeyName']}", str(e))
+    yield from _delete_each(inventory, "key_pair", kps, _delete_key_pair,
+                            ec2, stats)
+
+
+def _delete_each(inventory: Inventory, kind: str, resources: list, delete,
+                 client, stats):
+    """Program fragment: *delete* every resource concurrently, discarding
+    those that went from *inventory*."""
+    results = yield from _call_all([(delete, client, r, stats)
+                                    for r in resources])
+    inventory.discard(kind, [r.id for r, ok in zip(resources, results) if ok])
 
 
-def cleanup_rds(rds_client, stats: CleanupStats):
-    """Delete RDS instances and subnet groups."""
-    print("\n" + _bold("--- RDS Instances ---"))
+def _delete_key_pair(ec2, kp: Resource, stats) -> bool:
     try:
-        dbs = rds_client.describe_db_instances().get("DBInstances", [])
-    except ClientError:
-        print("  Could not list RDS instances.")
-        return
+        ec2.delete_key_pair(KeyName=kp.id)
+        stats.record_deleted(f"Key pair {kp.id}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"Key pair {kp.id}", str(e))
+        return False
 
-    ff_dbs = [db for db in dbs
-              if db["DBInstanceIdentifier"].startswith(FLOWFORGE_PREFIX)]
 
+def cleanup_rds_instances(rds_client, inventory: Inventory,
+                          stats: CleanupStats):
+    """Delete RDS instances, then wait until they are gone."""
+    _log("\n" + _bold("--- RDS Instances ---"))
+    ff_dbs = inventory.resources("rds_instance")
     if not ff_dbs:
-        print("  No FlowForge RDS instances found.")
-    else:
-        for db in ff_dbs:
-            db_id = db["DBInstanceIdentifier"]
-            if db["DBInstanceStatus"] == "deleting":
-                stats.record_skipped(f"RDS {db_id}", "already deleting")
-                continue
-            try:
-                rds_client.delete_db_instance(
-                    DBInstanceIdentifier=db_id,
-                    SkipFinalSnapshot=True,
-                    DeleteAutomatedBackups=True,
-                )
-                stats.record_deleted(f"RDS instance {db_id}")
-            except ClientError as e:
-                stats.record_failed(f"RDS instance {db_id}", str(e))
-
-        # Wait for RDS deletions
-        print("  Waiting for RDS deletions (this may take several minutes)...")
-        for db in ff_dbs:
-            db_id = db["DBInstanceIdentifier"]
-            wait_for(
-                lambda _id=db_id: rds_client.describe_db_instances(
-                    DBInstanceIdentifier=_id),
-                lambda _: False,
-                f"RDS {db_id}",
-                timeout=900,
-                interval=30,
-            )
-
-    # Subnet groups
-    print("\n" + _bold("--- RDS Subnet Groups ---"))
+        _log("  No FlowForge RDS instances found.")
+        return
+
+    for db in ff_dbs:
+        if db.state == "deleting":
+            stats.record_skipped(f"RDS {db.id}", "already deleting")
+    yield from _call_all([(_delete_rds_instance, rds_client, db, stats)
+                          for db in ff_dbs if db.state != "deleting"])
+
+    # Wait for RDS deletions
+    _log("  Waiting for RDS deletions (this may take several minutes)...")
+    db_ids = [db.id for db in ff_dbs]
+    yield Wait(
+        "rds",
+        lambda ids: _rds_instances_present(rds_client, ids),
+        db_ids,
+        "RDS instance(s)",
+        lambda remaining: inventory.discard(
+            "rds_instance", [i for i in db_ids if i not in remaining]),
+        timeout=900,
+        interval=15,
+        max_interval=60,
+    )
+
+
+def _delete_rds_instance(rds_client, db: Resource, stats) -> bool:
     try:
-        sgs = rds_client.describe_db_subnet_groups().get("DBSubnetGroups", [])
-        ff_sgs = [sg for sg in sgs
-                  if sg["DBSubnetGroupName"].startswith(FLOWFORGE_PREFIX)]
-        if not ff_sgs:
-            print("  No FlowForge DB subnet groups found.")
-        for sg in ff_sgs:
-            try:
-                rds_client.delete_db_subnet_group(
-                    DBSubnetGroupName=sg["DBSubnetGroupName"])
-                stats.record_deleted(f"DB subnet group {sg['DBSubnetGroupName']}")
-            except ClientError as e:
-                stats.record_failed(
-                    f"DB subnet group {sg['DBSubnetGroupName']}", str(e))
-    except ClientError:
-        pass
+        rds_client.delete_db_instance(
+            DBInstanceIdentifier=db.id,
+            SkipFinalSnapshot=True,
+            DeleteAutomatedBackups=True,
+        )
+        stats.record_deleted(f"RDS instance {db.id}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"RDS instance {db.id}", str(e))
+        return False
+
+
+def _rds_instances_present(rds_client, db_ids: list) -> set:
+    """Return which of *db_ids* still exist, batching up to 100 per request."""
+    present = set()
+    for chunk in _batched(db_ids, 100):
+        for db in _paginate(
+                rds_client, "describe_db_instances", "DBInstances",
+                Filters=[{"Name": "db-instance-id", "Values": chunk}]):
+            present.add(db["DBInstanceIdentifier"])
+    return present
+
+
+def cleanup_rds_subnet_groups(rds_client, inventory: Inventory,
+                              stats: CleanupStats):
+    """Delete RDS subnet groups (requires their instances to be gone)."""
+    _log("\n" + _bold("--- RDS Subnet Groups ---"))
+    ff_sgs = inventory.resources("rds_subnet_group")
+    if not ff_sgs:
+        _log("  No FlowForge DB subnet groups found.")
+        return
+    yield from _delete_each(inventory, "rds_subnet_group", ff_sgs,
+                            _delete_db_subnet_group, rds_client, stats)
 
 
-def cleanup_nat_gateways(ec2, stats: CleanupStats):
-    """Delete NAT Gateways."""
-    print("\n" + _bold("--- NAT Gateways ---"))
-    nats = ec2.describe_nat_gateways(Filter=TAG_FILTER).get("NatGateways", [])
-    active_nats = [n for n in nats if n["State"] not in ("deleted", "deleting")]
+def _delete_db_subnet_group(rds_client, sg: Resource, stats) -> bool:
+    try:
+        rds_client.delete_db_subnet_group(DBSubnetGroupName=sg.id)
+        stats.record_deleted(f"DB subnet group {sg.id}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"DB subnet group {sg.id}", str(e))
+        return False
+
 
-    if not active_nats:
-        print("  No FlowForge NAT Gateways found.")
+def cleanup_nat_gateways(ec2, inventory: Inventory, stats: CleanupStats):
+    """Delete NAT Gateways, then wait until they are gone."""
+    _log("\n" + _bold("--- NAT Gateways ---"))
+    nats = inventory.resources("nat_gateway")
+    if not nats:
+        _log("  No FlowForge NAT Gateways found.")
         return
 
-    for nat in active_nats:
-        nat_id = nat["NatGatewayId"]
-        try:
-            ec2.delete_nat_gateway(NatGatewayId=nat_id)
-            stats.record_deleted(f"NAT Gateway {nat_id}")
-        except ClientError as e:
-            stats.record_failed(f"NAT Gateway {nat_id}", str(e))
+    yield from _call_all([(_delete_nat_gateway, ec2, nat, stats)
+                          for nat in nats if nat.state != "deleting"])
+
+    def done(remaining: set):
+        inventory.discard("nat_gateway",
+                          [nat_id for nat_id in nat_ids if nat_id not in remaining])
+        # Their Elastic IPs are now unassociated
+        inventory.invalidate("elastic_ip", [
+            alloc_id for nat in nats for alloc_id in nat.refs["allocation_ids"]])
 
     # Wait for NAT gateways to delete
-    print("  Waiting for NAT Gateways to delete...")
-    for nat in active_nats:
-        nat_id = nat["NatGatewayId"]
-        wait_for(
-            lambda _id=nat_id: ec2.describe_nat_gateways(
-                NatGatewayIds=[_id]),
-            lambda resp: all(
-                n["State"] == "deleted"
-                for n in resp.get("NatGateways", [])
-            ),
-            f"NAT Gateway {nat_id}",
-            timeout=300,
-            interval=15,
-        )
+    _log("  Waiting for NAT Gateways to delete...")
+    nat_ids = [nat.id for nat in nats]
+    yield Wait(
+        "ec2",
+        lambda ids: _nat_gateways_present(ec2, ids),
+        nat_ids,
+        "NAT Gateway(s)",
+        done,
+        timeout=300,
+        interval=5,
+        max_interval=30,
+    )
 
 
-def cleanup_elastic_ips(ec2, stats: CleanupStats):
-    """Release Elastic IPs."""
-    print("\n" + _bold("--- Elastic IPs ---"))
-    eips = ec2.describe_addresses(Filters=TAG_FILTER).get("Addresses", [])
-    if not eips:
-        print("  No FlowForge Elastic IPs found.")
-        return
-    for eip in eips:
-        alloc_id = eip.get("AllocationId")
-        try:
-            if eip.get("AssociationId"):
-                ec2.disassociate_address(AssociationId=eip["AssociationId"])
-            ec2.release_address(AllocationId=alloc_id)
-            stats.record_deleted(f"Elastic IP {eip.get('PublicIp')} ({alloc_id})")
-        except ClientError as e:
-            stats.record_failed(f"Elastic IP {alloc_id}", str(e))
+def _delete_nat_gateway(ec2, nat: Resource, stats) -> bool:
+    try:
+        ec2.delete_nat_gateway(NatGatewayId=nat.id)
+        stats.record_deleted(f"NAT Gateway {nat.id}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"NAT Gateway {nat.id}", str(e))
+        return False
 
 
-def cleanup_vpc_resources(ec2, stats: CleanupStats):
-    """Delete VPC and all sub-resources in dependency order."""
-    vpcs = ec2.describe_vpcs(Filters=TAG_FILTER).get("Vpcs", [])
-    if not vpcs:
-        print("\n" + _bold("--- VPC ---"))
-        print("  No FlowForge VPCs found.")
-        return
+def _nat_gateways_present(ec2, nat_ids: list) -> set:
+    """Return which of *nat_ids* are not yet in the "deleted" state."""
+    present = set()
+    # A filter (unlike NatGatewayIds=) does not fail on IDs that vanished
+    for chunk in _batched(nat_ids, 200):
+        for n in _paginate(
+                ec2, "describe_nat_gateways", "NatGateways",
+                Filter=[{"Name": "nat-gateway-id", "Values": chunk}]):
+            if n["State"] != "deleted":
+                present.add(n["NatGatewayId"])
+    return present
 
-    for vpc in vpcs:
-        vpc_id = vpc["VpcId"]
-        vpc_name = _get_tag(vpc.get("Tags", []), "Name") or vpc_id
-        print(f"\n" + _bold(f"--- VPC: {vpc_name} ({vpc_id}) ---"))
 
-        # 1. Delete security group rules (remove cross-references)
-        _cleanup_sg_rules(ec2, vpc_id, stats)
+def cleanup_elastic_ips(ec2, inventory: Inventory, stats: CleanupStats):
+    """Release Elastic IPs."""
+    _log("\n" + _bold("--- Elastic IPs ---"))
+    # Invalidated addresses are described again here
+    eips = yield from _call(inventory.resources, "elastic_ip")
+    if not eips:
+        _log("  No FlowForge Elastic IPs found.")
+        return
+    yield from _delete_each(inventory, "elastic_ip", eips, _release_address,
+                            ec2, stats)
 
-        # 2. Delete non-default security groups
-        _cleanup_security_groups(ec2, vpc_id, stats)
 
-        # 3. Delete custom NACLs
-        _cleanup_nacls(ec2, vpc_id, stats)
+def _release_address(ec2, eip: Resource, stats) -> bool:
+    try:
+        if eip.refs.get("association_id"):
+            ec2.disassociate_address(AssociationId=eip.refs["association_id"])
+        ec2.release_address(AllocationId=eip.id)
+        stats.record_deleted(f"Elastic IP {eip.name} ({eip.id})")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"Elastic IP {eip.id}", str(e))
+        return False
 
-        # 4. Delete route table associations & custom route tables
-        _cleanup_route_tables(ec2, vpc_id, stats)
 
-        # 5. Delete subnets
-        _cleanup_subnets(ec2, vpc_id, stats)
+def cleanup_vpc_resources(ec2, inventory: Inventory, stats: CleanupStats,
+                          workers: int = DEFAULT_WORKERS):
+    """Delete FlowForge VPCs and their sub-resources, several VPCs at a time.
 
-        # 6. Detach and delete Internet Gateways
-        _cleanup_igws(ec2, vpc_id, stats)
+    Within a VPC the security groups go in reference order (see
+    _security_group_plan()) while NACLs, route tables, subnets and internet
+    gateways are deleted concurrently; the VPC itself goes last.
+    """
+    _log("\n" + _bold("--- VPC ---"))
+    vpcs = inventory.resources("vpc")
+    if not vpcs:
+        _log("  No FlowForge VPCs found.")
+        return
+    yield Parallel([_teardown_vpc(ec2, inventory, vpc, stats) for vpc in vpcs],
+                   workers)
 
-        # 7. Delete the VPC
-        try:
-            ec2.delete_vpc(VpcId=vpc_id)
-            stats.record_deleted(f"VPC {vpc_name} ({vpc_id})")
-        except ClientError as e:
-            stats.record_failed(f"VPC {vpc_id}", str(e))
 
+def _teardown_vpc(ec2, inventory: Inventory, vpc: Resource,
+                  stats: CleanupStats):
+    _log(f"  Tearing down {vpc.name} ({vpc.id})")
+    children = [(kind, r) for kind in VPC_CHILD_DELETERS
+                for r in inventory.resources(kind, vpc.id)]
+    handles = []
+    for kind, r in children:
+        handles.append((yield Start(VPC_CHILD_DELETERS[kind], ec2, r, stats)))
+    yield from _cleanup_security_groups(ec2, inventory, vpc.id, stats)
+    results = yield Join(handles)
+    for (kind, r), ok in zip(children, results):
+        if ok:
+            inventory.discard(kind, [r.id])
 
-def _cleanup_sg_rules(ec2, vpc_id: str, stats: CleanupStats):
-    """Remove all ingress/egress rules from non-default SGs to break cross-references."""
-    sgs = ec2.describe_security_groups(
-        Filters=[{"Name": "vpc-id", "Values": [vpc_id]}]
-    ).get("SecurityGroups", [])
+    if (yield from _call(_delete_vpc, ec2, vpc, stats)):
+        inventory.discard("vpc", [vpc.id])
 
-    for sg in sgs:
-        if sg["GroupName"] == "default":
+
+def _delete_vpc(ec2, vpc: Resource, stats) -> bool:
+    try:
+        ec2.delete_vpc(VpcId=vpc.id)
+        stats.record_deleted(f"VPC {vpc.name} ({vpc.id})")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"VPC {vpc.id}", str(e))
+        return False
+
+
+def _security_group_plan(groups: list[Resource]) -> tuple[dict, list]:
+    """Return (revokes, levels) for deleting *groups*.
+
+    A group cannot be deleted while another group's rules reference it, so
+    a referencing group goes first. Only references inside a cycle -- a
+    strongly connected component of the reference graph -- need revoking:
+    revokes maps group ID -> the IDs whose rules to revoke. levels lists
+    the groups in deletion order, each level deletable concurrently.
+
+    >>> sg = lambda gid, *to: Resource("security_group", gid, refs={
+    ...     "ingress": [{"UserIdGroupPairs": [{"GroupId": t} for t in to]}],
+    ...     "egress": []})
+    >>> revokes, levels = _security_group_plan(
+    ...     [sg("a", "b"), sg("b", "a", "c"), sg("c", "c"), sg("d", "a")])
+    >>> revokes
+    {'a': {'b'}, 'b': {'a'}}
+    >>> [sorted(level) for level in levels]
+    [['b', 'd'], ['a', 'c']]
+    """
+    ids = {sg.id for sg in groups}
+    refs = {sg.id: _sg_referenced_ids(sg) & ids - {sg.id} for sg in groups}
+    component = {gid: i for i, scc in enumerate(_strongly_connected(refs))
+                  for gid in scc}
+    revokes = {gid: {r for r in to if component[r] == component[gid]}
+               for gid, to in refs.items()}
+    revokes = {gid: to for gid, to in revokes.items() if to}
+    # What is left of the graph is acyclic: peel off the unreferenced groups
+    remaining = {gid: to - revokes.get(gid, set()) for gid, to in refs.items()}
+    levels = []
+    while remaining:
+        referenced = {r for to in remaining.values() for r in to}
+        level = [gid for gid in remaining if gid not in referenced]
+        levels.append(level)
+        for gid in level:
+            del remaining[gid]
+    return revokes, levels
+
+
+def _sg_referenced_ids(sg: Resource) -> set:
+    return {pair["GroupId"]
+            for perm in sg.refs["ingress"] + sg.refs["egress"]
+            for pair in perm.get("UserIdGroupPairs", []) if "GroupId" in pair}
+
+
+def _strongly_connected(graph: dict) -> list[set]:
+    """Return the strongly connected components of *graph* (Tarjan)."""
+    index, low, on_stack = {}, {}, set()
+    stack, components = [], []
+    for root in graph:
+        if root in index:
             continue
-        sg_id = sg["GroupId"]
-        # Remove ingress rules
-        if sg.get("IpPermissions"):
+        # Iterative DFS: (node, iterator over its successors)
+        work = [(root, iter(graph[root]))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = low[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph[succ])))
+                    break
+                if succ in on_stack:
+                    low[node] = min(low[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def _rules_referencing(permissions: list, group_ids: set) -> list:
+    """Return the part of *permissions* that grants to one of *group_ids*."""
+    rules = []
+    for perm in permissions:
+        pairs = [{k: pair[k] for k in ("GroupId", "UserId") if k in pair}
+                 for pair in perm.get("UserIdGroupPairs", [])
+                 if pair.get("GroupId") in group_ids]
+        if pairs:
+            rule = {k: perm[k] for k in ("IpProtocol", "FromPort", "ToPort")
+                    if k in perm}
+            rules.append({**rule, "UserIdGroupPairs": pairs})
+    return rules
+
+
+def _revoke_group_references(ec2, sg: Resource, group_ids: set):
+    """Revoke *sg*'s rules that reference *group_ids*, ignoring failures."""
+    for direction, revoke in (("ingress", ec2.revoke_security_group_ingress),
+                              ("egress", ec2.revoke_security_group_egress)):
+        rules = _rules_referencing(sg.refs[direction], group_ids)
+        if rules:
             try:
-                ec2.revoke_security_group_ingress(
-                    GroupId=sg_id, IpPermissions=sg["IpPermissions"])
-            except ClientError:
-                pass
-        # Remove egress rules
-        if sg.get("IpPermissionsEgress"):
-            try:
-                ec2.revoke_security_group_egress(
-                    GroupId=sg_id, IpPermissions=sg["IpPermissionsEgress"])
+                revoke(GroupId=sg.id, IpPermissions=rules)
             except ClientError:
                 pass
 
 
-def _cleanup_security_groups(ec2, vpc_id: str, stats: CleanupStats):
-    """Delete non-default security groups."""
-    sgs = ec2.describe_security_groups(
-        Filters=[{"Name": "vpc-id", "Values": [vpc_id]}]
-    ).get("SecurityGroups", [])
+def _cleanup_security_groups(ec2, inventory: Inventory, vpc_id: str,
+                             stats: CleanupStats):
+    """Delete non-default security groups, referencing groups first."""
+    groups = {sg.id: sg for sg in inventory.resources("security_group", vpc_id)}
+    revokes, levels = _security_group_plan(list(groups.values()))
+    yield from _call_all([(_revoke_group_references, ec2, groups[gid],
+                           revokes[gid]) for gid in revokes])
+    for level in levels:
+        yield from _delete_each(inventory, "security_group",
+                                [groups[gid] for gid in level],
+                                _delete_security_group, ec2, stats)
 
-    for sg in sgs:
-        if sg["GroupName"] == "default":
-            continue
-        try:
-            ec2.delete_security_group(GroupId=sg["GroupId"])
-            stats.record_deleted(f"Security Group {sg['GroupName']} ({sg['GroupId']})")
-        except ClientError as e:
-            stats.record_failed(f"Security Group {sg['GroupId']}", str(e))
 
+def _delete_security_group(ec2, sg: Resource, stats) -> bool:
+    try:
+        ec2.delete_security_group(GroupId=sg.id)
+        stats.record_deleted(f"Security Group {sg.name} ({sg.id})")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"Security Group {sg.id}", str(e))
+        return False
 
-def _cleanup_nacls(ec2, vpc_id: str, stats: CleanupStats):
-    """Delete custom (non-default) NACLs."""
-    nacls = ec2.describe_network_acls(
-        Filters=[{"Name": "vpc-id", "Values": [vpc_id]}]
-    ).get("NetworkAcls", [])
 
-    for nacl in nacls:
-        if nacl["IsDefault"]:
-            continue
-        nacl_id = nacl["NetworkAclId"]
-        # Remove subnet associations first (move them back to default NACL)
-        for assoc in nacl.get("Associations", []):
+def _delete_nacl(ec2, nacl: Resource, stats) -> bool:
+    # Remove subnet associations first (move them back to default NACL)
+    if nacl.refs["default_acl_id"]:
+        for assoc_id in nacl.refs["association_ids"]:
             try:
-                # Find default NACL
-                default_nacl = next(
-                    n for n in nacls if n["IsDefault"])
                 ec2.replace_network_acl_association(
-                    AssociationId=assoc["NetworkAclAssociationId"],
-                    NetworkAclId=default_nacl["NetworkAclId"],
+                    AssociationId=assoc_id,
+                    NetworkAclId=nacl.refs["default_acl_id"],
                 )
-            except (ClientError, StopIteration):
+            except ClientError:
                 pass
-        try:
-            ec2.delete_network_acl(NetworkAclId=nacl_id)
-            stats.record_deleted(f"NACL {nacl_id}")
-        except ClientError as e:
-            stats.record_failed(f"NACL {nacl_id}", str(e))
+    try:
+        ec2.delete_network_acl(NetworkAclId=nacl.id)
+        stats.record_deleted(f"NACL {nacl.id}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"NACL {nacl.id}", str(e))
+        return False
 
 
-def _cleanup_route_tables(ec2, vpc_id: str, stats: CleanupStats):
-    """Delete custom route tables."""
-    rts = ec2.describe_route_tables(
-        Filters=[{"Name": "vpc-id", "Values": [vpc_id]}]
-    ).get("RouteTables", [])
+def _delete_route_table(ec2, rt: Resource, stats) -> bool:
+    for assoc_id in rt.refs["association_ids"]:
+        try:
+            ec2.disassociate_route_table(AssociationId=assoc_id)
+        except ClientError:
+            pass
+    try:
+        ec2.delete_route_table(RouteTableId=rt.id)
+        stats.record_deleted(f"Route table {rt.name or rt.id}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"Route table {rt.id}", str(e))
+        return False
+
 
-    for rt in rts:
-        rt_id = rt["RouteTableId"]
-        # Skip main route table (can't delete it directly)
-        is_main = any(a.get("Main", False)
-                      for a in rt.get("Associations", []))
-        if is_main:
-            continue
+def _delete_subnet(ec2, subnet: Resource, stats) -> bool:
+    try:
+        ec2.delete_subnet(SubnetId=subnet.id)
+        stats.record_deleted(f"Subnet {subnet.name} ({subnet.id})")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"Subnet {subnet.id}", str(e))
+        return False
 
-        # Remove associations
-        for assoc in rt.get("Associations", []):
-            if not assoc.get("Main", False):
-                try:
-                    ec2.disassociate_route_table(
-                        AssociationId=assoc["RouteTableAssociationId"])
-                except ClientError:
-                    pass
 
+def _delete_igw(ec2, igw: Resource, stats) -> bool:
+    try:
+        ec2.detach_internet_gateway(
+            InternetGatewayId=igw.id, VpcId=igw.vpc_id)
+        ec2.delete_internet_gateway(InternetGatewayId=igw.id)
+        stats.record_deleted(f"Internet Gateway {igw.id}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"Internet Gateway {igw.id}", str(e))
+        return False
+
+
+# VPC child kind -> deleter; none of them has to wait for another
+VPC_CHILD_DELETERS = {
+    "network_acl": _delete_nacl,
+    "route_table": _delete_route_table,
+    "subnet": _delete_subnet,
+    "internet_gateway": _delete_igw,
+}
+
+
+def cleanup_s3(s3_client, inventory: Inventory, stats: CleanupStats,
+               workers: int = DEFAULT_WORKERS):
+    """Empty and delete FlowForge S3 buckets, several buckets at a time."""
+    _log("\n" + _bold("--- S3 Buckets ---"))
+    buckets = inventory.resources("s3_bucket")
+    if not buckets:
+        _log("  No FlowForge S3 buckets found.")
+        return
+    # Each bucket keeps at most *window* 1000-key batches listed but not yet
+    # deleted, which bounds memory regardless of bucket size.
+    window = max(2, workers * 2 // S3_PARALLEL_BUCKETS)
+    results = yield Parallel([_delete_bucket(s3_client, bucket.id, window,
+                                             stats) for bucket in buckets],
+                             S3_PARALLEL_BUCKETS)
+    inventory.discard("s3_bucket",
+                      [b.id for b, ok in zip(buckets, results) if ok])
+
+
+def _delete_bucket(s3_client, name: str, window: int, stats: CleanupStats):
+    """Program: delete every object version and delete marker in *name*,
+    then the bucket; returns whether the bucket went."""
+    start = time.monotonic()
+    deleted = 0
+    pending = []
+    try:
+        # On unversioned buckets each object is listed as version "null",
+        # so one listing covers both cases. Listing again until a pass
+        # finds nothing catches versions a marker skipped while the
+        # previous pages were being deleted underneath it.
+        while True:
+            batches = _batched(_iter_object_versions(s3_client, name),
+                               S3_DELETE_BATCH)
+            listed = 0
+            while (keys := (yield from _call(next, batches, None))):
+                listed += 1
+                if len(pending) >= window:
+                    deleted += (yield Join([pending.pop(0)]))[0]
+                pending.append((yield Start(
+                    _delete_objects, s3_client, name, keys)))
+            deleted += sum((yield Join(pending)))
+            pending = []
+            if not listed:
+                break
+        elapsed = time.monotonic() - start
+        _log(f"  Emptied {name}: {deleted} objects in {elapsed:.1f}s "
+             f"({deleted / max(elapsed, 0.001):.0f} objects/s)")
+        yield from _call(_delete_empty_bucket, s3_client, name)
+        stats.record_deleted(f"S3 bucket {name}")
+        return True
+    except ClientError as e:
+        # Let the batches already sent finish before giving up on the bucket
         try:
-            ec2.delete_route_table(RouteTableId=rt_id)
-            stats.record_deleted(
-                f"Route table {_get_tag(rt.get('Tags', []), 'Name') or rt_id}")
-        except ClientError as e:
-            stats.record_failed(f"Route table {rt_id}", str(e))
+            yield Join(pending)
+        except ClientError:
+            pass
+        stats.record_failed(f"S3 bucket {name}", str(e))
+        return False
 
 
-def _cleanup_subnets(ec2, vpc_id: str, stats: CleanupStats):
-    """Delete subnets."""
-    subnets = ec2.describe_subnets(
-        Filters=[{"Name": "vpc-id", "Values": [vpc_id]}]
-    ).get("Subnets", [])
+def _delete_empty_bucket(s3_client, name: str):
+    s3_client.delete_bucket(Bucket=name)
 
-    for subnet in subnets:
-        subnet_id = subnet["SubnetId"]
-        name = _get_tag(subnet.get("Tags", []), "Name") or subnet["CidrBlock"]
-        try:
-            ec2.delete_subnet(SubnetId=subnet_id)
-            stats.record_deleted(f"Subnet {name} ({subnet_id})")
-        except ClientError as e:
-            stats.record_failed(f"Subnet {subnet_id}", str(e))
 
+def _iter_object_versions(s3_client, bucket: str):
+    """Yield {"Key", "VersionId"} for every version and delete marker, page by page."""
+    paginator = s3_client.get_paginator("list_object_versions")
+    for page in paginator.paginate(
+            Bucket=bucket, PaginationConfig={"PageSize": S3_DELETE_BATCH}):
+        for v in page.get("Versions", []) + page.get("DeleteMarkers", []):
+            yield {"Key": v["Key"], "VersionId": v["VersionId"]}
 
-def _cleanup_igws(ec2, vpc_id: str, stats: CleanupStats):
-    """Detach and delete Internet Gateways."""
-    igws = ec2.describe_internet_gateways(
-        Filters=[{"Name": "attachment.vpc-id", "Values": [vpc_id]}]
-    ).get("InternetGateways", [])
 
-    for igw in igws:
-        igw_id = igw["InternetGatewayId"]
-        try:
-            ec2.detach_internet_gateway(
-                InternetGatewayId=igw_id, VpcId=vpc_id)
-            ec2.delete_internet_gateway(InternetGatewayId=igw_id)
-            stats.record_deleted(f"Internet Gateway {igw_id}")
-        except ClientError as e:
-            stats.record_failed(f"Internet Gateway {igw_id}", str(e))
+def _delete_objects(s3_client, bucket: str, keys: list) -> int:
+    """Delete one batch of versions; raise ClientError if any key failed."""
+    resp = s3_client.delete_objects(
+        Bucket=bucket, Delete={"Objects": keys, "Quiet": True})
+    errors = resp.get("Errors", [])
+    if errors:
+        first = errors[0]
+        raise ClientError(
+            {"Error": {"Code": first.get("Code", "DeleteObjectsError"),
+                       "Message": f"{len(errors)} keys not deleted, e.g. "
+                                  f"{first.get('Key')}: {first.get('Message')}"}},
+            "DeleteObjects")
+    return len(keys)
 
 
-def cleanup_s3(s3_client, stats: CleanupStats):
-    """Empty and delete FlowForge S3 buckets."""
-    print("\n" + _bold("--- S3 Buckets ---"))
-    try:
-        buckets = s3_client.list_buckets().get("Buckets", [])
-    except ClientError:
-        print("  Could not list S3 buckets.")
+def cleanup_ecr(ecr_client, inventory: Inventory, stats: CleanupStats):
+    """Delete FlowForge ECR repositories."""
+    _log("\n" + _bold("--- ECR Repositories ---"))
+    repos = inventory.resources("ecr_repository")
+    if not repos:
+        _log("  No FlowForge ECR repositories found.")
         return
+    yield from _delete_each(inventory, "ecr_repository", repos,
+                            _delete_repository, ecr_client, stats)
 
-    ff_buckets = [b for b in buckets
-                  if b["Name"].startswith(FLOWFORGE_PREFIX)]
 
-    if not ff_buckets:
-        print("  No FlowForge S3 buckets found.")
-        return
+def _delete_repository(ecr_client, repo: Resource, stats) -> bool:
+    try:
+        ecr_client.delete_repository(repositoryName=repo.id, force=True)
+        stats.record_deleted(f"ECR repository {repo.id}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"ECR repository {repo.id}", str(e))
+        return False
+
+
+def cleanup_iam(iam_client, inventory: Inventory, stats: CleanupStats):
+    """Delete FlowForge IAM resources in dependency order.
+
+    Attachments and memberships come from the discovery snapshot, so each
+    principal costs only its own detach/delete calls.  Principals within a
+    stage are independent and are torn down in parallel.
+    """
+    _log("\n" + _bold("--- IAM Resources ---"))
+
+    stages = [
+        # Profiles release their roles; users leave their groups
+        [("iam_instance_profile", _delete_instance_profile),
+         ("iam_user", _delete_iam_user)],
+        [("iam_role", _delete_iam_role),
+         ("iam_group", _delete_iam_group)],
+        # Every FlowForge principal has detached its policies by now
+        [("iam_policy", _delete_iam_policy)],
+    ]
+    for stage in stages:
+        users = {u.id for u in inventory.resources("iam_user")}
+        for kind, delete in stage:
+            yield from _delete_each(inventory, kind, inventory.resources(kind),
+                                    delete, iam_client, stats)
+        deleted_users = users - {u.id for u in inventory.resources("iam_user")}
+        for group in inventory.resources("iam_group"):
+            group.refs["members"] = [
+                m for m in group.refs["members"] if m not in deleted_users]
+
+
+def _ignore_missing(call, **kwargs):
+    """Make *call*, treating an already-deleted target as success."""
+    try:
+        call(**kwargs)
+    except ClientError as e:
+        if _error_code(e) != "NoSuchEntity":
+            raise
 
-    s3_resource = boto3.resource("s3")
-    for bucket_info in ff_buckets:
-        name = bucket_info["Name"]
+
+def _delete_instance_profile(iam_client, ip: Resource, stats) -> bool:
+    for role_name in ip.refs["roles"]:
         try:
-            bucket = s3_resource.Bucket(name)
-            # Delete all objects (including versions)
-            bucket.object_versions.all().delete()
-            bucket.objects.all().delete()
-            # Delete the bucket
-            s3_client.delete_bucket(Bucket=name)
-            stats.record_deleted(f"S3 bucket {name}")
-        except ClientError as e:
-            stats.record_failed(f"S3 bucket {name}", str(e))
+            iam_client.remove_role_from_instance_profile(
+                InstanceProfileName=ip.id, RoleName=role_name)
+        except ClientError:
+            pass
+    try:
+        _ignore_missing(iam_client.delete_instance_profile,
+                        InstanceProfileName=ip.id)
+        stats.record_deleted(f"Instance profile {ip.id}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"Instance profile {ip.id}", str(e))
+        return False
 
 
-def cleanup_ecr(ecr_client, stats: CleanupStats):
-    """Delete FlowForge ECR repositories."""
-    print("\n" + _bold("--- ECR Repositories ---"))
+def _delete_iam_user(iam_client, user: Resource, stats) -> bool:
+    uname = user.id
     try:
-        repos = ecr_client.describe_repositories().get("repositories", [])
-    except ClientError:
-        print("  Could not list ECR repositories.")
-        return
+        for gname in user.refs["groups"]:
+            _ignore_missing(iam_client.remove_user_from_group,
+                            GroupName=gname, UserName=uname)
+        for arn in user.refs["attached_policies"]:
+            _ignore_missing(iam_client.detach_user_policy,
+                            UserName=uname, PolicyArn=arn)
+        for pol_name in user.refs["inline_policies"]:
+            _ignore_missing(iam_client.delete_user_policy,
+                            UserName=uname, PolicyName=pol_name)
+        # Access keys, login profiles and MFA devices are not in the snapshot
+        for key in _paginate(iam_client, "list_access_keys",
+                             "AccessKeyMetadata", UserName=uname):
+            iam_client.delete_access_key(
+                UserName=uname, AccessKeyId=key["AccessKeyId"])
+        try:
+            iam_client.delete_login_profile(UserName=uname)
+        except ClientError:
+            pass
+        try:
+            for mfa in _paginate(iam_client, "list_mfa_devices",
+                                 "MFADevices", UserName=uname):
+                iam_client.deactivate_mfa_device(
+                    UserName=uname, SerialNumber=mfa["SerialNumber"])
+                iam_client.delete_virtual_mfa_device(
+                    SerialNumber=mfa["SerialNumber"])
+        except ClientError:
+            pass
+        _ignore_missing(iam_client.delete_user, UserName=uname)
+        stats.record_deleted(f"IAM user {uname}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"IAM user {uname}", str(e))
+        return False
 
-    ff_repos = [r for r in repos
-                if r["repositoryName"].startswith(FLOWFORGE_PREFIX)
-                or r["repositoryName"].startswith(f"{FLOWFORGE_PREFIX}/")]
 
-    if not ff_repos:
-        print("  No FlowForge ECR repositories found.")
-        return
+def _delete_iam_role(iam_client, role: Resource, stats) -> bool:
+    role_name = role.id
+    try:
+        for arn in role.refs["attached_policies"]:
+            _ignore_missing(iam_client.detach_role_policy,
+                            RoleName=role_name, PolicyArn=arn)
+        for pol_name in role.refs["inline_policies"]:
+            _ignore_missing(iam_client.delete_role_policy,
+                            RoleName=role_name, PolicyName=pol_name)
+        _ignore_missing(iam_client.delete_role, RoleName=role_name)
+        stats.record_deleted(f"IAM role {role_name}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"IAM role {role_name}", str(e))
+        return False
 
-    for repo in ff_repos:
-        repo_name = repo["repositoryName"]
-        try:
-            ecr_client.delete_repository(
-                repositoryName=repo_name, force=True)
-            stats.record_deleted(f"ECR repository {repo_name}")
-        except ClientError as e:
-            stats.record_failed(f"ECR repository {repo_name}", str(e))
 
+def _delete_iam_group(iam_client, group: Resource, stats) -> bool:
+    gname = group.id
+    try:
+        # Members that are not FlowForge users stay behind in the account
+        for uname in group.refs["members"]:
+            _ignore_missing(iam_client.remove_user_from_group,
+                            GroupName=gname, UserName=uname)
+        for arn in group.refs["attached_policies"]:
+            _ignore_missing(iam_client.detach_group_policy,
+                            GroupName=gname, PolicyArn=arn)
+        for pol_name in group.refs["inline_policies"]:
+            _ignore_missing(iam_client.delete_group_policy,
+                            GroupName=gname, PolicyName=pol_name)
+        _ignore_missing(iam_client.delete_group, GroupName=gname)
+        stats.record_deleted(f"IAM group {gname}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"IAM group {gname}", str(e))
+        return False
 
-def cleanup_iam(iam_client, stats: CleanupStats):
-    """Delete FlowForge IAM resources in dependency order."""
-    print("\n" + _bold("--- IAM Resources ---"))
 
-    # Instance Profiles
+def _delete_iam_policy(iam_client, pol: Resource, stats) -> bool:
     try:
-        profiles = iam_client.list_instance_profiles().get(
-            "InstanceProfiles", [])
-        ff_profiles = [ip for ip in profiles
-                       if ip["InstanceProfileName"].startswith(FLOWFORGE_PREFIX)]
-        for ip in ff_profiles:
-            ip_name = ip["InstanceProfileName"]
-            # Remove roles from instance profile
-            for role in ip.get("Roles", []):
-                try:
-                    iam_client.remove_role_from_instance_profile(
-                        InstanceProfileName=ip_name,
-                        RoleName=role["RoleName"],
-                    )
-                except ClientError:
-                    pass
-            try:
-                iam_client.delete_instance_profile(
-                    InstanceProfileName=ip_name)
-                stats.record_deleted(f"Instance profile {ip_name}")
-            except ClientError as e:
-                stats.record_failed(f"Instance profile {ip_name}", str(e))
-    except ClientError:
-        pass
+        for version_id in pol.refs["versions"]:
+            _ignore_missing(iam_client.delete_policy_version,
+                            PolicyArn=pol.id, VersionId=version_id)
+        _ignore_missing(iam_client.delete_policy, PolicyArn=pol.id)
+        stats.record_deleted(f"IAM policy {pol.name}")
+        return True
+    except ClientError as e:
+        stats.record_failed(f"IAM policy {pol.name}", str(e))
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Cleanup scheduling
+# ---------------------------------------------------------------------------
 
-    # Roles
+def build_cleanup_graph(ec2, rds_client, s3_client, ecr_client, iam_client,
+                        inventory: Inventory, stats: CleanupStats,
+                        workers: int = DEFAULT_WORKERS,
+                        include_global: bool = True,
+                        phases=ALL_PHASES) -> dict:
+    """Return phase-name -> (program factory, prerequisite phase names).
+
+    The edges are the real AWS deletion constraints, not the historical
+    run order: instances release their ENIs and EIP associations, RDS
+    instances must be gone before their subnet groups, and the VPC phase
+    (SGs, NACLs, route tables, subnets, IGWs) needs all of those first.
+    S3, ECR and key pairs depend on nothing. The global S3 and IAM phases
+    are left out unless *include_global*, and only *phases* are kept
+    (edges to the others are dropped, as their resources are left alone).
+    """
+    graph = {
+        "ec2_instances": (
+            lambda: cleanup_ec2_instances(ec2, inventory, stats), ()),
+        "key_pairs": (lambda: cleanup_key_pairs(ec2, inventory, stats), ()),
+        "rds_instances": (
+            lambda: cleanup_rds_instances(rds_client, inventory, stats), ()),
+        "rds_subnet_groups": (
+            lambda: cleanup_rds_subnet_groups(rds_client, inventory, stats),
+            ("rds_instances",)),
+        "nat_gateways": (
+            lambda: cleanup_nat_gateways(ec2, inventory, stats), ()),
+        "elastic_ips": (
+            lambda: cleanup_elastic_ips(ec2, inventory, stats),
+            ("ec2_instances", "nat_gateways")),
+        "vpc": (
+            lambda: cleanup_vpc_resources(ec2, inventory, stats, workers),
+            ("ec2_instances", "rds_subnet_groups", "nat_gateways",
+             "elastic_ips")),
+        "ecr": (lambda: cleanup_ecr(ecr_client, inventory, stats), ()),
+    }
+    if include_global:
+        graph["s3"] = (
+            lambda: cleanup_s3(s3_client, inventory, stats, workers), ())
+        # Instance profiles cannot be removed while attached to an instance
+        graph["iam"] = (
+            lambda: cleanup_iam(iam_client, inventory, stats),
+            ("ec2_instances",))
+    return {name: (fn, tuple(d for d in deps if d in phases))
+            for name, (fn, deps) in graph.items() if name in phases}
+
+
+def run_cleanup_graph(graph: dict, stats: CleanupStats,
+                      workers: int = DEFAULT_WORKERS, region: str = "",
+                      journal: "Journal | None" = None, done=()):
+    """Run every phase in *graph* as soon as all of its prerequisites finish.
+
+    Independent branches run concurrently, so the total time approaches
+    the critical path rather than the sum of all phases. Each phase is
+    driven on a thread of its own, and its calls go to its service's pool
+    of *workers* threads, which every phase of that service shares: one
+    client never has more than *workers* calls in flight. A phase that
+    raises is recorded as failed and everything that depends on it is
+    skipped. Phases in *done* (finished by an earlier run, see Journal)
+    count as complete without running.
+    """
+    remaining, dependents = _plan_graph(graph, done)
+    running = {}
+    call_pools = {service: ThreadPoolExecutor(max_workers=workers)
+                  for service in {PHASE_SERVICES.get(name, name)
+                                  for name in graph}}
     try:
-        roles = iam_client.list_roles().get("Roles", [])
-        ff_roles = [r for r in roles
-                    if r["RoleName"].startswith(FLOWFORGE_PREFIX)]
-        for role in ff_roles:
-            role_name = role["RoleName"]
-            # Detach managed policies
-            attached = iam_client.list_attached_role_policies(
-                RoleName=role_name).get("AttachedPolicies", [])
-            for pol in attached:
-                iam_client.detach_role_policy(
-                    RoleName=role_name, PolicyArn=pol["PolicyArn"])
-            # Delete inline policies
-            inline = iam_client.list_role_policies(
-                RoleName=role_name).get("PolicyNames", [])
-            for pol_name in inline:
-                iam_client.delete_role_policy(
-                    RoleName=role_name, PolicyName=pol_name)
+        with ThreadPoolExecutor(max_workers=max(len(graph), 1)) as pool:
+            while remaining or running:
+                for name in [n for n, deps in remaining.items() if not deps]:
+                    del remaining[name]
+                    running[pool.submit(
+                        _run_phase, region, name, graph[name][0], journal,
+                        call_pools[PHASE_SERVICES.get(name, name)])] = name
+                if not running:
+                    raise ValueError(
+                        f"dependency cycle between phases {sorted(remaining)}")
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    _phase_finished(running.pop(future), future.exception(),
+                                    dependents, remaining, stats)
+    finally:
+        for call_pool in call_pools.values():
+            call_pool.shutdown()
+
+
+async def run_cleanup_graph_async(graph: dict, stats: CleanupStats,
+                                  engine: "AsyncEngine", region: str = "",
+                                  journal: "Journal | None" = None, done=()):
+    """run_cleanup_graph() with every phase a task on the running loop."""
+    remaining, dependents = _plan_graph(graph, done)
+    running = {}
+    while remaining or running:
+        for name in [n for n, deps in remaining.items() if not deps]:
+            del remaining[name]
+            running[asyncio.ensure_future(engine.run_phase(
+                region, name, graph[name][0], journal))] = name
+        if not running:
+            raise ValueError(
+                f"dependency cycle between phases {sorted(remaining)}")
+
+        finished, _ = await asyncio.wait(
+            running, return_when=asyncio.FIRST_COMPLETED)
+        for task in finished:
+            _phase_finished(running.pop(task), task.exception(),
+                            dependents, remaining, stats)
+
+
+def run_cleanup(clients: dict, inventories: dict, stats_by_region: dict,
+                journal: "Journal", home: str, phases=ALL_PHASES,
+                workers: int = DEFAULT_WORKERS, engine: str = "threads",
+                done_phases: dict | None = None, edges: dict | None = None):
+    """Delete the inventories of the regions in *stats_by_region*.
+
+    Regions run in parallel and, within each, the independent phases run
+    concurrently, on threads or on the asyncio *engine*. *edges* (region ->
+    phase -> the phases it waits for) overrides the phase order, as a plan
+    file does; *done_phases* lists each region's finished phases.
+    """
+    done_phases = done_phases or {}
+
+    def region_graph(region: str):
+        graph = build_cleanup_graph(
+            *clients[region], inventories[region], stats_by_region[region],
+            workers=workers, include_global=(region == home), phases=phases)
+        if edges is not None:
+            graph = {name: (fn, tuple(edges[region].get(name, deps)))
+                     for name, (fn, deps) in graph.items()}
+        journal.track(region, inventories[region])
+        return graph
+
+    if engine == "asyncio":
+        async def clean_all():
+            async_engine = AsyncEngine(workers, len(stats_by_region))
             try:
-                iam_client.delete_role(RoleName=role_name)
-                stats.record_deleted(f"IAM role {role_name}")
-            except ClientError as e:
-                stats.record_failed(f"IAM role {role_name}", str(e))
-    except ClientError:
-        pass
+                await asyncio.gather(*(
+                    run_cleanup_graph_async(
+                        region_graph(region), stats_by_region[region],
+                        async_engine, region=region, journal=journal,
+                        done=done_phases.get(region, ()))
+                    for region in stats_by_region))
+            finally:
+                async_engine.close()
+
+        asyncio.run(clean_all())
+    else:
+        def run_region(region: str):
+            run_cleanup_graph(region_graph(region), stats_by_region[region],
+                              workers=workers, region=region,
+                              journal=journal,
+                              done=done_phases.get(region, ()))
+
+        with ThreadPoolExecutor(max_workers=min(len(stats_by_region), workers)) as pool:
+            list(pool.map(run_region, stats_by_region))
+
+
+def _plan_graph(graph: dict, done) -> tuple[dict, dict]:
+    """Return (phase -> unfinished prerequisites, phase -> dependents)."""
+    remaining = {name: set(deps) for name, (_, deps) in graph.items()}
+    for name, deps in remaining.items():
+        unknown = deps - graph.keys()
+        if unknown:
+            raise ValueError(f"phase {name} depends on unknown {sorted(unknown)}")
+    dependents: dict[str, list[str]] = {name: [] for name in graph}
+    for name, deps in remaining.items():
+        for dep in deps:
+            dependents[dep].append(name)
+    for name in done:
+        if name in remaining:
+            del remaining[name]
+            for child in dependents[name]:
+                remaining.get(child, set()).discard(name)
+    return remaining, dependents
+
+
+def _phase_finished(name: str, exc, dependents: dict, remaining: dict,
+                    stats: CleanupStats):
+    if exc is None:
+        for child in dependents[name]:
+            if child in remaining:
+                remaining[child].discard(name)
+        return
+    stats.record_failed(f"Cleanup phase {name}", str(exc))
+    _skip_dependents(name, dependents, remaining, stats)
+
 
-    # Users
+@contextmanager
+def _recorded_phase(region: str, name: str, journal: "Journal | None" = None):
+    """Journal phase *name* of *region* and record its wall time.
+
+    The one place both engines (and discovery) mark a phase started,
+    completed or failed.
+    """
+    if journal is not None:
+        journal.phase(region, name, "started")
+    start = time.monotonic()
     try:
-        users = iam_client.list_users().get("Users", [])
-        ff_users = [u for u in users
-                    if u["UserName"].startswith(FLOWFORGE_PREFIX)]
-        for user in ff_users:
-            uname = user["UserName"]
-            # Remove from groups
-            groups = iam_client.list_groups_for_user(
-                UserName=uname).get("Groups", [])
-            for g in groups:
-                iam_client.remove_user_from_group(
-                    GroupName=g["GroupName"], UserName=uname)
-            # Delete access keys
-            keys = iam_client.list_access_keys(
-                UserName=uname).get("AccessKeyMetadata", [])
-            for key in keys:
-                iam_client.delete_access_key(
-                    UserName=uname, AccessKeyId=key["AccessKeyId"])
-            # Detach managed policies
-            attached = iam_client.list_attached_user_policies(
-                UserName=uname).get("AttachedPolicies", [])
-            for pol in attached:
-                iam_client.detach_user_policy(
-                    UserName=uname, PolicyArn=pol["PolicyArn"])
-            # Delete inline policies
-            inline = iam_client.list_user_policies(
-                UserName=uname).get("PolicyNames", [])
-            for pol_name in inline:
-                iam_client.delete_user_policy(
-                    UserName=uname, PolicyName=pol_name)
-            # Delete login profile if exists
-            try:
-                iam_client.delete_login_profile(UserName=uname)
-            except ClientError:
-                pass
-            # Delete MFA devices
+        yield
+    except BaseException:
+        _metrics.record_phase(region, name, time.monotonic() - start, "failed")
+        if journal is not None:
+            journal.phase(region, name, "failed")
+        raise
+    _metrics.record_phase(region, name, time.monotonic() - start, "ok")
+    if journal is not None:
+        journal.phase(region, name, "completed")
+
+
+def _run_phase(region: str, name: str, fn, journal: "Journal | None",
+               call_pool: ThreadPoolExecutor):
+    with _recorded_phase(region, name, journal):
+        _drive(fn(), call_pool)
+
+
+def _timed_phase(region: str, name: str, fn):
+    """Run *fn* and record its wall time as phase *name* of *region*."""
+    with _recorded_phase(region, name):
+        return fn()
+
+
+def _skip_dependents(name: str, dependents: dict, remaining: dict,
+                     stats: CleanupStats):
+    for child in dependents[name]:
+        if child in remaining:
+            del remaining[child]
+            stats.record_skipped(f"Cleanup phase {child}",
+                                 f"prerequisite {name} failed")
+            _skip_dependents(child, dependents, remaining, stats)
+
+
+# ---------------------------------------------------------------------------
+# asyncio engine
+# ---------------------------------------------------------------------------
+
+class AsyncEngine:
+    """Drives cleanup phase programs on one event loop (--engine asyncio).
+
+    Every call a program starts -- one resource's delete calls, one page
+    of a bucket listing, one poll of a wait -- is its own task. boto3 is
+    synchronous, so the call runs on a shared executor, within a
+    semaphore of *workers* slots per service and region -- per client --
+    which bounds the API requests in flight, not whole phases, and keeps
+    one busy service from starving the others. Waits between polls are
+    asyncio sleeps, so the RDS, NAT and instance waits of every region
+    overlap without holding a thread each.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, regions: int = 1):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers * regions * len(set(PHASE_SERVICES.values())))
+        self._budgets: dict[tuple, asyncio.Semaphore] = {}
+
+    async def call(self, service: str, fn, *args, region: str = ""):
+        """Run the blocking *fn(*args)* within the budget of *region*'s
+        *service* client."""
+        budget = self._budgets.setdefault(
+            (region, service), asyncio.Semaphore(self.workers))
+        async with budget:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, fn, *args)
+
+    async def run_phase(self, region: str, name: str, fn,
+                        journal: "Journal | None" = None):
+        with _recorded_phase(region, name, journal):
+            await self.drive(fn(), PHASE_SERVICES.get(name, name), region)
+
+    async def drive(self, program, service: str, region: str = ""):
+        """_drive() on the event loop: the calls of *program* go to
+        *region*'s *service* client."""
+        value = error = None
+        while True:
             try:
-                mfas = iam_client.list_mfa_devices(
-                    UserName=uname).get("MFADevices", [])
-                for mfa in mfas:
-                    iam_client.deactivate_mfa_device(
-                        UserName=uname,
-                        SerialNumber=mfa["SerialNumber"])
-                    iam_client.delete_virtual_mfa_device(
-                        SerialNumber=mfa["SerialNumber"])
-            except ClientError:
-                pass
+                step = (program.throw(error) if error is not None
+                        else program.send(value))
+            except StopIteration as stop:
+                return stop.value
+            value = error = None
             try:
-                iam_client.delete_user(UserName=uname)
-                stats.record_deleted(f"IAM user {uname}")
-            except ClientError as e:
-                stats.record_failed(f"IAM user {uname}", str(e))
-    except ClientError:
-        pass
+                if isinstance(step, Start):
+                    value = asyncio.ensure_future(self.call(
+                        service, step.fn, *step.args, region=region))
+                elif isinstance(step, Join):
+                    value = await self._gather(step.handles)
+                elif isinstance(step, Parallel):
+                    slots = asyncio.Semaphore(step.limit)
+                    value = await self._gather([
+                        self._limited(slots, p, service, region)
+                        for p in step.programs])
+                else:
+                    await step.run_async(
+                        lambda poll, *args: self.call(
+                            step.service, poll, *args, region=region))
+            except Exception as e:
+                error = e
+
+    async def _limited(self, slots: asyncio.Semaphore, program, service: str,
+                       region: str):
+        async with slots:
+            return await self.drive(program, service, region)
+
+    @staticmethod
+    async def _gather(awaitables) -> list:
+        """Await all of *awaitables*, then raise the first error, if any."""
+        results = await asyncio.gather(*awaitables, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
 
-    # Groups
-    try:
-        groups = iam_client.list_groups().get("Groups", [])
-        ff_groups = [g for g in groups
-                     if g["GroupName"].startswith(FLOWFORGE_PREFIX)
-                     or g["GroupName"] in ("deployers", "administrators")]
-        for group in ff_groups:
-            gname = group["GroupName"]
-            # Remove remaining users
-            members = iam_client.get_group(
-                GroupName=gname).get("Users", [])
-            for m in members:
+
+# ---------------------------------------------------------------------------
+# Journal
+# ---------------------------------------------------------------------------
+#
+# A cleanup run appends what it plans and what it finishes to a JSON Lines
+# journal: first the discovered inventory of every region, then each phase
+# starting and ending and each resource confirmed gone. A run that stops
+# part-way leaves the journal behind; the next run replays it instead of
+# discovering again, skips finished phases and re-describes only the
+# resources of phases that were in flight. A run with no failures deletes
+# its journal.
+
+DEFAULT_JOURNAL = ".aws-cleanup-journal.jsonl"
+
+
+@dataclass
+class JournalState:
+    """What an interrupted run had planned and finished."""
+
+    regions: list
+    resources: dict  # region -> [Resource] still to delete
+    phases: dict  # (region, phase) -> last status
+
+    def in_flight(self, region: str) -> list[str]:
+        """Phases of *region* that started but never finished."""
+        return [name for (r, name), status in self.phases.items()
+                if r == region and status == "started"]
+
+    def completed(self, region: str) -> list[str]:
+        return [name for (r, name), status in self.phases.items()
+                if r == region and status == "completed"]
+
+    def left_outside(self, phases) -> int:
+        """Count the planned resources still there that *phases* do not delete."""
+        return sum(1 for resources in self.resources.values()
+                   for r in resources if _PHASE_OF_KIND[r.kind] not in phases)
+
+
+class Journal:
+    """Append-only, flushed-per-record JSON Lines log of one cleanup run."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, path: str, regions: list, inventories: dict) -> "Journal":
+        """Start a new journal that plans the deletion of *inventories*."""
+        if os.path.exists(path):
+            os.remove(path)
+        journal = cls(path)
+        journal._write({"type": "run", "regions": regions})
+        for region, inventory in inventories.items():
+            journal._write({"type": "planned", "region": region,
+                            "resources": [asdict(r) for r in inventory]})
+        journal._sync()
+        return journal
+
+    @staticmethod
+    def load(path: str) -> JournalState | None:
+        """Replay the journal at *path*, or return None if there is none.
+
+        Lines that do not decode (the torn last write of a killed run) are
+        skipped. Raises ValueError if the run header or a region's plan
+        is missing, as nothing safe can be resumed from such a journal.
+        """
+        if not os.path.exists(path):
+            return None
+        state = None
+        planned = {}
+        with open(path) as f:
+            for line in f:
                 try:
-                    iam_client.remove_user_from_group(
-                        GroupName=gname, UserName=m["UserName"])
-                except ClientError:
-                    pass
-            # Detach policies
-            attached = iam_client.list_attached_group_policies(
-                GroupName=gname).get("AttachedPolicies", [])
-            for pol in attached:
-                iam_client.detach_group_policy(
-                    GroupName=gname, PolicyArn=pol["PolicyArn"])
-            # Delete inline policies
-            inline = iam_client.list_group_policies(
-                GroupName=gname).get("PolicyNames", [])
-            for pol_name in inline:
-                iam_client.delete_group_policy(
-                    GroupName=gname, PolicyName=pol_name)
+                    record = json.loads(line)
+                    kind = record["type"]
+                    if kind == "run":
+                        state = JournalState(record["regions"], {}, {})
+                    elif state is None:
+                        break
+                    elif kind == "planned":
+                        planned[record["region"]] = {
+                            (r["kind"], r["id"]): Resource(**r)
+                            for r in record["resources"]}
+                    elif kind == "phase":
+                        state.phases[record["region"], record["phase"]] = \
+                            record["status"]
+                    elif kind == "deleted" and record["region"] in planned:
+                        for rid in record["ids"]:
+                            planned[record["region"]].pop(
+                                (record["kind"], rid), None)
+                except (ValueError, TypeError, KeyError):
+                    continue
+        if state is None:
+            raise ValueError(f"{path} is unreadable (it has no run header)")
+        # create() writes every region's plan before anything is deleted
+        unplanned = [region for region in state.regions
+                     if region not in planned]
+        if unplanned:
+            raise ValueError(f"{path} is unreadable (the plan for "
+                             f"{', '.join(unplanned)} is missing)")
+        state.resources = {region: list(resources.values())
+                           for region, resources in planned.items()}
+        return state
+
+    def track(self, region: str, inventory: "Inventory"):
+        """Record every resource *inventory* discards as deleted."""
+        inventory.on_discard(
+            lambda kind, ids: self._write(
+                {"type": "deleted", "region": region, "kind": kind,
+                 "ids": ids}))
+
+    def phase(self, region: str, name: str, status: str):
+        """Record phase *name* of *region* as started, completed or failed."""
+        self._write({"type": "phase", "region": region, "phase": name,
+                     "status": status})
+        self._sync()
+
+    def _write(self, record: dict):
+        with self._lock:
+            self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._file.flush()
+
+    def _sync(self):
+        with self._lock:
+            os.fsync(self._file.fileno())
+
+    def close(self, remove: bool = False):
+        with self._lock:
+            self._file.close()
+        if remove:
+            os.remove(self.path)
+
+
+def _phase_finders(ec2, rds_client, s3_client, ecr_client, iam_client) -> dict:
+    """Return phase -> query that re-describes the kinds it deletes."""
+    return {
+        "ec2_instances": lambda: _find_ec2_instances(ec2),
+        "key_pairs": lambda: _find_key_pairs(ec2),
+        "rds_instances": lambda: _find_rds_instances(rds_client),
+        "rds_subnet_groups": lambda: _find_rds_subnet_groups(rds_client),
+        "nat_gateways": lambda: _find_nat_gateways(ec2),
+        "elastic_ips": lambda: _find_elastic_ips(ec2),
+        "vpc": lambda: _find_vpcs_and_children(ec2),
+        "s3": lambda: _find_s3_buckets(s3_client),
+        "ecr": lambda: _find_ecr_repositories(ecr_client),
+        "iam": lambda: [r for query in _discover_iam(iam_client)
+                        for r in query()],
+    }
+
+
+def _find_vpcs_and_children(ec2) -> list[Resource]:
+    vpcs = _find_vpcs(ec2)
+    return vpcs + _find_vpc_children(ec2, [vpc.id for vpc in vpcs])
+
+
+def resume_inventory(clients: tuple, state: JournalState, region: str,
+                     phases=ALL_PHASES) -> tuple[Inventory, set]:
+    """Rebuild *region*'s inventory from *state*; return it and its done phases.
+
+    Resources of phases that were in flight are described again (their
+    deletion may have finished, or be under way, since the journal last
+    heard of them). Completed phases with nothing left to delete are done.
+    Resources of phases outside *phases* are left out.
+    """
+    kinds = {kind for name in phases for kind in PHASE_KINDS[name]}
+    inventory = _new_inventory(clients[0])
+    for resource in state.resources.get(region, []):
+        if resource.kind in kinds:
+            inventory.add(resource)
+    finders = _phase_finders(*clients)
+    for name in state.in_flight(region):
+        if name in phases:
+            inventory.reconcile(PHASE_KINDS[name], finders[name]())
+    done = {name for name in state.completed(region)
+            if name in phases and not any(inventory.resources(kind)
+                                          for kind in PHASE_KINDS[name])}
+    return inventory, done
+
+
+# ---------------------------------------------------------------------------
+# Plan files
+# ---------------------------------------------------------------------------
+#
+# --plan writes what discovery found to a plan file, to be reviewed and
+# then run with --apply, which only re-describes the planned resources by
+# ID (check_drift()) instead of discovering again. A plan holds, per
+# region, the phase dependency edges and every resource with the state it
+# was in; resources created after the plan are not deleted by it.
+
+PLAN_VERSION = 1
+
+
+@dataclass
+class Plan:
+    """A reviewed cleanup: regions, phase edges and planned resources."""
+
+    regions: list
+    edges: dict  # region -> {phase: [phases it waits for]}
+    resources: dict  # region -> [Resource]
+
+    def write(self, path: str):
+        plan = {
+            "version": PLAN_VERSION,
+            "regions": self.regions,
+            "edges": self.edges,
+            # Tags are only used to find resources, not to delete them
+            "resources": {
+                region: [{k: v for k, v in asdict(r).items()
+                          if v and k != "tags"} for r in resources]
+                for region, resources in self.resources.items()},
+        }
+        _write_atomic(path, json.dumps(plan, separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "Plan":
+        """Read the plan at *path*; raise ValueError if it is unusable."""
+        with open(path) as f:
             try:
-                iam_client.delete_group(GroupName=gname)
-                stats.record_deleted(f"IAM group {gname}")
-            except ClientError as e:
-                stats.record_failed(f"IAM group {gname}", str(e))
-    except ClientError:
-        pass
+                plan = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path} is not a plan file: {e}") from None
+        if plan.get("version") != PLAN_VERSION:
+            raise ValueError(f"{path} is plan version {plan.get('version')}; "
+                             f"this script reads version {PLAN_VERSION}")
+        return cls(plan["regions"], plan["edges"], {
+            region: [Resource(**r) for r in resources]
+            for region, resources in plan["resources"].items()})
+
+
+def check_drift(clients: tuple, inventory: Inventory,
+                workers: int = DEFAULT_WORKERS) -> list[str]:
+    """Re-describe *inventory*'s resources and bring it up to date.
+
+    Kinds with an ID filter are described by ID, VPC children by their
+    planned VPCs' IDs, and S3 and IAM with their usual (single) listing
+    calls. Returns one line per resource that is gone or no longer in its
+    planned state.
+    """
+    ec2, rds_client, s3_client, ecr_client, iam_client = clients
+    planned = list(inventory)
+    kinds = {r.kind for r in planned}
+    hydrate = _tag_hydrators(ec2, rds_client, ecr_client)
+    # Key pairs are known by name here, not by the key-pair ID the tag
+    # index returns
+    hydrate["key_pair"] = lambda names: [
+        r for batch in _batched(names, EC2_FILTER_VALUES)
+        for r in _find_key_pairs(ec2, [{"Name": "key-name", "Values": batch}])]
+    queries = [lambda kind=kind: hydrate[kind](
+                   [r.id for r in planned if r.kind == kind])
+               for kind in kinds & hydrate.keys()]
+    queries += _vpc_child_queries(ec2, sorted(
+        {r.vpc_id for r in planned
+         if r.kind in PHASE_KINDS["vpc"] and r.kind != "vpc"}))
+    if "s3_bucket" in kinds:
+        queries.append(lambda: _find_s3_buckets(s3_client))
+    if kinds & set(PHASE_KINDS["iam"]):
+        queries += _discover_iam(iam_client)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        fresh = [r for found in pool.map(lambda query: query(), queries)
+                 for r in found]
+
+    inventory.reconcile(kinds, fresh)
+    current = {(r.kind, r.id): r for r in fresh}
+    drift = []
+    for r in planned:
+        now = current.get((r.kind, r.id))
+        if now is None:
+            drift.append(f"{r.kind} {r.label()}: gone")
+        elif now.state != r.state:
+            drift.append(f"{r.kind} {r.label()}: {r.state} -> {now.state}")
+    return drift
 
-    # Policies (customer-managed)
+
+# ---------------------------------------------------------------------------
+# Watch mode
+# ---------------------------------------------------------------------------
+#
+# --watch polls for leaked FlowForge resources instead of scanning once.
+# Each tick lists only IDs, from the cheapest views that show a resource
+# appearing or going away: the tag index of each region (one paginated
+# call, see tag_index()), the S3 bucket list, and the IAM snapshot. The
+# previous tick's IDs are kept in a state file, so only the differences
+# are reported, across restarts too.
+
+DEFAULT_WATCH_STATE = ".aws-cleanup-watch.json"
+WATCH_STATE_VERSION = 1
+
+# Kinds the tag index keeps listing for a while after they are gone
+# (terminated instances, deleted NAT gateways); their IDs are described
+# on every tick to drop those
+_LINGERING_KINDS = ("ec2_instance", "nat_gateway")
+
+
+def leak_view(clients: tuple, tagging_client, phases=ALL_PHASES,
+              include_global: bool = True) -> dict:
+    """Return kind -> sorted IDs of the FlowForge resources visible now."""
+    ec2, rds_client, s3_client, ecr_client, iam_client = clients
+    kinds = {kind for name in phases for kind in PHASE_KINDS[name]}
+    view = {}
+    if tagging_client is not None:
+        view.update((kind, ids) for kind, ids in tag_index(tagging_client).items()
+                    if kind in kinds and ids)
+        hydrate = _tag_hydrators(ec2, rds_client, ecr_client)
+        for kind in _LINGERING_KINDS:
+            if view.get(kind):
+                view[kind] = [r.id for r in hydrate[kind](view[kind])]
+    if include_global and "s3" in phases:
+        view["s3_bucket"] = [b["Name"] for b in _iter_s3_buckets(s3_client)]
+    if include_global and "iam" in phases:
+        for query in _discover_iam(iam_client):
+            for r in query():
+                view.setdefault(r.kind, []).append(r.id)
+    return {kind: sorted(ids) for kind, ids in view.items() if ids}
+
+
+def watch(clients: dict, tagging_clients: dict, home: str, interval: float,
+          state_path: str = DEFAULT_WATCH_STATE, phases=ALL_PHASES,
+          sink: EventSink | None = None, on_tick=None):
+    """Report resources that appear or disappear, every *interval* seconds.
+
+    Runs until interrupted. After each tick *on_tick* is called with
+    region -> kind -> IDs of everything currently visible. A tick that
+    fails with an API or connection error is reported and skipped; the
+    state stays as the last good tick left it.
+    """
+    previous = _load_watch_state(state_path)
+    while True:
+        started = time.monotonic()
+        try:
+            previous = _watch_tick(clients, tagging_clients, home, previous,
+                                   state_path, phases, sink, on_tick)
+        except (ClientError, EndpointConnectionError) as e:
+            print(_red(f"[{time.strftime('%H:%M:%S')}] Tick failed, trying "
+                       f"again in {interval:g}s: {e}"))
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def _watch_tick(clients: dict, tagging_clients: dict, home: str,
+                previous: dict, state_path: str, phases, sink, on_tick) -> dict:
+    """Report one tick's changes since *previous*; return the new views."""
+    with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        views = dict(zip(clients, pool.map(
+            lambda region: leak_view(
+                clients[region], tagging_clients.get(region), phases,
+                include_global=(region == home)),
+            clients)))
+    stamp = time.strftime("%H:%M:%S")
+    for region, view in views.items():
+        before = previous.get(region, {})
+        for kind in sorted(view.keys() | before.keys()):
+            now, was = set(view.get(kind, ())), set(before.get(kind, ()))
+            for outcome, ids in (("appeared", now - was),
+                                 ("disappeared", was - now)):
+                for rid in sorted(ids):
+                    colour = _yellow if outcome == "appeared" else _green
+                    print(colour(f"[{stamp}] {outcome.upper()}: "
+                                 f"{kind} {rid} ({region})"))
+                    if sink is not None:
+                        sink.write(CleanupEvent(outcome, f"{kind} {rid}",
+                                                region))
+    if sink is not None:
+        sink.flush()
+    if views != previous:
+        _write_atomic(state_path, json.dumps(
+            {"version": WATCH_STATE_VERSION, "resources": views},
+            separators=(",", ":")) + "\n")
+    if on_tick is not None:
+        on_tick(views)
+    return views
+
+
+def _load_watch_state(path: str) -> dict:
+    """The views of the last tick saved at *path*, or {} to start fresh."""
     try:
-        policies = iam_client.list_policies(Scope="Local").get("Policies", [])
-        ff_policies = [p for p in policies
-                       if p["PolicyName"].startswith("FlowForge")
-                       or p["PolicyName"].startswith(FLOWFORGE_PREFIX)]
-        for pol in ff_policies:
-            arn = pol["Arn"]
-            # Delete non-default versions
-            versions = iam_client.list_policy_versions(
-                PolicyArn=arn).get("Versions", [])
-            for v in versions:
-                if not v["IsDefaultVersion"]:
-                    iam_client.delete_policy_version(
-                        PolicyArn=arn, VersionId=v["VersionId"])
+        with open(path) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        _log(_yellow(f"Ignoring unreadable watch state {path}: {e}"))
+        return {}
+    if not isinstance(state, dict) or state.get("version") != WATCH_STATE_VERSION \
+            or not isinstance(state.get("resources"), dict):
+        _log(_yellow(f"Ignoring {path}: not a version {WATCH_STATE_VERSION} "
+                     "watch state; starting fresh"))
+        return {}
+    return state["resources"]
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+class RunMetrics:
+    """Thread-safe timings and API call counters for one run.
+
+    Clients passed to instrument() report every API call through botocore's
+    event hooks: its count, error responses, retries, throttled attempts and
+    a latency histogram per (service, region, operation). Cleanup phases and
+    wait_for() calls add their wall times. write_json() and
+    write_prometheus() export everything at the end of the run.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._api: dict[tuple, dict] = {}
+        self._phases: list[dict] = []
+        self._waits: list[dict] = []
+
+    def instrument(self, client):
+        service = client.meta.service_model.service_id.hyphenize()
+        region = client.meta.region_name
+        events = client.meta.events
+        events.register(f"before-call.{service}", self._before_call)
+        events.register(
+            f"after-call.{service}",
+            lambda **kw: self._after_call(service, region, **kw))
+        events.register(
+            f"needs-retry.{service}",
+            lambda **kw: self._needs_retry(service, region, **kw))
+
+    def _before_call(self, context, **_):
+        context["metrics_started"] = time.monotonic()
+
+    def _after_call(self, service, region, http_response, parsed, model,
+                    context, **_):
+        seconds = time.monotonic() - context.get("metrics_started",
+                                                 time.monotonic())
+        retries = parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        with self._lock:
+            call = self._call(service, region, model.name)
+            call["calls"] += 1
+            call["errors"] += http_response.status_code >= 300
+            call["retries"] += retries
+            call["seconds"] += seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    call["buckets"][i] += 1
+                    break
+            else:
+                call["buckets"][-1] += 1
+
+    def _needs_retry(self, service, region, operation, response=None, **_):
+        # Fires after every attempt; count the ones that were throttled
+        if response and _error_code_of(response[1]) in THROTTLE_CODES:
+            with self._lock:
+                self._call(service, region, operation.name)["throttles"] += 1
+
+    def _call(self, service, region, operation) -> dict:
+        key = (service, region, operation)
+        if key not in self._api:
+            self._api[key] = {
+                "calls": 0, "errors": 0, "retries": 0, "throttles": 0,
+                "seconds": 0.0, "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+            }
+        return self._api[key]
+
+    def record_phase(self, region: str, phase: str, seconds: float,
+                     outcome: str):
+        with self._lock:
+            self._phases.append({"region": region, "phase": phase,
+                                 "seconds": seconds, "outcome": outcome})
+
+    def record_wait(self, resource_name: str, seconds: float, count: int,
+                    left: int):
+        with self._lock:
+            self._waits.append({"resource": resource_name, "seconds": seconds,
+                                "count": count, "left": left})
+
+    def report(self, stats: "CleanupStats | None" = None) -> dict:
+        with self._lock:
+            api = [
+                {"service": s, "region": r, "operation": o, **call,
+                 "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"],
+                                     call["buckets"]))}
+                for (s, r, o), call in sorted(self._api.items())
+            ]
+            report = {
+                "started": self.started,
+                "seconds": time.time() - self.started,
+                "api_calls": api,
+                "phases": list(self._phases),
+                "waits": list(self._waits),
+            }
+        if stats is not None:
+            report["resources"] = {"deleted": stats.deleted,
+                                   "skipped": stats.skipped,
+                                   "failed": stats.failed}
+        return report
+
+    def write_json(self, path: str, stats: "CleanupStats | None" = None):
+        _write_atomic(path, json.dumps(self.report(stats), indent=2) + "\n")
+
+    def write_prometheus(self, path: str,
+                         stats: "CleanupStats | None" = None):
+        """Write the run in the node_exporter textfile collector format."""
+        report = self.report(stats)
+        p = "flowforge_cleanup"
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{p}_{name}{suffix}{_prom_labels(labels)} {value}")
+
+        api_labels = [({"service": c["service"], "region": c["region"],
+                        "operation": c["operation"]}, c)
+                      for c in report["api_calls"]]
+        for field_name, help_text in (
+                ("calls", "API calls made"),
+                ("errors", "API calls that returned an error"),
+                ("retries", "Retry attempts made by botocore"),
+                ("throttles", "Attempts rejected by AWS throttling")):
+            metric(f"api_{field_name}_total", "counter", help_text,
+                   [("", labels, c[field_name]) for labels, c in api_labels])
+
+        samples = []
+        for labels, c in api_labels:
+            cumulative = 0
+            for le, count in c["buckets"].items():
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": le}, cumulative))
+            samples.append(("_sum", labels, f"{c['seconds']:.6f}"))
+            samples.append(("_count", labels, c["calls"]))
+        metric("api_call_duration_seconds", "histogram",
+               "API call latency including retries", samples)
+
+        metric("phase_duration_seconds", "gauge",
+               "Wall time of each discovery and cleanup phase",
+               [("", {"region": ph["region"], "phase": ph["phase"],
+                      "outcome": ph["outcome"]}, f"{ph['seconds']:.3f}")
+                for ph in report["phases"]])
+
+        waits: dict[str, list] = {}
+        for w in report["waits"]:
+            total = waits.setdefault(w["resource"], [0, 0.0])
+            total[0] += 1
+            total[1] += w["seconds"]
+        metric("waits_total", "counter", "wait_for() calls",
+               [("", {"resource": r}, n) for r, (n, _) in waits.items()])
+        metric("wait_seconds_total", "counter", "Time spent in wait_for()",
+               [("", {"resource": r}, f"{s:.3f}")
+                for r, (_, s) in waits.items()])
+
+        if "resources" in report:
+            metric("resources", "gauge", "Resources by cleanup outcome",
+                   [("", {"outcome": k}, v)
+                    for k, v in report["resources"].items()])
+        metric("run_duration_seconds", "gauge", "Wall time of the run",
+               [("", {}, f"{report['seconds']:.3f}")])
+        metric("last_run_timestamp_seconds", "gauge",
+               "Unix time the run started",
+               [("", {}, f"{report['started']:.0f}")])
+        _write_atomic(path, "\n".join(lines) + "\n")
+
+
+def _error_code_of(parsed: dict) -> str:
+    return (parsed or {}).get("Error", {}).get("Code", "")
+
+
+def _prom_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_prom_escape(v)}"'
+                          for k, v in labels.items()) + "}"
+
+
+def _prom_escape(value) -> str:
+    return (str(value).replace("\\", "\\\\").replace('"', '\\"')
+            .replace("\n", "\\n"))
+
+
+def _write_atomic(path: str, text: str):
+    """Replace *path* in one step so scrapers never read a partial file."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# Shared by every client and phase of the run
+_metrics = RunMetrics()
+
+
+# ---------------------------------------------------------------------------
+# AWS clients
+# ---------------------------------------------------------------------------
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter.
+
+    Holds up to *burst* tokens and refills at *rate* tokens per second;
+    acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+def create_client(session, service: str, workers: int = DEFAULT_WORKERS):
+    """Create a *service* client tuned for *workers* concurrent callers.
+
+    Discovery, the drift check and both cleanup engines make at most
+    *workers* calls at a time on one client, so the connection pool holds
+    that many connections. Retries use botocore's adaptive mode, every
+    HTTP attempt, retries included, first takes a token from the
+    service's rate limiter, and every call is counted and timed in the
+    run metrics.
+    """
+    _load_boto()
+    config = Config(
+        max_pool_connections=workers,
+        retries={"mode": "adaptive", "max_attempts": 10},
+    )
+    client = session.client(service, config=config)
+    _metrics.instrument(client)
+    if service in SERVICE_RATE_LIMITS:
+        bucket = TokenBucket(*SERVICE_RATE_LIMITS[service])
+        client.meta.events.register(
+            f"before-send.{client.meta.service_model.service_id.hyphenize()}",
+            lambda **_: bucket.acquire())
+    return client
+
+
+# ---------------------------------------------------------------------------
+# Regions
+# ---------------------------------------------------------------------------
+
+# IAM and the S3 bucket listing are global: they are handled once, from this
+# region when it is selected and from the first selected region otherwise.
+GLOBAL_REGION = "us-east-1"
+
+
+def resolve_regions(requested: list[str]) -> list[str]:
+    """Expand --region values (names, comma-separated lists or "all")."""
+    names = [name.strip() for value in requested
+             for name in value.split(",") if name.strip()]
+    _load_boto()
+    if "all" in names:
+        ec2 = create_client(boto3.Session(region_name=GLOBAL_REGION), "ec2")
+        # Only regions enabled for this account
+        return sorted(r["RegionName"]
+                      for r in ec2.describe_regions()["Regions"])
+    # Region names are checked against botocore's bundled endpoint data,
+    # which needs no API call
+    known = set(boto3.Session().get_available_regions("ec2"))
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(f"unknown region {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def home_region(regions: list[str]) -> str:
+    """Return the region that handles the global services."""
+    return GLOBAL_REGION if GLOBAL_REGION in regions else regions[0]
+
+
+def create_clients(region: str, workers: int = DEFAULT_WORKERS,
+                   services=None) -> tuple:
+    """Return (ec2, rds, s3, ecr, iam) clients from a session for *region*.
+
+    Only *services* (all five by default) get a client; the others are None.
+    """
+    _load_boto()
+    session = boto3.Session(region_name=region)
+    return tuple(
+        create_client(session, service, workers)
+        if services is None or service in services else None
+        for service in ("ec2", "rds", "s3", "ecr", "iam"))
+
+
+def select_phases(only: list[str] | None, exclude: list[str] | None) -> set:
+    """Return the cleanup phases chosen by --only and --exclude.
+
+    >>> sorted(select_phases(["ec2,s3"], ["s3"]))
+    ['ec2_instances', 'key_pairs']
+    """
+    def names(values):
+        parsed = [name.strip() for value in values
+                  for name in value.split(",") if name.strip()]
+        unknown = [name for name in parsed if name not in RESOURCE_TYPES]
+        if unknown:
+            raise ValueError(f"unknown resource type {', '.join(unknown)}")
+        return parsed
+
+    selected = names(only) if only else list(RESOURCE_TYPES)
+    excluded = set(names(exclude or []))
+    return {phase for name in selected if name not in excluded
+            for phase in RESOURCE_TYPES[name]}
+
+
+def _exit_on_aws_error(exc: Exception, regions: list[str]):
+    """Explain a credentials, connection or API error and exit."""
+    if isinstance(exc, NoCredentialsError):
+        print(_red("ERROR: AWS credentials not configured."))
+        print("Configure credentials using one of:")
+        print("  1. aws configure")
+        print("  2. Set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY environment variables")
+        print("  3. Use an IAM instance profile (if running on EC2)")
+        print("\nSee: https://docs.aws.amazon.com/cli/latest/userguide/cli-configure-files.html")
+    elif isinstance(exc, EndpointConnectionError):
+        print(_red(f"ERROR: Cannot connect to AWS in region {', '.join(regions)}."))
+        print("Check your internet connection and region name.")
+    else:
+        print(_red(f"ERROR: AWS API error: {exc}"))
+    sys.exit(1)
+
+
+def _print_listing(inventory: Inventory, indent: str = "  "):
+    for category, items in inventory.listing().items():
+        print(f"{indent}{_bold(category)} ({len(items)}):")
+        for item in items:
+            print(f"{indent}  - {item}")
+
+
+def _watch_and_clean(args, clients: dict, home: str, phases, services: set):
+    """Run --watch until interrupted, cleaning up past --auto-clean."""
+    tagging_clients = {}
+    if services - {"s3", "iam"}:
+        tagging_clients = {
+            region: create_client(boto3.Session(region_name=region),
+                                  "resourcegroupstaggingapi", args.workers)
+            for region in clients}
+    sink = EventSink(args.events) if args.events else None
+
+    def clean(regions: list):
+        inventories = {
+            region: discover_resources(
+                *clients[region], region, workers=args.workers,
+                include_global=(region == home), phases=phases)
+            for region in regions}
+        journal = Journal.create(args.journal, regions, inventories)
+        stats_by_region = {
+            region: CleanupStats(region, sink=sink, echo=not args.quiet)
+            for region in regions if len(inventories[region])}
+        if stats_by_region:
+            run_cleanup(clients, inventories, stats_by_region, journal, home,
+                        phases, workers=args.workers, engine=args.engine)
+        stats = CleanupStats.merge(stats_by_region)
+        journal.close(remove=not stats.failed and not any(
+            len(inv) for inv in inventories.values()))
+        stats.print_summary()
+
+    # What the last cleanup was run for, so resources it could not delete
+    # do not trigger a full discovery on every tick
+    handled = set()
+    blocked = False
+
+    def on_tick(views: dict):
+        nonlocal blocked
+        seen = {(region, kind, rid) for region, view in views.items()
+                for kind, ids in view.items() for rid in ids}
+        new = seen - handled
+        if args.auto_clean is not None and len(new) >= args.auto_clean:
+            # Never overwrite the journal of a run that has not finished
+            if not args.fresh and os.path.exists(args.journal):
+                if not blocked:
+                    print(_yellow(f"\n{len(new)} FlowForge resources left, "
+                                  f"but not cleaning up: {args.journal} "
+                                  "holds an unfinished run. Resume it with a "
+                                  "run without --watch, or pass --fresh to "
+                                  "replace it."))
+                blocked = True
+                return
+            blocked = False
+            print(_yellow(f"\n{len(new)} FlowForge resources left since the "
+                          f"last cleanup (--auto-clean {args.auto_clean}); "
+                          "cleaning up..."))
             try:
-                iam_client.delete_policy(PolicyArn=arn)
-                stats.record_deleted(f"IAM policy {pol['PolicyName']}")
-            except ClientError as e:
-                stats.record_failed(f"IAM policy {pol['PolicyName']}", str(e))
-    except ClientError:
-        pass
+                clean(sorted({region for region, _, _ in new}))
+            except (ClientError, EndpointConnectionError) as e:
+                # Nothing is marked handled, so the next tick tries again
+                print(_red(f"Cleanup failed: {e}"))
+                return
+            handled.update(seen)
+
+    print(f"\nWatching every {args.watch:g}s (state in {args.watch_state}); "
+          "press Ctrl-C to stop.")
+    try:
+        watch(clients, tagging_clients, home, args.watch, args.watch_state,
+              phases, sink, on_tick)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    except (NoCredentialsError, EndpointConnectionError) as e:
+        _exit_on_aws_error(e, list(clients))
+    finally:
+        if sink is not None:
+            sink.close()
 
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def _rate_limit(value: str) -> tuple[str, tuple[float, int] | None]:
+    """Parse SERVICE=RATE[/BURST] (burst defaults to twice the rate; a
+    rate of 0 turns the service's limiter off).
+
+    >>> _rate_limit("iam=25")
+    ('iam', (25.0, 50))
+    >>> _rate_limit("ec2=10/30")
+    ('ec2', (10.0, 30))
+    >>> _rate_limit("s3=0")
+    ('s3', None)
+    """
+    service, _, limit = value.partition("=")
+    service = service.strip().lower()
+    if service not in SERVICE_RATE_LIMITS:
+        raise argparse.ArgumentTypeError(
+            f"unknown service {service!r} (expected one of "
+            f"{', '.join(SERVICE_RATE_LIMITS)})")
+    rate, _, burst = limit.partition("/")
+    try:
+        rate = float(rate)
+        burst = int(burst) if burst else max(1, int(rate * 2))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected SERVICE=RATE[/BURST], got {value!r}") from None
+    if rate < 0 or burst < 1:
+        raise argparse.ArgumentTypeError(
+            f"rate must be >= 0 and burst >= 1, got {value!r}")
+    return service, (rate, burst) if rate else None
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Clean up all FlowForge AWS resources created during the DevOps course.",
@@ -939,97 +3262,367 @@ def main():
     )
     parser.add_argument(
         "--region",
-        default="us-east-1",
-        help="AWS region (default: us-east-1)",
+        nargs="+",
+        default=["us-east-1"],
+        help="AWS region(s), space- or comma-separated, or 'all' for every "
+             "enabled region (default: us-east-1)",
     )
     parser.add_argument(
         "--force",
         action="store_true",
         help="Skip confirmation prompts",
     )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        metavar="TYPE",
+        help="Only discover and delete these resource types, space- or "
+             f"comma-separated ({', '.join(RESOURCE_TYPES)})",
+    )
+    parser.add_argument(
+        "--exclude",
+        nargs="+",
+        metavar="TYPE",
+        help="Leave these resource types alone",
+    )
+    parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=DEFAULT_WORKERS,
+        help="Maximum concurrent AWS API calls per service and region "
+             f"(default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=_rate_limit,
+        action="append",
+        default=[],
+        metavar="SERVICE=RATE[/BURST]",
+        help="Pace SERVICE's requests to RATE per second per region, with "
+             "bursts of up to BURST (default: twice RATE); 0 turns pacing "
+             "off. Repeatable (defaults: " + ", ".join(
+                 f"{s}={r:g}/{b}" for s, (r, b) in SERVICE_RATE_LIMITS.items())
+             + ")",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("threads", "asyncio"),
+        default="threads",
+        help="Make cleanup's API calls on thread pools, or as tasks on one "
+             "event loop, limited to --workers requests in flight per "
+             "service, whose waits hold no thread (default: threads)",
+    )
+    parser.add_argument(
+        "--discovery",
+        choices=("describe", "tags"),
+        default="describe",
+        help="How to find resources: filtered describe calls per service, "
+             "or the Resource Groups Tagging API index (only finds RDS, ECR "
+             "and EC2 resources tagged Project: FlowForge; default: describe)",
+    )
+    parser.add_argument(
+        "--journal",
+        metavar="PATH",
+        default=DEFAULT_JOURNAL,
+        help="Where to record progress so an interrupted run can resume "
+             f"(default: {DEFAULT_JOURNAL})",
+    )
+    parser.add_argument(
+        "--plan",
+        metavar="PATH",
+        help="Discover, list and write what would be deleted to a plan file "
+             "for a later --apply, without deleting anything",
+    )
+    parser.add_argument(
+        "--apply",
+        metavar="PATH",
+        help="Delete what a --plan run wrote to PATH, in its regions, after "
+             "re-checking only the planned resources for drift",
+    )
+    parser.add_argument(
+        "--watch",
+        type=float,
+        metavar="SECONDS",
+        help="Keep running and report FlowForge resources as they appear or "
+             "disappear, polling every SECONDS (regional resources are seen "
+             "through the tag index, so only tagged ones)",
+    )
+    parser.add_argument(
+        "--watch-state",
+        metavar="PATH",
+        default=DEFAULT_WATCH_STATE,
+        help="Where --watch keeps the resources it last saw "
+             f"(default: {DEFAULT_WATCH_STATE})",
+    )
+    parser.add_argument(
+        "--auto-clean",
+        type=int,
+        metavar="N",
+        help="With --watch, clean up without asking once N or more "
+             "FlowForge resources are seen",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Ignore an existing journal and discover everything again",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Print failures as they happen, not every deleted or skipped "
+             "resource",
+    )
+    parser.add_argument(
+        "--events",
+        metavar="PATH",
+        help="Write one JSON line per deleted, skipped or failed resource",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        metavar="PATH",
+        help="Write API call counts, latencies and phase timings as JSON",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        metavar="PATH",
+        help="Write the same metrics as a Prometheus textfile (*.prom)",
+    )
     args = parser.parse_args()
-
-    # Create AWS clients
+    plan = None
+    if args.plan and args.apply:
+        parser.error("--plan and --apply are separate runs")
+    if args.watch is not None and (args.plan or args.apply or args.dry_run):
+        parser.error("--watch cannot be combined with --plan, --apply or --dry-run")
+    if args.auto_clean is not None and args.watch is None:
+        parser.error("--auto-clean needs --watch")
+    if args.apply:
+        if args.only or args.exclude:
+            parser.error("--apply deletes the resource types of its plan; "
+                         "pass --only/--exclude to --plan instead")
+        try:
+            plan = Plan.load(args.apply)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        phases = {name for edges in plan.edges.values() for name in edges}
+    else:
+        try:
+            phases = select_phases(args.only, args.exclude)
+        except ValueError as e:
+            parser.error(str(e))
+        if not phases:
+            parser.error("--only and --exclude leave nothing to clean up")
+    services = {PHASE_SERVICES[name] for name in phases}
+    for service, limit in args.rate_limit:
+        if limit is None:
+            SERVICE_RATE_LIMITS.pop(service, None)
+        else:
+            SERVICE_RATE_LIMITS[service] = limit
+
+    def finish(code: int, stats: CleanupStats | None = None):
+        if args.metrics_json:
+            _metrics.write_json(args.metrics_json, stats)
+        if args.metrics_textfile:
+            _metrics.write_prometheus(args.metrics_textfile, stats)
+        sys.exit(code)
+
+    # Create AWS clients (one session per region), only for the services
+    # the selected resource types need. Credentials and connectivity are
+    # checked by the first real call, during discovery.
+    _load_boto()
     try:
-        session = boto3.Session(region_name=args.region)
-        ec2 = session.client("ec2")
-        rds_client = session.client("rds")
-        s3_client = session.client("s3")
-        ecr_client = session.client("ecr")
-        iam_client = session.client("iam")
-
-        # Quick connectivity test
-        ec2.describe_regions(RegionNames=[args.region])
-    except NoCredentialsError:
-        print(_red("ERROR: AWS credentials not configured."))
-        print("Configure credentials using one of:")
-        print("  1. aws configure")
-        print("  2. Set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY environment variables")
-        print("  3. Use an IAM instance profile (if running on EC2)")
-        print("\nSee: https://docs.aws.amazon.com/cli/latest/userguide/cli-configure-files.html")
-        sys.exit(1)
-    except EndpointConnectionError:
-        print(_red(f"ERROR: Cannot connect to AWS in region {args.region}."))
-        print("Check your internet connection and region name.")
-        sys.exit(1)
-    except ClientError as e:
-        print(_red(f"ERROR: AWS API error: {e}"))
-        sys.exit(1)
-
-    print(_bold(f"\nFlowForge AWS Cleanup -- Region: {args.region}"))
+        regions = plan.regions if plan else resolve_regions(args.region)
+    except ValueError as e:
+        parser.error(str(e))
+    except (NoCredentialsError, EndpointConnectionError, ClientError) as e:
+        _exit_on_aws_error(e, args.region)
+    home = home_region(regions)
+    clients = {
+        region: create_clients(region, args.workers,
+                               services if region == home
+                               else services - {"s3", "iam"})
+        for region in regions}
+
+    multi_region = len(regions) > 1
+    print(_bold(f"\nFlowForge AWS Cleanup -- "
+                f"Region{'s' if multi_region else ''}: {', '.join(regions)}"))
     print("=" * 60)
 
-    # Discover resources
-    print("\nDiscovering FlowForge resources...")
-    resources = discover_resources(
-        ec2, rds_client, s3_client, ecr_client, iam_client, args.region)
+    if args.watch is not None:
+        _watch_and_clean(args, clients, home, phases, services)
+        finish(0)
 
-    if not resources:
+    # Resume an interrupted run, if its journal is still around
+    resumed = None
+    if not (args.dry_run or args.fresh or args.plan or args.apply):
+        try:
+            resumed = Journal.load(args.journal)
+        except ValueError as e:
+            print(_red(f"ERROR: {e}."))
+            print("Delete it, or pass --fresh or another --journal.")
+            sys.exit(1)
+    if resumed is not None and resumed.regions != regions:
+        print(_red(f"ERROR: {args.journal} is from an interrupted run in "
+                   f"{', '.join(resumed.regions)}."))
+        print("Re-run with those regions to resume it, or pass --fresh.")
+        sys.exit(1)
+
+    done_phases = {region: set() for region in regions}
+    try:
+        if resumed is not None:
+            print(f"\nResuming the interrupted run recorded in {args.journal}...")
+            inventories = {}
+            for region in regions:
+                inventories[region], done_phases[region] = resume_inventory(
+                    clients[region], resumed, region, phases)
+                in_flight = [name for name in resumed.in_flight(region)
+                             if name in phases]
+                if in_flight:
+                    print(f"  Re-checked {', '.join(in_flight)} ({region})")
+                if done_phases[region]:
+                    print(f"  Skipping finished {', '.join(sorted(done_phases[region]))} "
+                          f"({region})")
+        elif plan is not None:
+            print(f"\nChecking the resources planned in {args.apply} for drift...")
+
+            def recheck(region: str):
+                inventory = _new_inventory(clients[region][0])
+                for resource in plan.resources.get(region, []):
+                    inventory.add(resource)
+                return inventory, check_drift(clients[region], inventory,
+                                              args.workers)
+
+            with ThreadPoolExecutor(max_workers=min(len(regions), args.workers)) as pool:
+                checked = dict(zip(regions, pool.map(recheck, regions)))
+            inventories = {region: inv for region, (inv, _) in checked.items()}
+            drifted = [(region, line) for region, (_, drift) in checked.items()
+                       for line in drift]
+            for region, line in drifted:
+                where = f" ({region})" if multi_region else ""
+                print(_yellow(f"  DRIFT: {line}{where}"))
+            if not drifted:
+                print("  No drift since the plan was written.")
+        else:
+            # Discover resources, all regions in parallel. The tag index
+            # only covers the regional services.
+            print("\nDiscovering FlowForge resources...")
+            tagging_clients = {}
+            if args.discovery == "tags" and services - {"s3", "iam"}:
+                tagging_clients = {
+                    region: create_client(boto3.Session(region_name=region),
+                                          "resourcegroupstaggingapi", args.workers)
+                    for region in regions}
+            with ThreadPoolExecutor(max_workers=min(len(regions), args.workers)) as pool:
+                futures = {
+                    region: pool.submit(
+                        _timed_phase, region, "discovery",
+                        lambda region=region: discover_resources(
+                            *clients[region], region, workers=args.workers,
+                            include_global=(region == home),
+                            tagging_client=tagging_clients.get(region),
+                            phases=phases))
+                    for region in regions
+                }
+                inventories = {region: f.result() for region, f in futures.items()}
+    except (NoCredentialsError, EndpointConnectionError, ClientError) as e:
+        # The first calls to use the credentials: an expired token or a
+        # missing permission is a ClientError
+        _exit_on_aws_error(e, regions)
+
+    # Write the plan, even an empty one, so a CI apply step always has one
+    if args.plan:
+        Plan(regions,
+             {region: {name: list(deps) for name, (_, deps)
+                       in build_cleanup_graph(
+                           *clients[region], inventories[region], None,
+                           include_global=(region == home),
+                           phases=phases).items()}
+              for region in regions},
+             {region: list(inventories[region]) for region in regions},
+             ).write(args.plan)
+
+    # Resource types a resumed run leaves out stay in its journal
+    left_outside = resumed.left_outside(phases) if resumed is not None else 0
+    total_count = sum(len(inv) for inv in inventories.values())
+    if not total_count:
+        if resumed is not None and not left_outside:
+            os.remove(args.journal)
         print(_green("\nNo FlowForge resources found. Nothing to clean up."))
-        sys.exit(0)
+        if left_outside:
+            print(f"{args.journal} still plans {left_outside} resources of "
+                  "types not selected; run without --only/--exclude to "
+                  "finish them.")
+        finish(0)
 
     # Display discovered resources
-    total_count = sum(len(v) for v in resources.values())
-    print(f"\nFound {_bold(str(total_count))} resources across "
-          f"{len(resources)} categories:\n")
-    for category, items in resources.items():
-        print(f"  {_bold(category)} ({len(items)}):")
-        for item in items:
-            print(f"    - {item}")
+    if multi_region:
+        active = [r for r in regions if len(inventories[r])]
+        print(f"\nFound {_bold(str(total_count))} resources across "
+              f"{len(active)} regions:\n")
+        for region in active:
+            print(f"  {_bold(region)} ({len(inventories[region])}):")
+            _print_listing(inventories[region], indent="    ")
+    else:
+        inventory = inventories[home]
+        print(f"\nFound {_bold(str(total_count))} resources across "
+              f"{len(inventory.listing())} categories:\n")
+        _print_listing(inventory)
+
+    if args.plan:
+        print(_yellow(f"\nPLAN: No resources were deleted. Wrote the plan to {args.plan}."))
+        print(f"Review it, then delete with --apply {args.plan}.")
+        finish(0)
 
     # Dry-run mode
     if args.dry_run:
         print(_yellow(f"\nDRY RUN: No resources were deleted."))
         print("Remove --dry-run to perform actual cleanup.")
-        sys.exit(0)
+        finish(0)
 
     # Confirm
     if not confirm_deletion(total_count, args.force):
         print(_yellow("\nCancelled. No resources were deleted."))
-        sys.exit(0)
-
-    # Execute cleanup in dependency order
-    stats = CleanupStats()
-
-    cleanup_ec2_instances(ec2, stats)
-    cleanup_key_pairs(ec2, stats)
-    cleanup_rds(rds_client, stats)
-    cleanup_nat_gateways(ec2, stats)
-    cleanup_elastic_ips(ec2, stats)
-    cleanup_vpc_resources(ec2, stats)
-    cleanup_s3(s3_client, stats)
-    cleanup_ecr(ecr_client, stats)
-    cleanup_iam(iam_client, stats)
+        finish(0)
 
+    # Execute cleanup: regions in parallel, and within each region the
+    # independent phases concurrently
+    sink = EventSink(args.events) if args.events else None
+    if resumed is not None:
+        journal = Journal(args.journal)
+    else:
+        journal = Journal.create(args.journal, regions, inventories)
+    stats_by_region = {
+        region: CleanupStats(region if multi_region else "", sink=sink,
+                             echo=not args.quiet)
+        for region in regions if len(inventories[region])
+    }
+
+    # A plan is applied in the order it was reviewed with
+    run_cleanup(clients, inventories, stats_by_region, journal, home, phases,
+                workers=args.workers, engine=args.engine,
+                done_phases=done_phases,
+                edges=plan.edges if plan is not None else None)
+    if sink is not None:
+        sink.close()
+
+    stats = CleanupStats.merge(stats_by_region)
+    # Deleted only once nothing it planned is left, in any phase
+    left = sum(len(inv) for inv in inventories.values()) + left_outside
+    journal.close(remove=not stats.failed and not left)
     stats.print_summary()
 
     if stats.failed:
-        print(_yellow("\nSome resources failed to delete. Re-run the script to retry."))
-        sys.exit(1)
+        print(_yellow("\nSome resources failed to delete. Re-run the script "
+                      f"to retry; it resumes from {args.journal}."))
+        finish(1, stats)
+    elif left:
+        print(_yellow(f"\n{left} planned resources are left (types not "
+                      "selected, or deletions still finishing). Re-run the "
+                      f"script to finish them; it resumes from {args.journal}."))
+        finish(0, stats)
     else:
         print(_green("\nAll FlowForge resources cleaned up successfully!"))
         print("Verify in the AWS Console: https://console.aws.amazon.com/")
-        sys.exit(0)
+        finish(0, stats)
 
 
 if __name__ == "__main__":
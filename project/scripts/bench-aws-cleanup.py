@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+bench-aws-cleanup.py -- Offline benchmarks for aws-cleanup.py
+
+Builds synthetic FlowForge estates of several sizes in a local moto server
+(no AWS account, no cost) and runs aws-cleanup.py's discovery and every
+cleanup phase against each one, reporting wall time, API calls and peak
+Python memory per phase. Results can be saved as a baseline and later runs
+compared against it to catch throughput regressions in discovery or
+deletion.
+
+Usage:
+    python bench-aws-cleanup.py                         # "small" estate
+    python bench-aws-cleanup.py --sizes small,medium    # Several sizes
+    python bench-aws-cleanup.py --save-baseline bench-baseline.json
+    python bench-aws-cleanup.py --baseline bench-baseline.json
+    python bench-aws-cleanup.py --sizes large --workers 16
+
+Estate sizes:
+    small   2 VPCs,  20 IAM roles,  2 buckets x 1k object versions,   5 ECR repos
+    medium 10 VPCs, 100 IAM roles,  2 buckets x 10k object versions, 50 ECR repos
+    large  50 VPCs, 500 IAM roles,  1 bucket x 100k object versions, 200 ECR repos
+
+Cleanup phases run one after another (in dependency order) so each one's
+time, calls and memory can be attributed to it; a real run overlaps them.
+Latency against moto is not AWS latency -- compare runs with each other,
+not with production.
+
+Requires: boto3 and moto[server] (pip install "moto[server]")
+
+Exit Codes:
+    0 - Benchmarks ran (and no regression against --baseline)
+    1 - A regression was found or resources were left behind
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import socket
+import sys
+import time
+import tracemalloc
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import boto3
+    from moto.server import ThreadedMotoServer
+except ImportError:
+    print("ERROR: boto3 and moto[server] are required.")
+    print('Install them with: pip install boto3 "moto[server]"')
+    sys.exit(1)
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+REGION = "us-east-1"
+
+# name -> estate dimensions
+ESTATE_SIZES = {
+    "small": {"vpcs": 2, "roles": 20, "buckets": 2, "versions": 1_000,
+              "repos": 5},
+    "medium": {"vpcs": 10, "roles": 100, "buckets": 2, "versions": 10_000,
+               "repos": 50},
+    "large": {"vpcs": 50, "roles": 500, "buckets": 1, "versions": 100_000,
+              "repos": 200},
+}
+
+# Relative slowdown (or extra API calls) tolerated before a phase is
+# reported as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Phases faster than this are too noisy for a relative time comparison
+MIN_COMPARED_SECONDS = 2.0
+
+# Concurrent requests used to build an estate
+BUILD_WORKERS = 16
+
+TAG = [{"Key": "Project", "Value": "FlowForge"}]
+
+
+def _load_cleanup_module():
+    """Import aws-cleanup.py (its file name is not a valid module name)."""
+    path = Path(__file__).with_name("aws-cleanup.py")
+    spec = importlib.util.spec_from_file_location("aws_cleanup", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+awsc = _load_cleanup_module()
+
+
+# ---------------------------------------------------------------------------
+# Estate builder
+# ---------------------------------------------------------------------------
+
+def _tags(resource_type: str, name: str) -> list:
+    return [{"ResourceType": resource_type,
+             "Tags": TAG + [{"Key": "Name", "Value": name}]}]
+
+
+def build_estate(dims: dict):
+    """Create a FlowForge estate with the given dimensions in REGION."""
+    session = boto3.Session(region_name=REGION)
+    ec2, rds, s3, ecr, iam = (session.client(s) for s in
+                              ("ec2", "rds", "s3", "ecr", "iam"))
+    with ThreadPoolExecutor(max_workers=BUILD_WORKERS) as pool:
+        subnets = list(pool.map(lambda v: _build_vpc(ec2, v),
+                                range(dims["vpcs"])))
+        _build_compute(ec2, rds, subnets[0])
+        list(pool.map(
+            lambda i: ecr.create_repository(repositoryName=f"flowforge/svc{i}"),
+            range(dims["repos"])))
+        _build_iam(iam, pool, dims["roles"])
+        for b in range(dims["buckets"]):
+            _build_bucket(s3, pool, f"flowforge-bench-{b}", dims["versions"])
+
+
+def _build_vpc(ec2, v: int) -> list:
+    """One VPC with the usual children; returns its two subnet IDs."""
+    vpc = ec2.create_vpc(CidrBlock=f"10.{v}.0.0/16",
+                         TagSpecifications=_tags("vpc", f"flowforge-vpc-{v}"))
+    vpc_id = vpc["Vpc"]["VpcId"]
+    subnets = [
+        ec2.create_subnet(VpcId=vpc_id, CidrBlock=f"10.{v}.{i}.0/24",
+                          TagSpecifications=_tags("subnet", "flowforge-subnet")
+                          )["Subnet"]["SubnetId"]
+        for i in (1, 2)
+    ]
+    igw = ec2.create_internet_gateway(
+        TagSpecifications=_tags("internet-gateway", "flowforge-igw"))
+    ec2.attach_internet_gateway(
+        InternetGatewayId=igw["InternetGateway"]["InternetGatewayId"],
+        VpcId=vpc_id)
+    rt = ec2.create_route_table(
+        VpcId=vpc_id, TagSpecifications=_tags("route-table", "flowforge-rt"))
+    ec2.associate_route_table(RouteTableId=rt["RouteTable"]["RouteTableId"],
+                              SubnetId=subnets[0])
+    ec2.create_network_acl(
+        VpcId=vpc_id, TagSpecifications=_tags("network-acl", "flowforge-acl"))
+    # Two groups that reference each other, and one referencing them
+    groups = [
+        ec2.create_security_group(
+            GroupName=f"flowforge-{role}-{v}", Description=role, VpcId=vpc_id,
+            TagSpecifications=_tags("security-group", f"flowforge-{role}")
+        )["GroupId"]
+        for role in ("api", "db", "worker")
+    ]
+    for target, source in ((0, 1), (1, 0), (2, 0)):
+        ec2.authorize_security_group_ingress(
+            GroupId=groups[target],
+            IpPermissions=[{"IpProtocol": "tcp", "FromPort": 5432,
+                            "ToPort": 5432,
+                            "UserIdGroupPairs": [{"GroupId": groups[source]}]}])
+    return subnets
+
+
+def _build_compute(ec2, rds, subnets: list):
+    image = ec2.describe_images()["Images"][0]["ImageId"]
+    instance = ec2.run_instances(
+        ImageId=image, MinCount=2, MaxCount=2, SubnetId=subnets[0],
+        TagSpecifications=_tags("instance", "flowforge-app"))
+    eip = ec2.allocate_address(Domain="vpc",
+                               TagSpecifications=_tags("elastic-ip", "flowforge-eip"))
+    ec2.associate_address(AllocationId=eip["AllocationId"],
+                          InstanceId=instance["Instances"][0]["InstanceId"])
+    nat_eip = ec2.allocate_address(Domain="vpc",
+                                   TagSpecifications=_tags("elastic-ip", "flowforge-nat"))
+    ec2.create_nat_gateway(SubnetId=subnets[0],
+                           AllocationId=nat_eip["AllocationId"],
+                           TagSpecifications=_tags("natgateway", "flowforge-nat"))
+    ec2.create_key_pair(KeyName="flowforge-key")
+    rds.create_db_subnet_group(DBSubnetGroupName="flowforge-db-subnets",
+                               DBSubnetGroupDescription="FlowForge",
+                               SubnetIds=subnets)
+    rds.create_db_instance(DBInstanceIdentifier="flowforge-db",
+                           DBInstanceClass="db.t3.micro", Engine="postgres",
+                           MasterUsername="flowforge",
+                           MasterUserPassword="benchmark-only",
+                           DBSubnetGroupName="flowforge-db-subnets",
+                           AllocatedStorage=20)
+
+
+def _build_iam(iam, pool, roles: int):
+    document = json.dumps({"Version": "2012-10-17", "Statement": [
+        {"Effect": "Allow", "Action": "s3:GetObject", "Resource": "*"}]})
+    trust = json.dumps({"Version": "2012-10-17", "Statement": [
+        {"Effect": "Allow", "Action": "sts:AssumeRole",
+         "Principal": {"Service": "ec2.amazonaws.com"}}]})
+    policy = iam.create_policy(PolicyName="FlowForgeBench",
+                               PolicyDocument=document)["Policy"]["Arn"]
+
+    def build_role(r: int):
+        name = f"flowforge-role-{r}"
+        iam.create_role(RoleName=name, AssumeRolePolicyDocument=trust)
+        iam.attach_role_policy(RoleName=name, PolicyArn=policy)
+        iam.put_role_policy(RoleName=name, PolicyName="inline",
+                            PolicyDocument=document)
+
+    list(pool.map(build_role, range(roles)))
+    iam.create_instance_profile(InstanceProfileName="flowforge-profile")
+    iam.add_role_to_instance_profile(InstanceProfileName="flowforge-profile",
+                                     RoleName="flowforge-role-0")
+    iam.create_group(GroupName="deployers")
+    iam.attach_group_policy(GroupName="deployers", PolicyArn=policy)
+    iam.create_user(UserName="flowforge-ci")
+    iam.add_user_to_group(GroupName="deployers", UserName="flowforge-ci")
+    iam.create_access_key(UserName="flowforge-ci")
+
+
+def _build_bucket(s3, pool, name: str, versions: int):
+    """A versioned bucket holding *versions* object versions (4 per key)."""
+    s3.create_bucket(Bucket=name)
+    s3.put_bucket_versioning(Bucket=name,
+                             VersioningConfiguration={"Status": "Enabled"})
+    list(pool.map(
+        lambda i: s3.put_object(Bucket=name, Key=f"logs/{i // 4}", Body=b"x"),
+        range(versions)))
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _api_totals() -> tuple[int, int]:
+    """Return (calls, throttled attempts) recorded so far by aws-cleanup."""
+    calls = awsc._metrics.report()["api_calls"]
+    return (sum(c["calls"] for c in calls),
+            sum(c["throttles"] for c in calls))
+
+
+def _measure(name: str, fn, quiet: bool) -> tuple[dict, object]:
+    """Run *fn* and return (its phase measurements, its result)."""
+    calls_before, throttles_before = _api_totals()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    output = io.StringIO() if quiet else sys.stdout
+    with contextlib.redirect_stdout(output):
+        result = fn()
+    seconds = time.perf_counter() - start
+    calls, throttles = _api_totals()
+    return {
+        "phase": name,
+        "seconds": round(seconds, 3),
+        "api_calls": calls - calls_before,
+        "throttles": throttles - throttles_before,
+        "peak_mib": round(tracemalloc.get_traced_memory()[1] / 2**20, 2),
+    }, result
+
+
+def _phase_order(graph: dict) -> list[str]:
+    """Return the cleanup phases in a dependency-respecting order."""
+    order, done = [], set()
+    while len(order) < len(graph):
+        for name, (_, deps) in graph.items():
+            if name not in done and set(deps) <= done:
+                order.append(name)
+                done.add(name)
+    return order
+
+
+def run_benchmark(size: str, workers: int, quiet: bool) -> dict:
+    """Build the *size* estate, then discover and clean it up phase by phase."""
+    dims = ESTATE_SIZES[size]
+    start = time.perf_counter()
+    build_estate(dims)
+    build_seconds = time.perf_counter() - start
+    print(f"  built estate in {build_seconds:.1f}s")
+
+    clients = awsc.create_clients(REGION, workers)
+    phases = []
+    tracemalloc.start()
+    try:
+        measured, inventory = _measure(
+            "discovery",
+            lambda: awsc.discover_resources(*clients, REGION, workers=workers),
+            quiet)
+        measured["resources"] = len(inventory)
+        phases.append(measured)
+
+        stats = awsc.CleanupStats()
+        graph = awsc.build_cleanup_graph(*clients, inventory, stats,
+                                         workers=workers)
+        for name in _phase_order(graph):
+            measured, _ = _measure(
+                name, lambda: awsc.run_phase(graph[name][0], workers), quiet)
+            phases.append(measured)
+    finally:
+        tracemalloc.stop()
+
+    leftover = awsc.discover_resources(*clients, REGION, workers=workers)
+    return {
+        "size": size,
+        "estate": dims,
+        "build_seconds": round(build_seconds, 1),
+        "phases": phases,
+        "total_seconds": round(sum(p["seconds"] for p in phases), 3),
+        "deleted": stats.deleted,
+        "failed": stats.failed,
+        "failures": stats.failures,
+        "leftover": [item for items in leftover.listing().values()
+                     for item in items],
+    }
+
+
+def print_result(result: dict):
+    print(f"  {'phase':<20} {'seconds':>9} {'API calls':>10} "
+          f"{'throttled':>10} {'peak MiB':>9}")
+    for p in result["phases"]:
+        print(f"  {p['phase']:<20} {p['seconds']:>9.3f} {p['api_calls']:>10} "
+              f"{p['throttles']:>10} {p['peak_mib']:>9.2f}")
+    print(f"  {'total':<20} {result['total_seconds']:>9.3f}")
+    print(f"  deleted {result['deleted']}, failed {result['failed']}, "
+          f"left behind {len(result['leftover'])}")
+    for item in result["failures"] + result["leftover"]:
+        print(f"    - {item}")
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list[str]:
+    """Return a description of every phase slower or chattier than baseline."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result["size"])
+        if base is None:
+            print(f"  no baseline for size {result['size']}")
+            continue
+        base_phases = {p["phase"]: p for p in base["phases"]}
+        for p in result["phases"]:
+            b = base_phases.get(p["phase"])
+            if b is None:
+                continue
+            where = f"{result['size']}/{p['phase']}"
+            if (max(p["seconds"], b["seconds"]) >= MIN_COMPARED_SECONDS
+                    and p["seconds"] > b["seconds"] * (1 + tolerance)):
+                regressions.append(f"{where}: {b['seconds']:.3f}s -> "
+                                   f"{p['seconds']:.3f}s")
+            if p["api_calls"] > b["api_calls"] * (1 + tolerance):
+                regressions.append(f"{where}: {b['api_calls']} -> "
+                                   f"{p['api_calls']} API calls")
+    return regressions
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark aws-cleanup.py against synthetic estates in moto.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument(
+        "--sizes",
+        default="small",
+        help=f"Comma-separated estate sizes: {', '.join(ESTATE_SIZES)} "
+             "(default: small)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=awsc.DEFAULT_WORKERS,
+        help=f"--workers passed to aws-cleanup (default: {awsc.DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="PATH",
+        help="Write the full results as JSON",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        metavar="PATH",
+        help="Store these results as the baseline for later comparisons",
+    )
+    parser.add_argument(
+        "--baseline",
+        metavar="PATH",
+        help="Compare against a stored baseline and fail on regressions",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed relative slowdown per phase (default: {DEFAULT_TOLERANCE})",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Show aws-cleanup's per-resource output",
+    )
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in ESTATE_SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    # Everything below talks to the local server only
+    port = _free_port()
+    os.environ.update({
+        "AWS_ENDPOINT_URL": f"http://127.0.0.1:{port}",
+        "AWS_ACCESS_KEY_ID": "bench",
+        "AWS_SECRET_ACCESS_KEY": "bench",
+        "AWS_DEFAULT_REGION": REGION,
+    })
+    os.environ.pop("AWS_PROFILE", None)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(port=port, verbose=False)
+    server.start()
+    results = []
+    try:
+        for size in sizes:
+            print(f"\n{size}: {ESTATE_SIZES[size]}")
+            results.append(run_benchmark(size, args.workers, not args.verbose))
+            print_result(results[-1])
+            # Each size starts from an empty account
+            urllib.request.urlopen(urllib.request.Request(
+                f"{os.environ['AWS_ENDPOINT_URL']}/moto-api/reset",
+                method="POST"))
+    finally:
+        server.stop()
+
+    by_size = {r["size"]: r for r in results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(by_size, indent=2) + "\n")
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(by_size, indent=2) + "\n")
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    failed = any(r["failed"] or r["leftover"] for r in results)
+    if args.baseline:
+        regressions = compare(
+            results, json.loads(Path(args.baseline).read_text()),
+            args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            failed = True
+        else:
+            print(f"\nNo regressions against {args.baseline} "
+                  f"(tolerance {args.tolerance:.0%})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Fixtures shared by the script tests.
+
+The scripts are run directly rather than installed, and their file names
+(aws-cleanup.py, seed-database.py) are not valid module names, so each is
+imported by path. Run the tests with:
+
+    python -m pytest project/scripts/tests
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parent.parent
+
+
+def load_script(filename: str, *requires: str):
+    """Import scripts/*filename*, skipping the test unless *requires* import."""
+    for package in requires:
+        pytest.importorskip(package)
+    name = filename.removesuffix(".py").replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def awsc():
+    """aws-cleanup.py (boto3 is only imported once a test needs AWS)."""
+    return load_script("aws-cleanup.py")
+
+
+@pytest.fixture(scope="session")
+def db_cleanup():
+    """cleanup.py"""
+    return load_script("cleanup.py", "psycopg2")
+
+
+@pytest.fixture(scope="session")
+def seed():
+    """seed-database.py"""
+    return load_script("seed-database.py", "psycopg2")
@@ -0,0 +1,192 @@
+"""Phase programs: both engines drive the same program the same way."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+
+class Boom(Exception):
+    pass
+
+
+@pytest.fixture(params=["threads", "asyncio"])
+def drive(request, awsc):
+    """Run phase program factory *fn* on the engine under test."""
+
+    def run(fn, workers=4):
+        if request.param == "threads":
+            return awsc.run_phase(fn, workers)
+
+        async def main():
+            engine = awsc.AsyncEngine(workers)
+            try:
+                return await engine.drive(fn(), "ec2")
+            finally:
+                engine.close()
+
+        return asyncio.run(main())
+
+    return run
+
+
+class _Calls:
+    """Blocking stand-in API call that tracks how many run at once."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.running = self.peak = self.finished = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, n):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.02)
+        with self._lock:
+            self.running -= 1
+            self.finished += 1
+        if n in self.fail:
+            raise Boom(n)
+        return n * n
+
+
+def test_results_come_back_in_order(awsc, drive):
+    call = _Calls()
+
+    def program():
+        squares = yield from awsc._call_all([(call, n) for n in range(6)])
+        halves = yield awsc.Parallel(
+            [awsc._call(call, n) for n in (3, 1, 2)], 2)
+        return squares, halves
+
+    assert drive(program) == ([0, 1, 4, 9, 16, 25], [9, 1, 4])
+
+
+def test_workers_bound_the_calls_in_flight(awsc, drive):
+    call = _Calls()
+
+    def program():
+        # Sub-programs share the bound: it is per call, not per program
+        yield awsc.Parallel([awsc._call_all([(call, n) for n in range(4)])
+                             for _ in range(3)], 3)
+
+    drive(program, workers=3)
+
+    assert call.finished == 12
+    assert 1 < call.peak <= 3
+
+
+def test_an_error_is_thrown_in_once_every_call_has_ended(awsc, drive):
+    call = _Calls(fail={2, 4})
+
+    def program():
+        try:
+            yield from awsc._call_all([(call, n) for n in range(6)])
+        except Boom as e:
+            return e.args[0], call.finished
+        return None
+
+    assert drive(program) == (2, 6)
+
+
+def test_an_uncaught_error_fails_the_phase(awsc, drive):
+    call = _Calls(fail={1})
+
+    def program():
+        yield from awsc._call(call, 1)
+
+    with pytest.raises(Boom):
+        drive(program)
+
+
+def test_wait_step_polls_until_gone(awsc, drive):
+    polls, finished = [], []
+
+    def present(ids):
+        polls.append(sorted(ids))
+        return set(ids) if len(polls) == 1 else set()
+
+    def program():
+        yield awsc.Wait("ec2", present, ["i-1", "i-2"], "instance(s)",
+                        finished.append, timeout=10, interval=0.01,
+                        max_interval=0.01)
+
+    drive(program)
+
+    assert polls == [["i-1", "i-2"], ["i-1", "i-2"]]
+    assert finished == [set()]
+
+
+@pytest.mark.parametrize("engine", ["threads", "asyncio"])
+def test_engines_journal_phases_alike(awsc, engine):
+    class Journal:
+        def __init__(self):
+            self.records = []
+
+        def track(self, region, inventory):
+            pass
+
+        def phase(self, region, name, status):
+            self.records.append((name, status))
+
+    def ok():
+        yield from awsc._call(time.sleep, 0)
+
+    def fail():
+        yield from awsc._call(_Calls(fail={0}), 0)
+
+    graph = {"key_pairs": (ok, ()), "ecr": (fail, ()),
+             "s3": (ok, ("ecr",))}
+    stats = awsc.CleanupStats()
+    journal = Journal()
+    if engine == "threads":
+        awsc.run_cleanup_graph(graph, stats, workers=2, journal=journal)
+    else:
+        async def main():
+            async_engine = awsc.AsyncEngine(2)
+            try:
+                await awsc.run_cleanup_graph_async(
+                    graph, stats, async_engine, journal=journal)
+            finally:
+                async_engine.close()
+
+        asyncio.run(main())
+
+    assert sorted(journal.records) == [
+        ("ecr", "failed"), ("ecr", "started"),
+        ("key_pairs", "completed"), ("key_pairs", "started")]
+    assert stats.failed == 1 and stats.skipped == 1
+
+
+@pytest.mark.parametrize("engine", ["threads", "asyncio"])
+def test_phases_of_one_service_share_its_workers(awsc, engine):
+    ec2, s3 = _Calls(), _Calls()
+
+    def calls(client):
+        def program():
+            yield from awsc._call_all([(client, n) for n in range(6)])
+            yield awsc.Wait("ec2", lambda ids: (client(0), set())[1],
+                            ["x"], "thing(s)", lambda remaining: None,
+                            interval=0.01)
+        return program
+
+    # Three EC2 phases at once still make at most two EC2 calls at a time
+    graph = {"key_pairs": (calls(ec2), ()), "nat_gateways": (calls(ec2), ()),
+             "elastic_ips": (calls(ec2), ()), "s3": (calls(s3), ())}
+    stats = awsc.CleanupStats()
+    if engine == "threads":
+        awsc.run_cleanup_graph(graph, stats, workers=2)
+    else:
+        async def main():
+            async_engine = awsc.AsyncEngine(2)
+            try:
+                await awsc.run_cleanup_graph_async(graph, stats, async_engine)
+            finally:
+                async_engine.close()
+
+        asyncio.run(main())
+
+    assert ec2.finished == 21 and s3.finished == 7
+    assert ec2.peak == 2 and s3.peak == 2
@@ -0,0 +1,113 @@
+"""Journal replay: what an interrupted aws-cleanup run resumes from."""
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def inventories(awsc):
+    east, west = awsc.Inventory(), awsc.Inventory()
+    for kind, rid in [("key_pair", "flowforge-key"),
+                      ("s3_bucket", "flowforge-logs"),
+                      ("iam_role", "flowforge-role")]:
+        east.add(awsc.Resource(kind, rid))
+    west.add(awsc.Resource("ecr_repository", "flowforge-api"))
+    return {"us-east-1": east, "us-west-2": west}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "journal.jsonl")
+
+
+def _interrupted_run(awsc, path, inventories):
+    """Write the journal of a run that stopped with "s3" in flight."""
+    journal = awsc.Journal.create(path, list(inventories), inventories)
+    journal.track("us-east-1", inventories["us-east-1"])
+    journal.phase("us-east-1", "key_pairs", "started")
+    inventories["us-east-1"].discard("key_pair", ["flowforge-key"])
+    journal.phase("us-east-1", "key_pairs", "completed")
+    journal.phase("us-east-1", "s3", "started")
+    journal.close()
+
+
+def test_missing_journal_loads_as_none(awsc, path):
+    assert awsc.Journal.load(path) is None
+
+
+def test_replay_drops_deleted_resources_and_tracks_phases(awsc, path,
+                                                          inventories):
+    _interrupted_run(awsc, path, inventories)
+
+    state = awsc.Journal.load(path)
+
+    assert state.regions == ["us-east-1", "us-west-2"]
+    assert sorted(r.id for r in state.resources["us-east-1"]) == [
+        "flowforge-logs", "flowforge-role"]
+    assert [r.id for r in state.resources["us-west-2"]] == ["flowforge-api"]
+    assert state.completed("us-east-1") == ["key_pairs"]
+    assert state.in_flight("us-east-1") == ["s3"]
+    assert state.in_flight("us-west-2") == []
+
+
+def test_replay_skips_a_torn_last_line(awsc, path, inventories):
+    _interrupted_run(awsc, path, inventories)
+    with open(path, "a") as f:
+        f.write('{"type":"deleted","region":"us-east-1","kind":"s3_bu')
+
+    state = awsc.Journal.load(path)
+
+    assert "flowforge-logs" in [r.id for r in state.resources["us-east-1"]]
+    assert state.in_flight("us-east-1") == ["s3"]
+
+
+@pytest.mark.parametrize("content", [
+    "",
+    '{"type":"ru',
+    '{"type":"phase","region":"us-east-1","phase":"s3","status":"started"}\n',
+])
+def test_journal_without_a_run_header_is_unreadable(awsc, path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+    with pytest.raises(ValueError, match="no run header"):
+        awsc.Journal.load(path)
+
+
+def test_journal_missing_a_regions_plan_is_unreadable(awsc, path):
+    with open(path, "w") as f:
+        f.write(json.dumps({"type": "run",
+                            "regions": ["us-east-1", "eu-west-1"]}) + "\n")
+        f.write(json.dumps({"type": "planned", "region": "us-east-1",
+                            "resources": []}) + "\n")
+
+    with pytest.raises(ValueError, match="plan for eu-west-1 is missing"):
+        awsc.Journal.load(path)
+
+
+def test_left_outside_counts_resources_of_unselected_phases(awsc, path,
+                                                            inventories):
+    _interrupted_run(awsc, path, inventories)
+    state = awsc.Journal.load(path)
+
+    assert state.left_outside(awsc.ALL_PHASES) == 0
+    assert state.left_outside({"iam"}) == 2  # the bucket and the repository
+    assert state.left_outside(set()) == 3
+
+
+def test_resume_skips_completed_phases_with_nothing_left(awsc, path,
+                                                         inventories):
+    _interrupted_run(awsc, path, inventories)
+    with open(path, "a") as f:
+        f.write(json.dumps({"type": "phase", "region": "us-east-1",
+                            "phase": "iam", "status": "completed"}) + "\n")
+    state = awsc.Journal.load(path)
+    clients = (None,) * 5
+
+    # No phase is in flight outside "s3", so nothing is described again
+    inventory, done = awsc.resume_inventory(
+        clients, state, "us-east-1", phases={"key_pairs", "iam"})
+
+    assert done == {"key_pairs"}  # iam completed, but its role is still there
+    assert [r.id for r in inventory] == ["flowforge-role"]
@@ -0,0 +1,66 @@
+"""main(): AWS errors end the run with a message and exit code 1."""
+
+import json
+import sys
+
+import pytest
+
+REGION = "us-east-1"
+
+
+@pytest.fixture
+def run_main(awsc, monkeypatch, tmp_path):
+    pytest.importorskip("boto3")
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        monkeypatch.setenv(name, "testing")
+    monkeypatch.chdir(tmp_path)
+    awsc._load_boto()
+
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["aws-cleanup.py", "--region", REGION,
+                                          "--force", *args])
+        with pytest.raises(SystemExit) as exit_info:
+            awsc.main()
+        return exit_info.value.code
+
+    return run
+
+
+def _expired(*args, **kwargs):
+    raise sys.modules["botocore.exceptions"].ClientError(
+        {"Error": {"Code": "ExpiredToken",
+                   "Message": "The security token included in the request "
+                              "is expired"}}, "DescribeInstances")
+
+
+def test_error_during_discovery(awsc, run_main, monkeypatch, capsys):
+    monkeypatch.setattr(awsc, "discover_resources", _expired)
+
+    assert run_main() == 1
+    assert "ERROR: AWS API error: An error occurred (ExpiredToken)" in (
+        capsys.readouterr().out)
+
+
+def test_error_while_resuming(awsc, run_main, monkeypatch, capsys, tmp_path):
+    with open(tmp_path / "journal.jsonl", "w") as f:
+        for record in ({"type": "run", "regions": [REGION]},
+                       {"type": "planned", "region": REGION,
+                        "resources": []},
+                       {"type": "phase", "region": REGION, "phase": "s3",
+                        "status": "started"}):
+            f.write(json.dumps(record) + "\n")
+    monkeypatch.setattr(awsc, "resume_inventory", _expired)
+
+    assert run_main("--journal", "journal.jsonl") == 1
+    assert "(ExpiredToken)" in capsys.readouterr().out
+    assert (tmp_path / "journal.jsonl").exists()
+
+
+def test_error_in_the_drift_check(awsc, run_main, monkeypatch, capsys,
+                                  tmp_path):
+    awsc.Plan([REGION], {REGION: {"key_pairs": []}}, {REGION: [
+        awsc.Resource("key_pair", "flowforge-key")]}).write("plan.json")
+    monkeypatch.setattr(awsc, "check_drift", _expired)
+
+    assert run_main("--apply", "plan.json") == 1
+    assert "(ExpiredToken)" in capsys.readouterr().out
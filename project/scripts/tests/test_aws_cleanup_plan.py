@@ -0,0 +1,101 @@
+"""Plan files: what --plan writes is what --apply reads and re-checks."""
+
+import json
+
+import pytest
+
+REGION = "us-east-1"
+
+
+@pytest.fixture
+def plan(awsc):
+    return awsc.Plan(
+        [REGION],
+        {REGION: {"ec2_instances": [], "vpc": ["ec2_instances"]}},
+        {REGION: [
+            awsc.Resource("ec2_instance", "i-0abc", name="flowforge-api",
+                          state="running", tags={"Project": "FlowForge"}),
+            awsc.Resource("subnet", "subnet-1", vpc_id="vpc-1",
+                          refs={"cidr": "10.0.1.0/24"}),
+        ]})
+
+
+def test_plan_round_trip(awsc, plan, tmp_path):
+    path = str(tmp_path / "plan.json")
+    plan.write(path)
+
+    loaded = awsc.Plan.load(path)
+
+    assert loaded.regions == plan.regions
+    assert loaded.edges == plan.edges
+    instance, subnet = loaded.resources[REGION]
+    # Tags only serve discovery, so the plan leaves them out
+    assert instance == awsc.Resource("ec2_instance", "i-0abc",
+                                     name="flowforge-api", state="running")
+    assert subnet == plan.resources[REGION][1]
+
+
+def test_plan_file_is_compact(plan, tmp_path):
+    path = tmp_path / "plan.json"
+    plan.write(str(path))
+
+    text = path.read_text()
+
+    assert text.count("\n") == 1 and ": " not in text
+    [instance, subnet] = json.loads(text)["resources"][REGION]
+    assert "tags" not in instance and "vpc_id" not in instance
+    assert "state" not in subnet
+
+
+@pytest.mark.parametrize("content, message", [
+    ("{not json", "is not a plan file"),
+    ('{"version": 99}', "plan version 99"),
+    ("{}", "plan version None"),
+])
+def test_unusable_plan_files_are_rejected(awsc, tmp_path, content, message):
+    path = tmp_path / "plan.json"
+    path.write_text(content)
+
+    with pytest.raises(ValueError, match=message):
+        awsc.Plan.load(str(path))
+
+
+def test_check_drift_reports_gone_and_changed_resources(awsc, monkeypatch):
+    pytest.importorskip("boto3")
+    moto = pytest.importorskip("moto")
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        monkeypatch.setenv(name, "testing")
+    monkeypatch.delenv("AWS_ENDPOINT_URL", raising=False)
+    awsc._load_boto()
+
+    with moto.mock_aws():
+        clients = awsc.create_clients(REGION)
+        ec2, _, s3_client, _, _ = clients
+        image = ec2.describe_images()["Images"][0]["ImageId"]
+        [instance] = ec2.run_instances(
+            ImageId=image, MinCount=1, MaxCount=1,
+            TagSpecifications=[{"ResourceType": "instance", "Tags": [
+                {"Key": "Project", "Value": "FlowForge"}]}])["Instances"]
+        ec2.create_key_pair(KeyName="flowforge-key")
+        s3_client.create_bucket(Bucket="flowforge-logs")
+        s3_client.create_bucket(Bucket="someone-elses")
+        planned = awsc.discover_resources(*clients, REGION, workers=2)
+
+        ec2.stop_instances(InstanceIds=[instance["InstanceId"]])
+        s3_client.delete_bucket(Bucket="flowforge-logs")
+        s3_client.create_bucket(Bucket="flowforge-new")
+        inventory = awsc._new_inventory(ec2)
+        for resource in planned:
+            inventory.add(resource)
+        drift = awsc.check_drift(clients, inventory, workers=2)
+
+    [planned_instance] = planned.resources("ec2_instance")
+    assert sorted(drift) == [
+        f"ec2_instance {planned_instance.label()}: running -> stopped",
+        "s3_bucket flowforge-logs: gone"]
+    # Gone resources leave the inventory; ones created since are not added
+    assert [r.id for r in inventory.resources("s3_bucket")] == []
+    assert [r.state for r in inventory.resources("ec2_instance")] == [
+        "stopped"]
+    assert [r.id for r in inventory.resources("key_pair")] == [
+        "flowforge-key"]
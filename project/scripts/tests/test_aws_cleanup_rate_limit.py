@@ -0,0 +1,49 @@
+"""--rate-limit: per-service request pacing is configurable."""
+
+import argparse
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize("value", ["sqs=5", "iam", "iam=fast", "iam=-1",
+                                   "iam=5/0"])
+def test_rejects_bad_limits(awsc, value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        awsc._rate_limit(value)
+
+
+def test_main_applies_limits_before_creating_clients(awsc, monkeypatch,
+                                                     tmp_path):
+    pytest.importorskip("boto3")
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        monkeypatch.setenv(name, "testing")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(awsc, "SERVICE_RATE_LIMITS",
+                        dict(awsc.SERVICE_RATE_LIMITS))
+    buckets = []
+
+    class Bucket:
+        def __init__(self, rate, burst):
+            buckets.append((rate, burst))
+
+        def acquire(self):
+            pass
+
+    def stop(*args, **kwargs):
+        raise SystemExit(0)
+
+    monkeypatch.setattr(awsc, "TokenBucket", Bucket)
+    monkeypatch.setattr(awsc, "discover_resources", stop)
+    monkeypatch.setattr(sys, "argv", [
+        "aws-cleanup.py", "--region", "us-east-1", "--force",
+        "--only", "iam,ec2", "--rate-limit", "iam=50/80",
+        "--rate-limit", "ec2=0"])
+
+    with pytest.raises(SystemExit):
+        awsc.main()
+
+    assert awsc.SERVICE_RATE_LIMITS["iam"] == (50.0, 80)
+    assert "ec2" not in awsc.SERVICE_RATE_LIMITS
+    # Only IAM's client is paced
+    assert buckets == [(50.0, 80)]
@@ -0,0 +1,121 @@
+"""Security-group teardown plan: reference cycles and deletion levels."""
+
+import random
+
+import pytest
+
+
+def _sg(awsc, gid, *references, other_pairs=()):
+    pairs = [{"GroupId": ref, "UserId": "123456789012"} for ref in references]
+    return awsc.Resource("security_group", gid, refs={
+        "ingress": [{"IpProtocol": "tcp", "FromPort": 5432, "ToPort": 5432,
+                     "UserIdGroupPairs": pairs + list(other_pairs)}],
+        "egress": [{"IpProtocol": "-1",
+                    "IpRanges": [{"CidrIp": "0.0.0.0/0"}]}]})
+
+
+def _reachable(graph, start):
+    seen, todo = set(), [start]
+    while todo:
+        for succ in graph[todo.pop()]:
+            if succ not in seen:
+                seen.add(succ)
+                todo.append(succ)
+    return seen
+
+
+def _check_plan(groups, revokes, levels):
+    """Each group is deleted once, after every group still referencing it."""
+    order = {gid: i for i, level in enumerate(levels) for gid in level}
+    assert sorted(order) == sorted(groups)
+    for gid, refs in groups.items():
+        for ref in refs - revokes.get(gid, set()) - {gid}:
+            if ref in groups:
+                assert order[gid] < order[ref], (gid, ref)
+
+
+def test_strongly_connected_components(awsc):
+    graph = {"a": {"b"}, "b": {"c"}, "c": {"a"}, "d": {"c", "e"},
+             "e": {"e"}, "f": set()}
+    components = awsc._strongly_connected(graph)
+    assert sorted(map(sorted, components)) == [
+        ["a", "b", "c"], ["d"], ["e"], ["f"]]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_strongly_connected_matches_reachability(awsc, seed):
+    rng = random.Random(seed)
+    nodes = list(range(12))
+    graph = {n: {m for m in nodes if rng.random() < 0.15} for n in nodes}
+
+    components = awsc._strongly_connected(graph)
+
+    reach = {n: _reachable(graph, n) | {n} for n in nodes}
+    expected = {frozenset(m for m in nodes if n in reach[m] and m in reach[n])
+                for n in nodes}
+    assert {frozenset(c) for c in components} == expected
+    assert sum(map(len, components)) == len(nodes)
+
+
+def test_strongly_connected_handles_long_chains(awsc):
+    # Deeper than the recursion limit: the DFS must not recurse
+    graph = {n: {n + 1} for n in range(5000)}
+    graph[5000] = {0}
+    assert awsc._strongly_connected(graph) == [set(range(5001))]
+
+
+def test_plan_without_cycles_revokes_nothing(awsc):
+    groups = [_sg(awsc, "web", "app"), _sg(awsc, "app", "db"),
+              _sg(awsc, "db"), _sg(awsc, "bastion", "db", "web")]
+
+    revokes, levels = awsc._security_group_plan(groups)
+
+    assert revokes == {}
+    assert [sorted(level) for level in levels] == [
+        ["bastion"], ["web"], ["app"], ["db"]]
+
+
+def test_plan_revokes_only_references_inside_a_cycle(awsc):
+    groups = [_sg(awsc, "a", "b", "c"), _sg(awsc, "b", "a"),
+              _sg(awsc, "c"), _sg(awsc, "d", "d")]
+
+    revokes, levels = awsc._security_group_plan(groups)
+
+    # a -> c is not part of the cycle and is left to the delete order;
+    # d only references itself, which never blocks its deletion
+    assert revokes == {"a": {"b"}, "b": {"a"}}
+    _check_plan({"a": {"b", "c"}, "b": {"a"}, "c": set(), "d": {"d"}},
+                revokes, levels)
+
+
+def test_plan_ignores_groups_outside_the_vpc(awsc):
+    groups = [_sg(awsc, "a", "sg-elsewhere",
+                  other_pairs=[{"UserId": "123456789012"}])]
+
+    assert awsc._security_group_plan(groups) == ({}, [["a"]])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_plan_orders_any_reference_graph(awsc, seed):
+    rng = random.Random(seed)
+    ids = [f"sg-{n}" for n in range(10)]
+    graph = {gid: {r for r in ids if rng.random() < 0.2} for gid in ids}
+
+    revokes, levels = awsc._security_group_plan(
+        [_sg(awsc, gid, *sorted(refs)) for gid, refs in graph.items()])
+
+    _check_plan(graph, revokes, levels)
+    for gid, to in revokes.items():
+        # Revoked references are all within a cycle
+        assert all(gid in _reachable(graph, ref) for ref in to)
+
+
+def test_rules_referencing_keeps_only_the_given_groups(awsc):
+    sg = _sg(awsc, "a", "b", "c")
+
+    rules = awsc._rules_referencing(sg.refs["ingress"], {"b"})
+
+    assert rules == [{"IpProtocol": "tcp", "FromPort": 5432, "ToPort": 5432,
+                      "UserIdGroupPairs": [{"GroupId": "b",
+                                            "UserId": "123456789012"}]}]
+    assert awsc._rules_referencing(sg.refs["egress"], {"b"}) == []
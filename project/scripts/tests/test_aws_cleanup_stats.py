@@ -0,0 +1,87 @@
+"""CleanupStats: bounded failure sampling and merging regions' counts."""
+
+import random
+from collections import Counter
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def quiet(awsc, monkeypatch):
+    monkeypatch.setattr(awsc, "_log", lambda message="": None)
+
+
+@pytest.fixture
+def seeded():
+    """Seed the random module the script samples with, restoring it after."""
+    state = random.getstate()
+    random.seed(20240601)
+    yield
+    random.setstate(state)
+
+
+def _stats(awsc, region, failed, deleted=0, skipped=0):
+    stats = awsc.CleanupStats(region, echo=False)
+    for n in range(deleted):
+        stats.record_deleted(f"bucket-{n}")
+    for n in range(skipped):
+        stats.record_skipped(f"role-{n}")
+    for n in range(failed):
+        stats.record_failed(f"vpc-{n}", "DependencyViolation")
+    return stats
+
+
+def test_sample_is_bounded_and_reproducible(awsc, seeded):
+    stats = _stats(awsc, "", 1000)
+    random.seed(20240601)
+    again = _stats(awsc, "", 1000)
+
+    assert stats.failed == 1000
+    assert len(stats.failures) == awsc.FAILURE_SAMPLE_SIZE
+    assert len(set(stats.failures)) == awsc.FAILURE_SAMPLE_SIZE
+    assert set(stats.failures) <= {f"vpc-{n}: DependencyViolation"
+                                   for n in range(1000)}
+    assert again.failures == stats.failures
+
+
+def test_every_failure_is_equally_likely_to_be_kept(awsc, seeded,
+                                                    monkeypatch):
+    monkeypatch.setattr(awsc, "FAILURE_SAMPLE_SIZE", 5)
+    trials, failures = 4000, 20
+    kept = Counter()
+    for _ in range(trials):
+        kept.update(_stats(awsc, "", failures).failures)
+
+    # Each is kept with probability 5/20: 1000 times, give or take ~27
+    assert len(kept) == failures
+    assert all(850 < n < 1150 for n in kept.values()), kept
+
+
+def test_merge_adds_up_counts(awsc, seeded):
+    parts = {"us-east-1": _stats(awsc, "us-east-1", 3, deleted=7, skipped=2),
+             "eu-west-1": _stats(awsc, "eu-west-1", 4, deleted=1),
+             "ap-south-1": _stats(awsc, "ap-south-1", 0, skipped=5)}
+
+    merged = awsc.CleanupStats.merge(parts)
+
+    assert (merged.deleted, merged.skipped, merged.failed) == (8, 7, 7)
+    assert merged.by_region == parts
+    # Fewer failures than the sample holds: all of them are kept
+    assert sorted(merged.failures) == sorted(
+        f for part in parts.values() for f in part.failures)
+
+
+def test_merged_sample_weighs_regions_by_failures(awsc, seeded,
+                                                  monkeypatch):
+    monkeypatch.setattr(awsc, "FAILURE_SAMPLE_SIZE", 10)
+    parts = {"us-east-1": _stats(awsc, "us-east-1", 900),
+             "eu-west-1": _stats(awsc, "eu-west-1", 100)}
+    regions = Counter()
+    for _ in range(500):
+        merged = awsc.CleanupStats.merge(parts)
+        assert merged.failed == 1000 and len(merged.failures) == 10
+        assert len(set(merged.failures)) == 10
+        regions.update(f.split("]")[0][1:] for f in merged.failures)
+
+    # 5000 draws, 90% of them from us-east-1 (give or take ~21)
+    assert 4400 < regions["us-east-1"] < 4600, regions
@@ -0,0 +1,64 @@
+"""Tag-index discovery: ARNs from get_resources into inventory kinds and IDs."""
+
+import pytest
+
+ACCOUNT = "arn:aws:{}:us-east-1:123456789012:{}"
+
+
+class _TaggingClient:
+    """Stands in for a Resource Groups Tagging API client."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def can_paginate(self, operation):
+        return True
+
+    def get_paginator(self, operation):
+        client = self
+
+        class Paginator:
+            def paginate(self, **kwargs):
+                client.calls.append((operation, kwargs))
+                return iter(client.pages)
+
+        return Paginator()
+
+
+@pytest.mark.parametrize("service, resource, expected", [
+    ("ec2", "instance/i-0abc", ("ec2:instance", "i-0abc")),
+    ("ec2", "key-pair/key-0abc", ("ec2:key-pair", "key-0abc")),
+    ("ec2", "natgateway/nat-0abc", ("ec2:natgateway", "nat-0abc")),
+    ("ec2", "elastic-ip/eipalloc-0abc", ("ec2:elastic-ip", "eipalloc-0abc")),
+    ("rds", "db:flowforge-db", ("rds:db", "flowforge-db")),
+    ("rds", "subgrp:flowforge-subnets", ("rds:subgrp", "flowforge-subnets")),
+    ("ecr", "repository/flowforge/api", ("ecr:repository", "flowforge/api")),
+])
+def test_parse_arn(awsc, service, resource, expected):
+    assert awsc._parse_arn(ACCOUNT.format(service, resource)) == expected
+
+
+def test_tag_index_groups_ids_by_kind(awsc):
+    client = _TaggingClient([
+        {"ResourceTagMappingList": [
+            {"ResourceARN": ACCOUNT.format("ec2", "instance/i-1")},
+            {"ResourceARN": ACCOUNT.format("rds", "db:flowforge-db")}]},
+        {"ResourceTagMappingList": [
+            {"ResourceARN": ACCOUNT.format("ec2", "instance/i-2")},
+            # A type the tag filter should not return is ignored
+            {"ResourceARN": ACCOUNT.format("ec2", "volume/vol-1")}]},
+    ])
+
+    index = awsc.tag_index(client)
+
+    assert index["ec2_instance"] == ["i-1", "i-2"]
+    assert index["rds_instance"] == ["flowforge-db"]
+    assert index["vpc"] == []
+    assert set(index) == set(awsc.TAG_RESOURCE_TYPES.values())
+    [(operation, kwargs)] = client.calls
+    assert operation == "get_resources"
+    assert kwargs["TagFilters"] == [
+        {"Key": "Project", "Values": [awsc.PROJECT_TAG]}]
+    assert sorted(kwargs["ResourceTypeFilters"]) == sorted(
+        awsc.TAG_RESOURCE_TYPES)
@@ -0,0 +1,134 @@
+"""wait_for() and async_wait_for(): the polling schedule of _wait_steps()."""
+
+import asyncio
+import sys
+
+import pytest
+
+IDS = ["i-1", "i-2", "i-3"]
+
+
+def _error(code):
+    return sys.modules["botocore.exceptions"].ClientError(
+        {"Error": {"Code": code, "Message": code}}, "DescribeInstances")
+
+
+class Clock:
+    """Stands in for the time module: sleeping only moves monotonic() on."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    time = monotonic
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+
+@pytest.fixture
+def clock(awsc, monkeypatch):
+    pytest.importorskip("boto3")
+    awsc._load_boto()
+    monkeypatch.setattr(awsc, "_metrics", awsc.RunMetrics())
+    clock = Clock()
+    monkeypatch.setattr(awsc, "time", clock)
+    monkeypatch.setattr(awsc.asyncio, "sleep", clock.async_sleep)
+    # No jitter: every delay is the full backoff
+    monkeypatch.setattr(awsc.random, "uniform", lambda a, b: b)
+    return clock
+
+
+@pytest.fixture(params=["threads", "asyncio"])
+def wait(awsc, request):
+    """wait_for(), or async_wait_for() run to completion."""
+    if request.param == "threads":
+        return awsc.wait_for
+
+    async def call(fn, *args):
+        return fn(*args)
+
+    def run(*args, **kwargs):
+        return asyncio.run(awsc.async_wait_for(*args, call=call, **kwargs))
+
+    return run
+
+
+def _poll(*results):
+    """A poll_fn returning (or raising) *results* in turn, recording its
+    arguments."""
+    results = iter(results)
+
+    def poll(ids):
+        poll.calls.append(ids)
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    poll.calls = []
+    return poll
+
+
+def test_polls_only_what_is_still_pending(clock, wait):
+    poll = _poll(["i-1", "i-3"], ["i-3"], [])
+
+    assert wait(poll, IDS, "instances", interval=5) == set()
+    assert poll.calls == [IDS, ["i-1", "i-3"], ["i-3"]]
+    assert clock.sleeps == [5, 10]
+
+
+def test_throttling_backs_off_and_keeps_waiting(clock, wait):
+    poll = _poll(*[_error("Throttling")] * 3, ["i-2"], [])
+
+    assert wait(poll, IDS, "instances", interval=5, max_interval=30) == set()
+    # Every throttled poll asked about everything still pending
+    assert poll.calls == [IDS] * 4 + [["i-2"]]
+    assert clock.sleeps == [5, 10, 20, 30]
+
+
+def test_not_found_means_everything_is_gone(clock, wait):
+    poll = _poll(IDS, _error("InvalidInstanceID.NotFound"))
+
+    assert wait(poll, IDS, "instances", interval=5) == set()
+    assert len(poll.calls) == 2 and clock.sleeps == [5]
+
+
+def test_other_errors_stop_the_wait(awsc, clock, wait, capsys):
+    poll = _poll(["i-2"], _error("UnauthorizedOperation"))
+
+    assert wait(poll, IDS, "instances", interval=5) == {"i-2"}
+    assert clock.sleeps == [5]
+    assert "Stopped waiting for instances" in capsys.readouterr().out
+
+
+def test_timeout_returns_what_is_left(awsc, clock, wait, capsys):
+    poll = _poll(*[IDS] * 10)
+
+    assert wait(poll, IDS, "instances", timeout=20, interval=5) == set(IDS)
+    # The last delay is cut short to end at the deadline
+    assert clock.sleeps == [5, 10, 5]
+    assert len(poll.calls) == 4
+    assert "Timeout waiting for instances after 20s" in capsys.readouterr().out
+    assert awsc._metrics.report()["waits"] == [
+        {"resource": "instances", "seconds": 20, "count": 3, "left": 3}]
+
+
+def test_jitter_spreads_each_delay_over_its_upper_half(awsc, clock,
+                                                       monkeypatch):
+    bounds = []
+    monkeypatch.setattr(awsc.random, "uniform",
+                        lambda a, b: bounds.append((a, b)) or a)
+    poll = _poll(IDS, IDS, [])
+
+    awsc.wait_for(poll, IDS, "instances", interval=8)
+
+    assert bounds == [(0, 4), (0, 8)]
+    assert clock.sleeps == [4, 8]
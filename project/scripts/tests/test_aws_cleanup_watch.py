@@ -0,0 +1,81 @@
+"""Watch mode: a failing tick is reported and the watch carries on."""
+
+import json
+
+import pytest
+
+REGION = "us-east-1"
+
+
+@pytest.fixture
+def botocore_errors(awsc):
+    pytest.importorskip("boto3")
+    awsc._load_boto()
+    import botocore.exceptions
+    return botocore.exceptions
+
+
+def test_failing_ticks_do_not_end_the_watch(awsc, botocore_errors,
+                                            monkeypatch, tmp_path, capsys):
+    throttled = botocore_errors.ClientError(
+        {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
+        "GetResources")
+    unreachable = botocore_errors.EndpointConnectionError(
+        endpoint_url="https://tagging.us-east-1.amazonaws.com")
+    ticks = iter([{"s3_bucket": ["flowforge-a"]}, throttled, unreachable,
+                  {"s3_bucket": ["flowforge-a", "flowforge-b"]}])
+
+    def leak_view(*args, **kwargs):
+        view = next(ticks)
+        if isinstance(view, Exception):
+            raise view
+        return view
+
+    seen = []
+
+    def on_tick(views):
+        seen.append(views)
+        if len(seen) == 2:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(awsc, "leak_view", leak_view)
+    state = tmp_path / "watch.json"
+
+    with pytest.raises(KeyboardInterrupt):
+        awsc.watch({REGION: (None,) * 5}, {}, REGION, 0, str(state),
+                   on_tick=on_tick)
+
+    out = capsys.readouterr().out
+    assert out.count("Tick failed") == 2
+    assert "ThrottlingException" in out and "Could not connect" in out
+    # The failed ticks changed nothing: only flowforge-b is new afterwards
+    assert out.count("APPEARED: s3_bucket flowforge-a") == 1
+    assert out.count("APPEARED: s3_bucket flowforge-b") == 1
+    assert "DISAPPEARED" not in out
+    assert json.loads(state.read_text())["resources"] == {
+        REGION: {"s3_bucket": ["flowforge-a", "flowforge-b"]}}
+
+
+def test_failing_tick_keeps_the_saved_state(awsc, botocore_errors,
+                                            monkeypatch, tmp_path, capsys):
+    state = tmp_path / "watch.json"
+    saved = {"version": awsc.WATCH_STATE_VERSION,
+             "resources": {REGION: {"s3_bucket": ["flowforge-a"]}}}
+    state.write_text(json.dumps(saved))
+    calls = []
+
+    def leak_view(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        raise botocore_errors.ClientError(
+            {"Error": {"Code": "ExpiredToken", "Message": "expired"}},
+            "GetResources")
+
+    monkeypatch.setattr(awsc, "leak_view", leak_view)
+
+    with pytest.raises(KeyboardInterrupt):
+        awsc.watch({REGION: (None,) * 5}, {}, REGION, 0, str(state))
+
+    assert capsys.readouterr().out.count("Tick failed") == 2
+    assert json.loads(state.read_text()) == saved
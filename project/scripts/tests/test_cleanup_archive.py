@@ -0,0 +1,148 @@
+"""Archive files written by cleanup.py --archive-older-than."""
+
+import gzip
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+
+def _read_all(paths) -> bytes:
+    data = b""
+    for path in paths:
+        with gzip.open(path) as f:
+            data += f.read()
+    return data
+
+
+def _archive_files(directory) -> list[str]:
+    return sorted(os.listdir(directory))
+
+
+def test_members_append_to_one_readable_file(db_cleanup, tmp_path):
+    archive = db_cleanup.Archive(str(tmp_path), max_bytes=1 << 20, keep=None)
+    for n in range(3):
+        with archive.member() as out:
+            out.write(f"row {n}\n".encode())
+    archive.close()
+
+    assert len(archive.paths) == 1
+    assert _read_all(archive.paths) == b"row 0\nrow 1\nrow 2\n"
+
+
+def test_files_rotate_past_max_bytes(db_cleanup, tmp_path):
+    archive = db_cleanup.Archive(str(tmp_path), max_bytes=1, keep=None)
+    for n in range(3):
+        with archive.member() as out:
+            out.write(f"row {n}\n".encode())
+    archive.close()
+
+    assert [os.path.basename(p)[-11:] for p in archive.paths] == [
+        "0001.tsv.gz", "0002.tsv.gz", "0003.tsv.gz"]
+    assert [_read_all([p]) for p in archive.paths] == [
+        b"row 0\n", b"row 1\n", b"row 2\n"]
+
+
+def test_failed_member_is_cut_off(db_cleanup, tmp_path):
+    archive = db_cleanup.Archive(str(tmp_path), max_bytes=1 << 20, keep=None)
+    with archive.member() as out:
+        out.write(b"kept\n")
+    with pytest.raises(RuntimeError):
+        with archive.member() as out:
+            out.write(b"x" * 100_000)
+            raise RuntimeError("COPY failed")
+    with archive.member() as out:
+        out.write(b"also kept\n")
+    archive.close()
+
+    assert _read_all(archive.paths) == b"kept\nalso kept\n"
+
+
+def test_empty_members_leave_no_file(db_cleanup, tmp_path):
+    archive = db_cleanup.Archive(str(tmp_path), max_bytes=1 << 20, keep=None)
+    with archive.member():
+        pass
+    archive.close()
+
+    assert archive.paths == [] and _archive_files(tmp_path) == []
+
+
+def test_close_keeps_only_the_newest_files(db_cleanup, tmp_path):
+    for old in ("tasks-20240101T000000Z-0001.tsv.gz",
+                "tasks-20240102T000000Z-0001.tsv.gz", "notes.txt"):
+        (tmp_path / old).write_bytes(b"")
+    archive = db_cleanup.Archive(str(tmp_path), max_bytes=1, keep=2)
+    for n in range(3):
+        with archive.member() as out:
+            out.write(f"row {n}\n".encode())
+    archive.close()
+
+    assert _archive_files(tmp_path) == ["notes.txt"] + [
+        os.path.basename(p) for p in archive.paths[-2:]]
+
+
+class _CopyConnection:
+    """Connection whose COPY (DELETE ... RETURNING) yields *batches*."""
+
+    def __init__(self, batches, fail_at=None):
+        self.batches = list(batches)
+        self.fail_at = fail_at
+        self.copied = 0
+        self.committed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.committed += 1
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params):
+        # key_ranges(): one batch per range, then the open-ended last one
+        self._row = ((len(self.batches) - self.copied - 1,)
+                     if self.copied < len(self.batches) - 1 else None)
+
+    def fetchone(self):
+        return self._row
+
+    def mogrify(self, sql, params):
+        assert sql.startswith("COPY (DELETE FROM tasks WHERE ")
+        return sql.encode()
+
+    def copy_expert(self, sql, out):
+        if self.copied == self.fail_at:
+            out.write(b"partial")
+            raise OSError("disk full")
+        rows = self.batches[self.copied]
+        out.write(b"".join(rows))
+        self.rowcount = len(rows)
+        self.copied += 1
+
+
+def test_archive_old_tasks_writes_each_batch_before_commit(db_cleanup,
+                                                           tmp_path):
+    conn = _CopyConnection([[b"a\n", b"b\n"], [b"c\n"]])
+    archive = db_cleanup.Archive(str(tmp_path), max_bytes=1 << 20, keep=None)
+
+    moved = db_cleanup.archive_old_tasks(
+        conn, archive, datetime.now(timezone.utc), batch_size=2, pause=0)
+    archive.close()
+
+    assert moved == 3
+    assert _read_all(archive.paths) == b"a\nb\nc\n"
+
+
+def test_archive_old_tasks_stops_at_a_failed_batch(db_cleanup, tmp_path):
+    conn = _CopyConnection([[b"a\n"], [b"b\n"], [b"c\n"]], fail_at=1)
+    archive = db_cleanup.Archive(str(tmp_path), max_bytes=1 << 20, keep=None)
+
+    with pytest.raises(OSError):
+        db_cleanup.archive_old_tasks(
+            conn, archive, datetime.now(timezone.utc), batch_size=1, pause=0)
+    archive.close()
+
+    # The failed batch rolled back and left nothing in the archive
+    assert _read_all(archive.paths) == b"a\n"
@@ -0,0 +1,118 @@
+"""Batched deletion in cleanup.py: key ranges found one at a time."""
+
+import re
+
+import pytest
+
+
+class FakeTasks:
+    """A tasks table behind the connection and cursor calls cleanup.py makes.
+
+    Understands the id conditions _key_range() builds; *matches* stands in
+    for the extra WHERE clause, whose parameters are recorded.
+    """
+
+    def __init__(self, ids, matches=lambda task_id: True):
+        self.ids = sorted(ids)
+        self.matches = matches
+        self.transactions = 0
+        self.log = []
+
+    # Connection
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.transactions += 1
+
+    def cursor(self):
+        return _Cursor(self)
+
+
+class _Cursor:
+    def __init__(self, table):
+        self.table = table
+        self.rowcount = -1
+        self._row = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql, params):
+        params = list(params)
+        after = params.pop(0) if "id > %s" in sql else None
+        upto = params.pop(0) if "id <= %s" in sql else None
+        in_range = [i for i in self.table.ids
+                    if (after is None or i > after)
+                    and (upto is None or i <= upto)]
+        if sql.startswith("SELECT"):
+            offset = params.pop()
+            self.table.log.append(("select", after, tuple(params)))
+            matching = [i for i in in_range if self.table.matches(i)]
+            self._row = (matching[offset],) if offset < len(matching) else None
+        else:
+            assert re.match(r"DELETE FROM tasks WHERE ", sql)
+            self.table.log.append(("delete", after, upto))
+            self.table.ids = [i for i in self.table.ids if i not in in_range]
+            self.rowcount = len(in_range)
+
+    def fetchone(self):
+        return self._row
+
+
+def _ids(n):
+    return [f"{i:08x}-0000-0000-0000-000000000000" for i in range(n)]
+
+
+@pytest.mark.parametrize("rows, batch_size", [(10, 3), (9, 3), (1, 5), (0, 4)])
+def test_key_ranges_cover_every_row_once(db_cleanup, rows, batch_size):
+    ids = _ids(rows)
+    table = FakeTasks(ids)
+
+    ranges = list(db_cleanup.key_ranges(table, batch_size))
+
+    assert ranges[0][0] is None and ranges[-1][1] is None
+    assert all(upto == next_after for (_, upto), (next_after, _)
+               in zip(ranges, ranges[1:]))
+    sizes = [sum(1 for i in ids if (a is None or i > a)
+                 and (u is None or i <= u)) for a, u in ranges]
+    assert sum(sizes) == rows
+    assert all(size == batch_size for size in sizes[:-1])
+    assert sizes[-1] <= batch_size
+
+
+def test_key_ranges_count_only_matching_rows(db_cleanup):
+    ids = _ids(20)
+    odd = set(ids[1::2])
+    table = FakeTasks(ids, matches=lambda i: i in odd)
+
+    ranges = list(db_cleanup.key_ranges(table, 4, "status IN %s",
+                                        (("completed", "failed"),)))
+
+    assert [upto for _, upto in ranges] == [ids[7], ids[15], None]
+    assert {params for _, _, params in table.log} == {
+        (("completed", "failed"),)}
+
+
+def test_key_ranges_are_found_one_at_a_time(db_cleanup):
+    table = FakeTasks(_ids(10))
+    ranges = db_cleanup.key_ranges(table, 4)
+
+    next(ranges)
+
+    assert len(table.log) == 1
+
+
+def test_delete_in_batches_commits_each_batch(db_cleanup):
+    table = FakeTasks(_ids(10))
+
+    deleted = db_cleanup.delete_in_batches(table, 4, pause=0)
+
+    assert deleted == 10 and table.ids == []
+    # Three lookups and three deletes, each its own transaction, and each
+    # lookup made after the previous batch was deleted
+    assert table.transactions == 6
+    assert [entry[0] for entry in table.log] == ["select", "delete"] * 3
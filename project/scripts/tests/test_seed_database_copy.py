@@ -0,0 +1,69 @@
+"""CopyStream: rows encoded in COPY text format, one batch at a time."""
+
+import io
+import random
+
+import pytest
+
+
+def _parse_copy(data: bytes) -> list[tuple]:
+    """Decode COPY text format the way the server reads it."""
+    unescape = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+    rows = []
+    for line in data.decode().split("\n")[:-1]:
+        fields, field, chars = [], [], iter(line)
+        for c in chars:
+            if c == "\\":
+                field.append(unescape[next(chars)])
+            elif c == "\t":
+                fields.append("".join(field))
+                field = []
+            else:
+                field.append(c)
+        fields.append("".join(field))
+        rows.append(tuple(fields))
+    return rows
+
+
+def test_copy_line_escapes_special_characters(seed):
+    row = ("tab\there", "new\nline", "back\\slash", "cr\r", "plain")
+    assert seed._copy_line(row) == (
+        "tab\\there\tnew\\nline\tback\\\\slash\tcr\\r\tplain\n")
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 64 * 1024])
+def test_stream_round_trips_rows(seed, read_size):
+    rng = random.Random(read_size)
+    alphabet = "ab \t\n\r\\é€\U0001f680"
+    batches = [[tuple("".join(rng.choice(alphabet) for _ in range(
+                          rng.randrange(12))) for _ in range(5))
+                for _ in range(rng.randrange(1, 4))]
+               for _ in range(6)]
+    stream = seed.CopyStream(batches)
+
+    data = bytearray()
+    while chunk := stream.read(read_size):
+        data += chunk
+
+    assert _parse_copy(bytes(data)) == [row for b in batches for row in b]
+
+
+def test_batches_are_encoded_only_as_they_are_read(seed):
+    def batches():
+        for n in range(3):
+            produced.append(n)
+            yield [(f"task {n}", "", "pending", "t", "t")]
+
+    produced, sent = [], []
+    stream = seed.CopyStream(batches(), sent.append)
+
+    first = stream.read(4)
+
+    assert first == b"task" and produced == [0] and len(sent) == 1
+    assert io.BufferedReader(stream).read().count(b"\n") == 3
+    assert produced == [0, 1, 2] and len(sent) == 3
+
+
+def test_empty_input_reads_nothing(seed):
+    assert seed.CopyStream([]).read() == b""
+    assert seed.CopyStream([[], []]).read() == b""
@@ -0,0 +1,107 @@
+"""Workload profiles: validation and reproducible rows."""
+
+import json
+import re
+
+import pytest
+
+END = "2026-01-01T00:00:00+00:00"
+
+
+def _profile(seed, **fields):
+    return seed.Profile(seed=7, end=END, **fields)
+
+
+@pytest.mark.parametrize("fields, message", [
+    ({"payload": {"distribution": "uniform", "min": 500, "max": 100}},
+     "min (500) must not exceed max (100)"),
+    ({"payload": {"distribution": "uniform", "min": -1}},
+     "min must be an integer >= 0"),
+    ({"payload": {"distribution": "lognormal", "median": 0}},
+     "median must be a number > 0"),
+    ({"payload": {"distribution": "lognormal", "sigma": -1}},
+     "sigma must be a number >= 0"),
+    ({"payload": {"distribution": "lognormal", "max": 10.5}},
+     "max must be an integer >= 0"),
+    ({"arrival": {"pattern": "bursty", "bursts": 0}},
+     "bursts must be an integer >= 1"),
+    ({"arrival": {"pattern": "bursty", "bursts": 2.5}},
+     "bursts must be an integer >= 1"),
+    ({"arrival": {"pattern": "bursty", "burst_minutes": 0}},
+     "burst_minutes must be a number > 0"),
+    ({"arrival": {"pattern": "diurnal", "amplitude": 1.5}},
+     "amplitude must be a number from 0 to 1"),
+    ({"arrival": {"pattern": "diurnal", "amplitude": "high"}},
+     "amplitude must be a number from 0 to 1"),
+    ({"arrival": {"pattern": "uniform", "bursts": 3}},
+     "uniform arrival has no parameter 'bursts'"),
+    ({"processing_seconds": 0}, "processing_seconds must be positive"),
+])
+def test_load_rejects_unusable_parameters(seed, tmp_path, fields, message):
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps({"version": seed.PROFILE_VERSION, "seed": 7,
+                                "end": END, **fields}))
+
+    with pytest.raises(ValueError, match=re.escape(message)):
+        seed.Profile.load(str(path))
+
+
+@pytest.mark.parametrize("fields", [
+    {"arrival": {"pattern": "bursty", "bursts": 3, "burst_minutes": 0.5}},
+    {"arrival": {"pattern": "diurnal", "amplitude": 1, "peak_hour": 0}},
+    {"payload": {"distribution": "uniform", "min": 10, "max": 10}},
+    {"payload": {"distribution": "lognormal", "sigma": 0, "median": 0.5}},
+])
+def test_boundary_parameters_generate(seed, fields):
+    profile = _profile(seed, **fields)
+    profile.validate()
+
+    rows = [row for batch in seed.generate_tasks(50, profile) for row in batch]
+
+    assert len(rows) == 50
+
+
+def test_saved_profile_loads_unchanged(seed, tmp_path):
+    profile = _profile(seed, arrival={"pattern": "bursty", "bursts": 3},
+                       payload={"distribution": "lognormal", "median": 50})
+    path = str(tmp_path / "profile.json")
+    profile.save(path)
+
+    assert seed.Profile.load(path) == profile
+
+
+@pytest.mark.parametrize("workers", [2, 3, 8])
+def test_rows_do_not_depend_on_workers(seed, workers):
+    profile = _profile(seed, arrival={"pattern": "diurnal"},
+                       payload={"distribution": "lognormal"})
+    count = 3 * seed.BATCH_SIZE + 17
+
+    whole = [row for batch in seed.generate_tasks(count, profile)
+             for row in batch]
+    shards = [row for first, n in seed.split_rows(count, workers)
+              for batch in seed.generate_tasks(n, profile, first)
+              for row in batch]
+
+    assert len(whole) == count and shards == whole
+
+
+def test_rows_do_not_depend_on_bulk(seed, monkeypatch):
+    """INSERT and COPY load the same rows from the same profile."""
+    class Cursor:
+        def copy_expert(self, sql, stream, size):
+            copied.append(stream.read())
+
+    inserted, copied = [], []
+    monkeypatch.setattr(seed, "execute_values",
+                        lambda cur, sql, batch: inserted.extend(batch))
+    profile = _profile(seed, arrival={"pattern": "bursty"},
+                       payload={"distribution": "uniform"})
+    count = seed.BATCH_SIZE + 5
+
+    seed.insert_tasks(Cursor(), seed.generate_tasks(count, profile),
+                      seed.Counter())
+    seed.copy_tasks(Cursor(), seed.generate_tasks(count, profile),
+                    seed.Counter())
+
+    assert len(inserted) == count
+    assert copied == ["".join(map(seed._copy_line, inserted)).encode()]